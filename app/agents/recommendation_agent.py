@@ -4,12 +4,21 @@ LangChain 기반 스마트 홈 추천 Agent
 """
 
 import asyncio
+import contextvars
 import os
 import json
 import aiohttp
-from typing import Dict, Any, Optional
+import functools
+from time import perf_counter
+from typing import Callable, Dict, Any, Optional
 from dotenv import load_dotenv
 
+from app.agents.step_recorder import AgentStepRecorder, ToolFailure, agent_step_stats
+from app.core.config import GEMINI_MODEL
+from app.core.metrics import StageTimer
+from app.core.tracing import propagation_headers, traced_stage
+from app.utils.logger import setup_logger
+
 # 환경변수 로드
 load_dotenv()
 
@@ -21,6 +30,21 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
+
+logger = setup_logger(__name__)
+
+
+def _timed_tool(name: str, func: Callable[..., str]) -> Callable[..., str]:
+    """Tool 함수 소요 시간 기록 (도구는 실패 시 예외 대신 ToolFailure를 반환)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> str:
+        with traced_stage("tool", name) as timer:
+            result = func(*args, **kwargs)
+            if isinstance(result, ToolFailure):
+                timer.outcome = "error"
+            return result
+    return wrapper
+
 class WeatherTool:
     """날씨 도구"""
     
@@ -48,15 +72,16 @@ class GatewayTool:
     async def get_user_devices(self) -> str:
         """사용자의 스마트 가전 목록 조회"""
         try:
-            print(f"🔍 Gateway API 호출 시도: {self.devices_endpoint}")
+            logger.debug(f"🔍 Gateway API 호출 시도: {self.devices_endpoint}")
             
             async with aiohttp.ClientSession() as session:
-                async with session.get(self.devices_endpoint) as response:
-                    print(f"📡 Gateway API 응답 상태: {response.status}")
+                async with session.get(self.devices_endpoint, headers=propagation_headers()) as response:
+                    logger.debug(f"📡 Gateway API 응답 상태: {response.status}")
                     
                     if response.status == 200:
                         data = await response.json()
-                        print(f"📋 Gateway API 응답 데이터: {data}")
+                        # 응답 전체는 DEBUG에서만 (지연 포맷이라 INFO에서는 문자열을 만들지 않음)
+                        logger.debug("📋 Gateway API 응답 데이터: %s", data)
                         
                         devices = data.get('response', [])
                         
@@ -80,21 +105,21 @@ class GatewayTool:
                             "devices": device_list,
                             "source": "Gateway API"
                         }
-                        print(f"✅ Gateway API 성공: {len(device_list)}개 기기 조회")
+                        logger.info(f"✅ Gateway API 성공: {len(device_list)}개 기기 조회")
                         return json.dumps(result, ensure_ascii=False)
                     else:
-                        print(f"❌ Gateway API 실패: {response.status}")
-                        return f"기기 목록 조회 실패: {response.status}"
+                        logger.error(f"❌ Gateway API 실패: {response.status}")
+                        return ToolFailure(f"기기 목록 조회 실패: {response.status}")
         except Exception as e:
-            print(f"❌ Gateway API 예외 발생: {e}")
-            return f"기기 목록 조회 실패: {e}"
+            logger.error(f"❌ Gateway API 예외 발생: {e}")
+            return ToolFailure(f"기기 목록 조회 실패: {e}")
     
     async def get_device_state(self, device_id: str) -> str:
         """특정 기기의 현재 상태 조회"""
         try:
             url = f"{self.device_state_endpoint}/{device_id}/state"
             async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
+                async with session.get(url, headers=propagation_headers()) as response:
                     if response.status == 200:
                         data = await response.json()
                         state_info = {
@@ -106,11 +131,11 @@ class GatewayTool:
                         }
                         return json.dumps(state_info, ensure_ascii=False)
                     else:
-                        print(f"❌ 기기 상태 조회 실패: {response.status}")
-                        return f"기기 상태 조회 실패: {response.status}"
+                        logger.error(f"❌ 기기 상태 조회 실패: {response.status}")
+                        return ToolFailure(f"기기 상태 조회 실패: {response.status}")
         except Exception as e:
-            print(f"❌ 기기 상태 조회 예외 발생: {e}")
-            return f"기기 상태 조회 실패: {e}"
+            logger.error(f"❌ 기기 상태 조회 예외 발생: {e}")
+            return ToolFailure(f"기기 상태 조회 실패: {e}")
 class WeatherTool:
     """날씨 도구"""
     
@@ -142,34 +167,37 @@ class WeatherTool:
                         }
                         return json.dumps(weather_info, ensure_ascii=False)
                     else:
-                        return f"날씨 API 호출 실패: {response.status}"
+                        return ToolFailure(f"날씨 API 호출 실패: {response.status}")
         except Exception as e:
-            return f"날씨 API 호출 실패: {e}"
+            return ToolFailure(f"날씨 API 호출 실패: {e}")
+    
+    async def get_forecast_data(self, location: str = "Seoul,KR", days: int = 5) -> Dict[str, Any]:
+        """날씨 예보 원본 조회 (3시간 간격 슬롯, 최대 5일) - 실패 시 예외"""
+        async with aiohttp.ClientSession() as session:
+            url = f"{self.base_url}/forecast"
+            params = {
+                "q": location,
+                "appid": self.api_key,
+                "units": "metric",
+                "cnt": min(days, 5) * 8  # 3시간마다 데이터 (하루 8개, API 최대 40개)
+            }
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"예보 API 호출 실패: {response.status}")
+                return await response.json()
     
     async def get_forecast(self, location: str = "Seoul,KR", days: int = 5) -> str:
         """날씨 예보 조회"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/forecast"
-                params = {
-                    "q": location,
-                    "appid": self.api_key,
-                    "units": "metric",
-                    "cnt": days * 8  # 3시간마다 데이터
-                }
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        forecast_info = {
-                            "location": data["city"]["name"],
-                            "country": data["city"]["country"],
-                            "forecasts": data["list"][:days]  # 첫 N일만
-                        }
-                        return json.dumps(forecast_info, ensure_ascii=False)
-                    else:
-                        return f"예보 API 호출 실패: {response.status}"
+            data = await self.get_forecast_data(location, days)
+            forecast_info = {
+                "location": data["city"]["name"],
+                "country": data["city"]["country"],
+                "forecasts": data["list"]  # N일치 3시간 간격 슬롯 전체
+            }
+            return json.dumps(forecast_info, ensure_ascii=False)
         except Exception as e:
-            return f"예보 API 호출 실패: {e}"
+            return ToolFailure(f"예보 API 호출 실패: {e}")
 
 class RecommendationAgent:
     """스마트 홈 추천 Agent"""
@@ -187,10 +215,10 @@ class RecommendationAgent:
             # 이미 실행 중인 이벤트 루프가 있는지 확인
             loop = asyncio.get_event_loop()
             if loop.is_running():
-                # 이미 실행 중인 루프가 있으면 새 스레드에서 실행
+                # 이미 실행 중인 루프가 있으면 새 스레드에서 실행 (추적 컨텍스트를 복사해 넘김)
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.gateway_tool.get_user_devices())
+                    future = executor.submit(contextvars.copy_context().run, asyncio.run, self.gateway_tool.get_user_devices())
                     return future.result()
             else:
                 return asyncio.run(self.gateway_tool.get_user_devices())
@@ -206,7 +234,7 @@ class RecommendationAgent:
             if loop.is_running():
                 import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.gateway_tool.get_device_state(device_id))
+                    future = executor.submit(contextvars.copy_context().run, asyncio.run, self.gateway_tool.get_device_state(device_id))
                     return future.result()
             else:
                 return asyncio.run(self.gateway_tool.get_device_state(device_id))
@@ -217,7 +245,7 @@ class RecommendationAgent:
         """LangChain Agent 설정"""
         # Gemini 모델 설정
         llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
+            model=GEMINI_MODEL,
             api_key=os.getenv("GEMINI_API_KEY"),
             temperature=0.7
         )
@@ -232,7 +260,7 @@ class RecommendationAgent:
                     # 이미 실행 중인 루프가 있으면 새 스레드에서 실행
                     import concurrent.futures
                     with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(asyncio.run, self.weather_tool.get_current_weather(location))
+                        future = executor.submit(contextvars.copy_context().run, asyncio.run, self.weather_tool.get_current_weather(location))
                         return future.result()
                 else:
                     return asyncio.run(self.weather_tool.get_current_weather(location))
@@ -247,7 +275,7 @@ class RecommendationAgent:
                 if loop.is_running():
                     import concurrent.futures
                     with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(asyncio.run, self.gateway_tool.get_user_devices())
+                        future = executor.submit(contextvars.copy_context().run, asyncio.run, self.gateway_tool.get_user_devices())
                         return future.result()
                 else:
                     return asyncio.run(self.gateway_tool.get_user_devices())
@@ -262,7 +290,7 @@ class RecommendationAgent:
                 if loop.is_running():
                     import concurrent.futures
                     with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(asyncio.run, self.gateway_tool.get_device_state(device_id))
+                        future = executor.submit(contextvars.copy_context().run, asyncio.run, self.gateway_tool.get_device_state(device_id))
                         return future.result()
                 else:
                     return asyncio.run(self.gateway_tool.get_device_state(device_id))
@@ -274,17 +302,17 @@ class RecommendationAgent:
             Tool(
                 name="get_current_weather",
                 description="현재 날씨를 조회합니다. location은 '도시명,국가코드' 형식입니다 (예: 'Seoul,KR').",
-                func=get_current_weather_sync
+                func=_timed_tool("get_current_weather", get_current_weather_sync)
             ),
             Tool(
                 name="get_user_devices",
                 description="사용자가 등록한 스마트 가전 목록을 조회합니다.",
-                func=get_user_devices_sync
+                func=_timed_tool("get_user_devices", get_user_devices_sync)
             ),
             Tool(
                 name="get_device_state",
                 description="특정 기기의 현재 상태를 조회합니다. device_id는 기기의 고유 ID입니다.",
-                func=get_device_state_sync
+                func=_timed_tool("get_device_state", get_device_state_sync)
             )
         ]
         prompt = ChatPromptTemplate.from_messages([
@@ -400,15 +428,37 @@ class RecommendationAgent:
         self.agent_executor = AgentExecutor(
             agent=agent,
             tools=all_tools,
-            verbose=True,
+            verbose=False,
             handle_parsing_errors=True,
             max_iterations=5
         )
         
-        print("✅ 스마트 추천 Agent 설정 완료")
+        logger.info("✅ 스마트 추천 Agent 설정 완료")
     
     async def generate_recommendation(self, context: str = None) -> Dict[str, Any]:
-        """추천 생성"""
+        """
+        추천 생성 (Agent 실행 전체 소요 시간을 결과/기기 종류별로 기록)
+        
+        반복별 LLM 지연/토큰/선택한 도구/도구 지연은 결과의 agent_steps에 담아
+        추천 저장 시 recommendation_id와 함께 남긴다.
+        """
+        recorder = AgentStepRecorder(model=GEMINI_MODEL)
+        started = perf_counter()
+        with traced_stage("agent", "run") as timer:
+            recommendation = await self._generate_recommendation(context, timer, recorder)
+            timer.device_type = (recommendation.get("device_control") or {}).get("device_type")
+        agent_steps = recorder.to_dict((perf_counter() - started) * 1000, timer.outcome or "ok")
+        agent_step_stats.record(agent_steps)
+        recommendation["agent_steps"] = agent_steps
+        return recommendation
+    
+    async def _generate_recommendation(
+        self,
+        context: Optional[str],
+        timer: StageTimer,
+        recorder: Optional[AgentStepRecorder] = None
+    ) -> Dict[str, Any]:
+        """Agent 실행 및 응답 파싱 (실패 시 기본 추천, 결과는 timer.outcome에 기록)"""
         try:
             # Agent에게 추천 생성 요청
             prompt = f"""
@@ -420,9 +470,12 @@ class RecommendationAgent:
             """
             
             # Agent 실행
-            result = await self.agent_executor.ainvoke({"input": prompt})
+            result = await self.agent_executor.ainvoke(
+                {"input": prompt},
+                config={"callbacks": [recorder]} if recorder is not None else None
+            )
             
-            print(f"🔍 Agent 실행 결과: {result}")
+            logger.debug("🔍 Agent 실행 결과: %s", result)
             
             # 결과에서 추천 정보 추출
             response_text = result.get("output", "")
@@ -461,7 +514,8 @@ class RecommendationAgent:
                     "device_control": device_control
                 }
             except (json.JSONDecodeError, KeyError) as e:
-                print(f"❌ JSON 파싱 실패: {e}")
+                logger.error(f"❌ JSON 파싱 실패: {e}")
+                timer.outcome = "parse_error"
                 return {
                     "title": "스마트 홈 추천",
                     "contents": "현재 상황에 맞는 스마트 홈 기기 제어를 추천드립니다.",
@@ -472,7 +526,8 @@ class RecommendationAgent:
                 }
         
         except Exception as e:
-            print(f"❌ 스마트 추천 Agent 추천 생성 실패: {e}")
+            logger.error(f"❌ 스마트 추천 Agent 추천 생성 실패: {e}")
+            timer.outcome = "error"
             return {
                 "title": "스마트 홈 추천",
                 "contents": "현재 상황에 맞는 스마트 홈 기기 제어를 추천드립니다.",
@@ -500,7 +555,7 @@ class RecommendationAgent:
                 finally:
                     loop.close()
             except Exception as e:
-                print(f"❌ 격리된 스레드에서 실행 실패: {e}")
+                logger.error(f"❌ 격리된 스레드에서 실행 실패: {e}")
                 return {
                     "title": "데모 추천",
                     "contents": "데모용 추천입니다.",
@@ -535,7 +590,7 @@ class RecommendationAgent:
             return result
             
         except Exception as e:
-            print(f"❌ 동기 추천 생성 실패: {e}")
+            logger.error(f"❌ 동기 추천 생성 실패: {e}")
             return {
                 "title": "데모 추천",
                 "contents": "데모용 추천입니다.",
@@ -578,8 +633,8 @@ async def demo_generate_recommendation(scenario: str = None) -> Dict[str, Any]:
         # 시나리오명으로 직접 선택
         if scenario and scenario in demo_scenarios:
             weather_data = demo_scenarios[scenario]["weather_data"]
-            print(f"🌤️ 데모 시나리오: {scenario}")
-            print(f"📊 날씨 데이터: {weather_data}")
+            logger.info(f"🌤️ 데모 시나리오: {scenario}")
+            logger.info(f"📊 날씨 데이터: {weather_data}")
             
             # 실제 Agent 사용하여 추천 생성
             agent = create_recommendation_agent()
@@ -604,7 +659,7 @@ async def demo_generate_recommendation(scenario: str = None) -> Dict[str, Any]:
             return recommendation
         
         # 기본 응답
-        print(f"📊 기본 날씨 데이터: {default_weather}")
+        logger.info(f"📊 기본 날씨 데이터: {default_weather}")
         agent = create_recommendation_agent()
         context = f"""
         일반적인 날씨 상황:
@@ -626,7 +681,7 @@ async def demo_generate_recommendation(scenario: str = None) -> Dict[str, Any]:
         return recommendation
         
     except Exception as e:
-        print(f"❌ 데모 추천 생성 실패: {e}")
+        logger.error(f"❌ 데모 추천 생성 실패: {e}")
         import time
         return {
             "title": "데모 추천",
@@ -647,7 +702,7 @@ async def _get_actual_device_id() -> Optional[str]:
         gateway_url = os.getenv("GATEWAY_URL", "http://localhost:9000")
         
         async with aiohttp.ClientSession() as session:
-            async with session.get(f"{gateway_url}/api/lg/devices") as response:
+            async with session.get(f"{gateway_url}/api/lg/devices", headers=propagation_headers()) as response:
                 if response.status == 200:
                     data = await response.json()
                     devices = data.get('response', [])
@@ -658,26 +713,24 @@ async def _get_actual_device_id() -> Optional[str]:
                         if device_info.get("reportable", False):  # 온라인 상태
                             device_id = device.get("deviceId")
                             if device_id:
-                                print(f"✅ 실제 기기 ID 조회 성공: {device_id}")
+                                logger.info(f"✅ 실제 기기 ID 조회 성공: {device_id}")
                                 return device_id
                     
-                    print("⚠️ 온라인 기기를 찾을 수 없음")
+                    logger.warning("⚠️ 온라인 기기를 찾을 수 없음")
                     return None
                 else:
-                    print(f"❌ Gateway API 호출 실패: {response.status}")
+                    logger.error(f"❌ Gateway API 호출 실패: {response.status}")
                     return None
     except Exception as e:
-        print(f"❌ 실제 기기 ID 조회 실패: {e}")
+        logger.error(f"❌ 실제 기기 ID 조회 실패: {e}")
         return None
 
 async def _save_recommendation_to_mongodb(recommendation: Dict[str, Any], mode: str = "demo") -> str:
     """추천을 MongoDB에 저장"""
     try:
-        from app.core.database import get_database
-        from app.services.recommendation_service import RecommendationService
+        from app.services.recommendation_service import get_recommendation_service
         
-        db = await get_database()
-        recommendation_service = RecommendationService(db)
+        recommendation_service = await get_recommendation_service()
         
         # device_control에서 정보 추출 및 변환
         device_control_data = recommendation.get("device_control", {})
@@ -715,14 +768,15 @@ async def _save_recommendation_to_mongodb(recommendation: Dict[str, Any], mode:
             contents=recommendation.get("contents", "AI가 생성한 추천입니다."),
             device_control=device_control,
             user_id="demo_user",
-            mode=mode
+            mode=mode,
+            agent_steps=recommendation.get("agent_steps")
         )
         
-        print(f"✅ MongoDB에 추천 저장 완료: {recommendation_id}")
+        logger.info(f"✅ MongoDB에 추천 저장 완료: {recommendation_id}")
         return recommendation_id
         
     except Exception as e:
-        print(f"❌ MongoDB 저장 실패: {e}")
+        logger.error(f"❌ MongoDB 저장 실패: {e}")
         return None
 
 async def demo_test_agent():
@@ -0,0 +1,229 @@
+"""
+GazeHome AI Services - Agent Step Recorder
+AgentExecutor 실행을 반복(LLM 호출 1회 + 이어서 실행한 도구) 단위로 기록하는 콜백 및 누적 지표
+"""
+
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.core.config import AGENT_STEP_STATS_WINDOW
+from app.core.tracing import current_trace_id
+
+
+class ToolFailure(str):
+    """도구 실패 결과 (LLM에는 메시지 문자열로 그대로 전달하고, 기록에서는 error로 분류)"""
+
+
+def _token_usage(response) -> Dict[str, int]:
+    """LLM 응답의 토큰 수 (메시지 usage_metadata 우선, 없으면 llm_output)"""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {
+                    "prompt_tokens": usage.get("input_tokens", 0),
+                    "completion_tokens": usage.get("output_tokens", 0)
+                }
+    usage = (response.llm_output or {}).get("usage_metadata") or (response.llm_output or {}).get("token_usage") or {}
+    return {
+        "prompt_tokens": usage.get("prompt_token_count", usage.get("prompt_tokens", 0)),
+        "completion_tokens": usage.get("candidates_token_count", usage.get("completion_tokens", 0))
+    }
+
+
+def _tool_calls(response) -> List[str]:
+    """LLM이 고른 도구 이름 (최종 응답이면 빈 리스트)"""
+    names = []
+    for generations in response.generations:
+        for generation in generations:
+            for call in getattr(getattr(generation, "message", None), "tool_calls", None) or []:
+                names.append(call.get("name"))
+    return names
+
+
+class AgentStepRecorder(BaseCallbackHandler):
+    """
+    Agent 실행 한 번의 반복별 기록 (ainvoke config의 callbacks로 전달)
+
+    LLM 호출이 시작될 때마다 새 반복을 열고, 그 뒤에 실행된 도구는 그 반복에 붙인다.
+    도구를 병렬로 호출해도 run_id로 구분한다. 콜백은 이벤트 루프에서 바로 실행한다 (run_inline).
+    """
+
+    run_inline = True
+
+    def __init__(self, model: Optional[str] = None):
+        self.generation_id = uuid.uuid4().hex[:16]
+        self.model = model
+        self.started_at = datetime.now(timezone.utc)
+        self.trace_id = current_trace_id()
+        self.steps: List[Dict[str, Any]] = []
+        self._llm_started: Dict[UUID, tuple] = {}
+        self._tool_started: Dict[UUID, tuple] = {}
+
+    def _open_iteration(self, run_id: UUID):
+        step = {
+            "iteration": len(self.steps) + 1,
+            "llm_ms": None,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "tool_calls": [],
+            "tools": [],
+            "outcome": None
+        }
+        self.steps.append(step)
+        self._llm_started[run_id] = (step, perf_counter())
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+        self._open_iteration(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        self._open_iteration(run_id)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        started = self._llm_started.pop(run_id, None)
+        if started is None:
+            return
+        step, began = started
+        step["llm_ms"] = round((perf_counter() - began) * 1000, 3)
+        step.update(_token_usage(response))
+        step["tool_calls"] = _tool_calls(response)
+        step["outcome"] = "ok"
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        started = self._llm_started.pop(run_id, None)
+        if started is None:
+            return
+        step, began = started
+        step["llm_ms"] = round((perf_counter() - began) * 1000, 3)
+        step["outcome"] = "error"
+
+    def on_tool_start(self, serialized, input_str: str, *, run_id: UUID, **kwargs: Any):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        step = self.steps[-1] if self.steps else None
+        self._tool_started[run_id] = (step, name, perf_counter())
+
+    def _close_tool(self, run_id: UUID, outcome: str):
+        started = self._tool_started.pop(run_id, None)
+        if started is None:
+            return
+        step, name, began = started
+        if step is not None:
+            step["tools"].append({
+                "name": name,
+                "ms": round((perf_counter() - began) * 1000, 3),
+                "outcome": outcome
+            })
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        # 도구 함수는 실패 시 예외 대신 ToolFailure를 돌려줌
+        self._close_tool(run_id, "error" if isinstance(output, ToolFailure) else "ok")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._close_tool(run_id, "error")
+
+    def to_dict(self, total_ms: float, outcome: str) -> Dict[str, Any]:
+        """저장/응답용 요약 (반복별 기록 + 합계)"""
+        llm_ms = sum(step["llm_ms"] or 0.0 for step in self.steps)
+        tool_ms = sum(tool["ms"] for step in self.steps for tool in step["tools"])
+        prompt_tokens = sum(step["prompt_tokens"] for step in self.steps)
+        completion_tokens = sum(step["completion_tokens"] for step in self.steps)
+        return {
+            "generation_id": self.generation_id,
+            "trace_id": self.trace_id,
+            "model": self.model,
+            "started_at": self.started_at,
+            "outcome": outcome,
+            "iterations": len(self.steps),
+            "total_ms": round(total_ms, 3),
+            "llm_ms": round(llm_ms, 3),
+            "tool_ms": round(tool_ms, 3),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "steps": self.steps
+        }
+
+
+class AgentStepStats:
+    """
+    최근 Agent 실행 기록 누적 (최근 window개 표본으로 백분위수 계산)
+
+    도시 단위 재계산처럼 한 번 생성해 여러 추천에 나눠 쓰는 경우에도 생성 1회로 센다.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.runs = 0
+        self.outcomes: Dict[str, int] = defaultdict(int)
+        self._runs: Dict[str, deque] = {
+            name: deque(maxlen=window)
+            for name in ("total_ms", "llm_ms", "tool_ms", "iterations", "prompt_tokens", "completion_tokens", "total_tokens")
+        }
+        # 반복 순번별 LLM 지연/토큰 (어느 반복을 줄일지 판단용)
+        self._iterations: Dict[int, Dict[str, deque]] = {}
+        # 도구별 지연
+        self._tools: Dict[str, deque] = {}
+        self.tool_calls: Dict[str, int] = defaultdict(int)
+
+    def record(self, trace: Dict[str, Any]):
+        self.runs += 1
+        self.outcomes[trace["outcome"]] += 1
+        for name, samples in self._runs.items():
+            samples.append(trace[name])
+        for step in trace["steps"]:
+            samples = self._iterations.get(step["iteration"])
+            if samples is None:
+                samples = self._iterations[step["iteration"]] = {
+                    "llm_ms": deque(maxlen=self.window),
+                    "prompt_tokens": deque(maxlen=self.window),
+                    "completion_tokens": deque(maxlen=self.window)
+                }
+            if step["llm_ms"] is not None:
+                samples["llm_ms"].append(step["llm_ms"])
+            samples["prompt_tokens"].append(step["prompt_tokens"])
+            samples["completion_tokens"].append(step["completion_tokens"])
+            for tool in step["tools"]:
+                self.tool_calls[tool["name"]] += 1
+                self._tools.setdefault(tool["name"], deque(maxlen=self.window)).append(tool["ms"])
+
+    @staticmethod
+    def _percentiles(values) -> Dict[str, float]:
+        samples = sorted(values)
+
+        def percentile(p: float) -> float:
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)], 3) if samples else 0.0
+
+        return {
+            "count": len(samples),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(samples[-1], 3) if samples else 0.0
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """누적 지표 반환 (지연은 ms, 토큰은 개수)"""
+        return {
+            "runs": self.runs,
+            "window": self.window,
+            "outcomes": dict(self.outcomes),
+            "per_run": {name: self._percentiles(samples) for name, samples in self._runs.items()},
+            "per_iteration": {
+                str(iteration): {name: self._percentiles(values) for name, values in samples.items()}
+                for iteration, samples in sorted(self._iterations.items())
+            },
+            "tools": {
+                name: {"calls": self.tool_calls[name], "ms": self._percentiles(samples)}
+                for name, samples in sorted(self._tools.items())
+            }
+        }
+
+
+# 전역 Agent 실행 누적 지표
+agent_step_stats = AgentStepStats(AGENT_STEP_STATS_WINDOW)
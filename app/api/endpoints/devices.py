@@ -8,6 +8,7 @@ from typing import Dict, Any, List
 import logging
 import httpx
 from app.core.config import *
+from app.core.tracing import propagation_headers, traced
 from app.models.lg_control import LGControlRequest, LGControlResponse
 
 router = APIRouter()
@@ -27,6 +28,7 @@ class GatewayClient:
         self.timeout = 10.0
         logger.info(f"GatewayClient 초기화: url={self.gateway_url}")
     
+    @traced("gateway")
     async def get_available_devices(self) -> Dict[str, Any]:
         """Gateway에서 사용 가능한 기기 목록 조회"""
         try:
@@ -35,7 +37,7 @@ class GatewayClient:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.get(
                     self.devices_endpoint,
-                    headers={"Content-Type": "application/json"}
+                    headers={"Content-Type": "application/json", **propagation_headers()}
                 )
                 
                 if response.status_code == 200:
@@ -59,6 +61,7 @@ class GatewayClient:
             logger.error(f"기기 목록 조회 중 예외 발생: {e}")
             raise HTTPException(status_code=500, detail=f"기기 목록 조회 실패: {str(e)}")
     
+    @traced("gateway")
     async def get_device_profile(self, device_id: str) -> Dict[str, Any]:
         """Gateway에서 특정 기기의 상세 정보 조회"""
         try:
@@ -68,7 +71,7 @@ class GatewayClient:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.get(
                     profile_endpoint,
-                    headers={"Content-Type": "application/json"}
+                    headers={"Content-Type": "application/json", **propagation_headers()}
                 )
                 
                 if response.status_code == 200:
@@ -92,6 +95,7 @@ class GatewayClient:
             logger.error(f"기기 프로필 조회 중 예외 발생: {e}")
             raise HTTPException(status_code=500, detail=f"기기 프로필 조회 실패: {str(e)}")
     
+    @traced("gateway")
     async def control_device(self, device_id: str, action: str) -> Dict[str, Any]:
         """Gateway를 통해 LG 기기 제어"""
         try:
@@ -108,7 +112,7 @@ class GatewayClient:
                 response = await client.post(
                     self.control_endpoint,
                     json=payload,
-                    headers={"Content-Type": "application/json"}
+                    headers={"Content-Type": "application/json", **propagation_headers()}
                 )
                 
                 if response.status_code == 200:
@@ -3,7 +3,7 @@ GazeHome AI Services - Recommendations Endpoints
 AI → HW 추천 시스템 API 엔드포인트 (새로운 명세서에 맞춤)
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Dict, Any, List, Optional
 import logging
 import httpx
@@ -12,8 +12,11 @@ from app.core.config import *
 from app.models.recommendations import (
     RecommendationCreateRequest, RecommendationCreateResponse,
     RecommendationConfirmRequest, RecommendationConfirmResponse,
-    HardwareRecommendationRequest, DeviceControl
+    HardwareRecommendationRequest, DeviceControl,
+    RecommendationStatus, RecommendationListItem, RecommendationListResponse
 )
+from app.core.clock import get_clock
+from app.core.tracing import propagation_headers, traced
 from app.services.recommendation_service import get_recommendation_service
 from app.utils.logger import setup_logger
 
@@ -21,6 +24,12 @@ router = APIRouter()
 logger = setup_logger(__name__)
 
 
+def _hardware_outcome(result: Dict[str, Any]) -> str:
+    """하드웨어 응답 분류 (전송 실패도 예외 대신 PENDING 응답으로 돌려줌)"""
+    message = result.get("message", "")
+    return "error" if "실패" in message or "오류" in message else "ok"
+
+
 class HardwareClient:
     """하드웨어 통신 클라이언트"""
     
@@ -30,8 +39,15 @@ class HardwareClient:
         self.timeout = 60.0
         logger.info(f"HardwareClient 초기화: url={self.hardware_url}")
     
-    async def send_recommendation(self, recommendation_id: str, title: str, contents: str) -> Dict[str, Any]:
-        """하드웨어로 추천 전송"""
+    @traced("hardware", outcome=_hardware_outcome)
+    async def send_recommendation(
+        self,
+        recommendation_id: str,
+        title: str,
+        contents: str,
+        device_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """하드웨어로 추천 전송 (device_type은 지표 라벨용, 전송 내용에는 포함하지 않음)"""
         try:
             payload = {
                 "recommendation_id": recommendation_id,
@@ -48,7 +64,7 @@ class HardwareClient:
                 response = await client.post(
                     self.recommendations_endpoint,
                     json=payload,
-                    headers={"Content-Type": "application/json"}
+                    headers={"Content-Type": "application/json", **propagation_headers()}
                 )
                 
                 if response.status_code == 200:
@@ -80,6 +96,73 @@ class HardwareClient:
 hardware_client = HardwareClient()
 
 
+@router.get("/", response_model=RecommendationListResponse)
+async def list_recommendations(
+    user_id: Optional[str] = Query(None, description="사용자 ID"),
+    status: Optional[RecommendationStatus] = Query(None, description="추천 상태"),
+    mode: Optional[str] = Query(None, description="데모/운영 구분 (demo/production)"),
+    limit: int = Query(20, ge=1, le=100, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor")
+):
+    """추천 목록 조회 (created_at, _id 기준 커서 페이지네이션)"""
+    try:
+        recommendation_service = await get_recommendation_service()
+        docs, next_cursor = await recommendation_service.list_recommendations(
+            user_id=user_id,
+            status=status,
+            mode=mode,
+            limit=limit,
+            cursor=cursor
+        )
+        return RecommendationListResponse(
+            items=[RecommendationListItem(**doc) for doc in docs],
+            next_cursor=next_cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ 추천 목록 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"추천 목록 조회 실패: {str(e)}")
+
+
+@router.get("/statistics", response_model=Dict[str, Any])
+async def get_recommendation_statistics(hours: int = Query(24, ge=1, le=168, description="시간대별 통계 조회 범위")):
+    """추천 통계 조회 (증분 카운터 기반)"""
+    recommendation_service = await get_recommendation_service()
+    return await recommendation_service.get_recommendation_statistics(hours=hours)
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def get_recommendation_cache_stats():
+    """추천 조회 캐시 지표 (적중률 등)"""
+    recommendation_service = await get_recommendation_service()
+    return recommendation_service.cache.get_stats()
+
+
+@router.get("/dedup", response_model=Dict[str, Any])
+async def get_recommendation_dedup_stats():
+    """중복 추천 방지 지표 (대체/생략 횟수, 대기 중인 추천 수)"""
+    recommendation_service = await get_recommendation_service()
+    return recommendation_service.get_dedup_stats()
+
+
+@router.get("/agent-steps", response_model=Dict[str, Any])
+async def get_agent_step_stats():
+    """Agent 실행 누적 지표 (실행/반복 순번/도구별 지연·토큰 백분위수)"""
+    from app.agents.step_recorder import agent_step_stats
+    return agent_step_stats.get_stats()
+
+
+@router.get("/{recommendation_id}/agent-steps", response_model=Dict[str, Any])
+async def get_recommendation_agent_steps(recommendation_id: str):
+    """추천 하나의 Agent 반복 기록 (LLM 지연/토큰, 선택한 도구, 도구 지연)"""
+    recommendation_service = await get_recommendation_service()
+    agent_steps = await recommendation_service.get_agent_steps(recommendation_id)
+    if agent_steps is None:
+        raise HTTPException(status_code=404, detail="Agent 반복 기록을 찾을 수 없습니다")
+    return agent_steps
+
+
 @router.post("/generate", response_model=RecommendationCreateResponse)
 async def create_demo_recommendation(request: RecommendationCreateRequest):
     """데모용 추천 생성 및 하드웨어 전송"""
@@ -129,16 +212,23 @@ async def create_demo_recommendation(request: RecommendationCreateRequest):
             contents=ai_recommendation['contents'],
             device_control=device_control,
             user_id=request.user_id,
-            mode="demo"
+            mode="demo",
+            agent_steps=ai_recommendation.get("agent_steps"),
+            # 하드웨어로 보낼 추천은 저장이 확정된 뒤에 전송
+            durable=True
         )
         
         # 하드웨어에 추천 전송
         hardware_response = await hardware_client.send_recommendation(
             recommendation_id,
             ai_recommendation['title'],
-            ai_recommendation['contents']
+            ai_recommendation['contents'],
+            device_type=device_control.device_type
         )
         
+        if not await recommendation_service.mark_hardware_sent(recommendation_id, durable=True):
+            logger.warning(f"⚠️ 하드웨어 전송 완료 표시 실패: {recommendation_id}")
+        
         logger.info(f"✅ 데모 추천 생성 및 하드웨어 전송 완료: {recommendation_id}")
         
         # 응답 반환
@@ -157,11 +247,7 @@ async def feedback_recommendation(request: RecommendationConfirmRequest):
     """하드웨어팀에서 사용자 응답 피드백 처리"""
     try:
         # 추천 서비스 가져오기
-        from app.core.database import get_database
-        from app.services.recommendation_service import RecommendationService
-        
-        db = await get_database()
-        recommendation_service = RecommendationService(db)
+        recommendation_service = await get_recommendation_service()
         
         # 추천 확인 처리
         updated_recommendation = await recommendation_service.confirm_recommendation(
@@ -170,49 +256,39 @@ async def feedback_recommendation(request: RecommendationConfirmRequest):
         )
         
         if not updated_recommendation:
-            raise HTTPException(status_code=404, detail="추천을 찾을 수 없습니다")
+            raise HTTPException(status_code=404, detail="추천을 찾을 수 없거나 이미 처리되었습니다")
         
         # 사용자가 YES로 응답한 경우 기기 제어 실행
         if request.confirm.upper() == "YES" and updated_recommendation.device_control:
             try:
-                # Gateway API로 기기 제어 (actions 배열 지원)
+                # Gateway API로 기기 제어 (생성 시점에 컴파일된 실행 계획 사용)
                 from app.api.endpoints.devices import gateway_client
                 
-                device_control = updated_recommendation.device_control
+                plan = updated_recommendation.control_plan
+                if plan is None:
+                    # 실행 계획 도입 이전에 저장된 추천
+                    plan = await recommendation_service.compile_plan(
+                        updated_recommendation.user_id,
+                        DeviceControl(**updated_recommendation.device_control)
+                    )
                 
-                if device_control.actions:
-                    # 새로운 actions 배열 방식 - 순차적으로 실행
-                    logger.info(f"🎯 액션 시퀀스 실행 시작: {len(device_control.actions)}개 액션")
-                    
-                    # order 순서대로 정렬
-                    sorted_actions = sorted(device_control.actions, key=lambda x: x.order)
-                    
-                    for i, action in enumerate(sorted_actions):
-                        logger.info(f"📋 액션 {i+1}/{len(sorted_actions)} 실행: {action.action} - {action.description}")
-                        
-                        control_result = await gateway_client.control_device(
-                            device_id=device_control.device_id,
-                            action=action.action
-                        )
-                        
-                        logger.info(f"✅ 액션 {i+1} 완료: {control_result}")
-                        
-                        # 지연 시간 적용 (기본 3초, 마지막 액션 제외)
-                        if i < len(sorted_actions) - 1:  # 마지막 액션이 아닌 경우
-                            delay_time = action.delay_seconds if action.delay_seconds > 0 else 3
-                            logger.info(f"⏳ {delay_time}초 대기 중... (기기 제어 간 충분한 간격)")
-                            await asyncio.sleep(delay_time)
-                    
-                    logger.info(f"🎉 모든 액션 시퀀스 실행 완료!")
+                logger.info(f"🎯 액션 시퀀스 실행 시작: {len(plan.steps)}개 액션")
+                
+                for i, step in enumerate(plan.steps):
+                    logger.info(f"📋 액션 {i+1}/{len(plan.steps)} 실행: {step.action} - {step.description}")
                     
-                else:
-                    # 기존 단일 action 방식 (하위 호환성)
                     control_result = await gateway_client.control_device(
-                        device_id=device_control.device_id,
-                        action=device_control.action
+                        device_id=plan.device_id,
+                        action=step.action
                     )
                     
-                    logger.info(f"✅ 기기 제어 실행 완료: {control_result}")
+                    logger.info(f"✅ 액션 {i+1} 완료: {control_result}")
+                    
+                    if step.delay_after_seconds:
+                        logger.info(f"⏳ {step.delay_after_seconds}초 대기 중... (기기 제어 간 충분한 간격)")
+                        await get_clock().sleep(step.delay_after_seconds)
+                
+                logger.info(f"🎉 모든 액션 시퀀스 실행 완료!")
                     
             except Exception as e:
                 logger.warning(f"⚠️ 기기 제어 실행 실패: {e}")
@@ -3,7 +3,7 @@
 스마트 홈 추천 스케줄러를 시작/중지하고 상태를 확인할 수 있는 API
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional
 import logging
@@ -19,16 +19,44 @@ class SchedulerStartRequest(BaseModel):
     user_id: str = Field(default="default_user", description="사용자 ID")
     interval_minutes: int = Field(default=30, ge=1, le=1440, description="실행 간격 (분)")
 
+class SchedulerUserRequest(BaseModel):
+    """사용자 스케줄 등록/재조정 요청"""
+    user_id: str = Field(..., description="사용자 ID")
+    interval_minutes: int = Field(default=30, ge=1, le=1440, description="실행 간격 (분)")
+    location: Optional[str] = Field(default=None, description="날씨 위치 (예: 'Seoul,KR', 기본: SCHEDULER_WEATHER_LOCATION)")
+
 class SchedulerStatusResponse(BaseModel):
     """스케줄러 상태 응답"""
     is_running: bool
-    user_id: str
+    scheduled_users: int
     interval_minutes: int
+    next_due: Optional[str] = None
+    lag_seconds: float
+    last_lag_seconds: float
+    late_skips: int
+    missed_slots: int
     last_check: str
+    executor: Dict[str, Any]
+    triggers: Dict[str, Any]
+    standby_skips: int = 0
+    fenced_runs: int = 0
+    leadership: Optional[Dict[str, Any]] = None
+    persistence: Optional[Dict[str, Any]] = None
+    weather: Optional[Dict[str, Any]] = None
+
+class SchedulerUserStatusResponse(BaseModel):
+    """사용자별 스케줄 상태 응답"""
+    user_id: str
+    interval_minutes: int
+    location: Optional[str] = None
+    next_run: Optional[str] = None
+    last_run: Optional[str] = None
+    last_result: Optional[str] = None
 
 class RecommendationTestResponse(BaseModel):
     """추천 테스트 응답"""
     should_recommend: bool
+    trigger: Optional[str] = None
     title: Optional[str] = None
     contents: Optional[str] = None
     reason: Optional[str] = None
@@ -69,11 +97,49 @@ async def get_scheduler_status():
         logger.error(f"스케줄러 상태 확인 실패: {e}")
         raise HTTPException(status_code=500, detail=f"상태 확인 실패: {e}")
 
+@router.get("/histogram", response_model=Dict[str, Any])
+async def get_scheduler_histogram(
+    bucket_seconds: int = Query(60, ge=1, le=3600, description="버킷 크기 (초)"),
+    horizon_seconds: Optional[int] = Query(None, ge=60, le=86400, description="조회 범위 (초, 기본: 최대 간격)")
+):
+    """실행 예정 시각 분포 (부하 분산 확인용)"""
+    return scheduler_service.get_due_histogram(bucket_seconds, horizon_seconds)
+
+@router.post("/users", response_model=SchedulerUserStatusResponse)
+async def add_scheduler_user(request: SchedulerUserRequest):
+    """사용자 스케줄 등록 (이미 있으면 간격 재조정)"""
+    scheduler_service.add_user(request.user_id, request.interval_minutes, location=request.location)
+    return SchedulerUserStatusResponse(**scheduler_service.get_user_status(request.user_id))
+
+@router.get("/users/{user_id}", response_model=SchedulerUserStatusResponse)
+async def get_scheduler_user(user_id: str):
+    """사용자별 스케줄 상태 확인"""
+    status = scheduler_service.get_user_status(user_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"스케줄에 등록되지 않은 사용자: {user_id}")
+    return SchedulerUserStatusResponse(**status)
+
+@router.delete("/users/{user_id}", response_model=Dict[str, str])
+async def remove_scheduler_user(user_id: str):
+    """사용자 스케줄 제거"""
+    if not scheduler_service.remove_user(user_id):
+        raise HTTPException(status_code=404, detail=f"스케줄에 등록되지 않은 사용자: {user_id}")
+    return {"message": f"사용자 {user_id}의 스케줄이 제거되었습니다"}
+
+@router.post("/fanout", response_model=Dict[str, Any])
+async def fan_out_location(location: str = Query(..., description="날씨 위치 (예: 'Seoul,KR')")):
+    """위치의 모든 사용자 추천 일괄 재계산 (날씨 구간 변화 감시를 기다리지 않고 즉시 실행)"""
+    try:
+        return await scheduler_service.fan_out(location)
+    except Exception as e:
+        logger.error(f"도시 단위 추천 재계산 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"도시 단위 추천 재계산 실패: {e}")
+
 @router.post("/test", response_model=RecommendationTestResponse)
-async def test_recommendation(user_id: str = "default_user"):
-    """추천 테스트 (한 번만 실행)"""
+async def test_recommendation(user_id: str = "default_user", force: bool = True):
+    """추천 테스트 (한 번만 실행, force=false면 트리거 판단 적용)"""
     try:
-        result = await scheduler_service.run_once(user_id)
+        result = await scheduler_service.run_once(user_id, force=force)
         return RecommendationTestResponse(**result)
     except Exception as e:
         logger.error(f"추천 테스트 실패: {e}")
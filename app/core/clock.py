@@ -0,0 +1,180 @@
+"""
+GazeHome AI Services - Clock
+시간 조회/대기 추상화 (실제 시계 / 테스트·시뮬레이션용 가상 시계)
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Tuple
+
+# 한국 표준시 (UTC+9)
+KST = timezone(timedelta(hours=9))
+
+
+class Clock(ABC):
+    """시계 인터페이스 (epoch 초 기준)"""
+
+    @abstractmethod
+    def time(self) -> float:
+        """현재 epoch 초"""
+
+    @abstractmethod
+    def monotonic(self) -> float:
+        """경과 시간 측정용 단조 시각"""
+
+    @abstractmethod
+    async def sleep(self, seconds: float):
+        """seconds 동안 대기"""
+
+    def now(self) -> datetime:
+        """현재 KST 시각"""
+        return datetime.fromtimestamp(self.time(), KST)
+
+    def utcnow(self) -> datetime:
+        """현재 UTC 시각 (tz 없음, MongoDB 저장용)"""
+        return datetime.utcfromtimestamp(self.time())
+
+    async def wait(self, event: asyncio.Event, timeout: Optional[float] = None) -> bool:
+        """이벤트가 설정되거나 timeout이 지날 때까지 대기, 이벤트 설정 여부 반환"""
+        if timeout is None:
+            await event.wait()
+            return True
+        waiter = asyncio.ensure_future(event.wait())
+        sleeper = asyncio.ensure_future(self.sleep(timeout))
+        try:
+            await asyncio.wait((waiter, sleeper), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+            sleeper.cancel()
+        return event.is_set()
+
+
+class SystemClock(Clock):
+    """실제 시계"""
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait(self, event: asyncio.Event, timeout: Optional[float] = None) -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+def _task_position(task: asyncio.Task) -> Tuple[Tuple[Any, int], ...]:
+    """태스크의 현재 실행 위치 - await 체인을 따라간 코루틴 프레임별 (프레임, 명령 위치)"""
+    position = []
+    awaitable: Any = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        position.append((frame, frame.f_lasti))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return tuple(position)
+
+
+class VirtualClock(Clock):
+    """
+    가상 시계
+
+    sleep은 가상 시각 기준 대기열에 등록만 하고, run_until/advance가
+    다른 태스크가 모두 멈출 때까지 이벤트 루프를 돌린 뒤 가장 이른 대기 시각으로
+    시간을 건너뛴다. 모든 I/O가 같은 프로세스 안에서 끝나는 경우
+    (메모리 저장소, 가짜 LLM/외부 서버)에만 실제 대기 없이 정확하게 진행된다.
+    """
+
+    def __init__(self, start: Optional[float] = None, max_settle_rounds: int = 1000, idle_rounds: int = 3):
+        self._now = time.time() if start is None else start
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.max_settle_rounds = max_settle_rounds
+        self.idle_rounds = idle_rounds
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._now + seconds, next(self._seq), future))
+        await future
+
+    @property
+    def pending_sleepers(self) -> int:
+        return sum(1 for _, _, future in self._sleepers if not future.done())
+
+    async def settle(self):
+        """
+        다른 태스크가 더 진행할 수 없을 때까지 이벤트 루프 양보
+
+        양보할 때마다 진행 중인 태스크의 실행 위치를 비교해 idle_rounds번 연속으로
+        아무 태스크도 진행하지 않으면 멈춘다 (완료 콜백이 기다리던 태스크를 깨우기까지
+        루프가 몇 회 더 도는 것을 감안). 최대 max_settle_rounds번까지만 양보한다.
+        """
+        current = asyncio.current_task()
+        last = None
+        idle = 0
+        for _ in range(self.max_settle_rounds):
+            await asyncio.sleep(0)
+            positions = {task: _task_position(task) for task in asyncio.all_tasks() if task is not current}
+            if positions == last:
+                idle += 1
+                if idle >= self.idle_rounds:
+                    break
+            else:
+                idle = 0
+            last = positions
+
+    async def run_until(self, deadline: float):
+        """deadline까지 대기 시각 순서대로 시간을 진행"""
+        while True:
+            await self.settle()
+            while self._sleepers and self._sleepers[0][2].done():
+                heapq.heappop(self._sleepers)  # 취소된 대기
+            if not self._sleepers or self._sleepers[0][0] > deadline:
+                self._now = max(self._now, deadline)
+                await self.settle()
+                return
+            wake_at = self._sleepers[0][0]
+            self._now = max(self._now, wake_at)
+            while self._sleepers and self._sleepers[0][0] <= wake_at:
+                _, _, future = heapq.heappop(self._sleepers)
+                if not future.done():
+                    future.set_result(None)
+
+    async def advance(self, seconds: float):
+        """seconds만큼 시간 진행"""
+        await self.run_until(self._now + seconds)
+
+
+# 전역 시계 (기본: 실제 시계)
+_clock: Clock = SystemClock()
+
+
+def get_clock() -> Clock:
+    """전역 시계 반환"""
+    return _clock
+
+
+def set_clock(clock: Clock):
+    """전역 시계 교체 (시뮬레이션/테스트용)"""
+    global _clock
+    _clock = clock
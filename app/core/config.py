@@ -31,11 +31,50 @@ ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "*").split(",")
 MONGODB_URL = os.getenv("MONGODB_URL")
 MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "gazehome")
 
+# MongoDB 커넥션 풀 설정 (모든 서비스가 하나의 클라이언트를 공유)
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+# 저장소 백엔드 (mongodb / memory) - 메모리 저장소(재시작 시 유실, 리더 리스 없음)는 명시적으로만 사용
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongodb").lower()
+
+
+def check_storage_config():
+    """저장소 설정 확인 (애플리케이션 시작 시 호출, 잘못된 설정이면 RuntimeError)"""
+    if STORAGE_BACKEND not in ("mongodb", "memory"):
+        raise RuntimeError(f"지원하지 않는 STORAGE_BACKEND: {STORAGE_BACKEND} (mongodb / memory)")
+    if STORAGE_BACKEND == "mongodb" and not MONGODB_URL:
+        raise RuntimeError("MONGODB_URL이 설정되지 않았습니다 (메모리 저장소는 STORAGE_BACKEND=memory로 지정)")
+
+
+# 추천 쓰기 배치 설정 (write-behind)
+RECOMMENDATION_WRITE_BATCH_SIZE = int(os.getenv("RECOMMENDATION_WRITE_BATCH_SIZE", "100"))
+RECOMMENDATION_WRITE_LINGER_MS = int(os.getenv("RECOMMENDATION_WRITE_LINGER_MS", "50"))
+
+# 추천 통계 재계산 주기 (분)
+STATS_RECONCILE_INTERVAL_MINUTES = int(os.getenv("STATS_RECONCILE_INTERVAL_MINUTES", "60"))
+
+# 추천 수명 주기 설정 (만료/아카이브)
+RECOMMENDATION_PENDING_TTL_HOURS = int(os.getenv("RECOMMENDATION_PENDING_TTL_HOURS", "24"))
+RECOMMENDATION_ARCHIVE_AFTER_HOURS = int(os.getenv("RECOMMENDATION_ARCHIVE_AFTER_HOURS", "24"))
+RECOMMENDATION_ARCHIVE_TTL_DAYS = int(os.getenv("RECOMMENDATION_ARCHIVE_TTL_DAYS", "90"))
+LIFECYCLE_SWEEP_INTERVAL_MINUTES = int(os.getenv("LIFECYCLE_SWEEP_INTERVAL_MINUTES", "10"))
+# 만료/아카이브 작업도 리스를 보유한 인스턴스 하나만 실행 (SCHEDULER_LEASE_ENABLED/TTL 설정 공유)
+LIFECYCLE_LEASE_NAME = os.getenv("LIFECYCLE_LEASE_NAME", "lifecycle")
+
+# 추천 조회 캐시 설정 (생성~확인 구간)
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "10000"))
+RECOMMENDATION_CACHE_TTL_SECONDS = int(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "1800"))
+
 # =============================================================================
 # AI API 설정
 # =============================================================================
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = "gemini-2.0-flash"
+# Agent 반복별 기록 백분위수 계산에 쓰는 최근 실행 수
+AGENT_STEP_STATS_WINDOW = int(os.getenv("AGENT_STEP_STATS_WINDOW", "1000"))
 
 # =============================================================================
 # Weather MCP 설정
@@ -71,10 +110,63 @@ MOCK_HARDWARE_HOST = os.getenv("MOCK_HARDWARE_HOST", "0.0.0.0")
 # =============================================================================
 SCHEDULER_AUTO_START = os.getenv("SCHEDULER_AUTO_START", "false").lower() == "true"
 SCHEDULER_INTERVAL_MINUTES = int(os.getenv("SCHEDULER_INTERVAL_MINUTES", "30"))
+# 스케줄러 실행기 (워커 수, 대기 큐 크기, 이전 실행이 끝나지 않았을 때 skip/merge)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+SCHEDULER_QUEUE_SIZE = int(os.getenv("SCHEDULER_QUEUE_SIZE", "100"))
+SCHEDULER_OVERLAP_POLICY = os.getenv("SCHEDULER_OVERLAP_POLICY", "skip").lower()
+# 실행 슬롯보다 이 시간 이상 늦으면 해당 회차를 건너뛰고 다음 슬롯으로 (초)
+SCHEDULER_CATCHUP_GRACE_SECONDS = int(os.getenv("SCHEDULER_CATCHUP_GRACE_SECONDS", "300"))
+# 추천 트리거 (온도/습도 구간 폭, 시간대 경계 시각, 변화가 없어도 실행하는 조용한 기간)
+TRIGGER_TEMPERATURE_BAND = float(os.getenv("TRIGGER_TEMPERATURE_BAND", "2.0"))
+TRIGGER_HUMIDITY_BAND = float(os.getenv("TRIGGER_HUMIDITY_BAND", "10"))
+TRIGGER_TIME_BOUNDARIES = [int(h) for h in os.getenv("TRIGGER_TIME_BOUNDARIES", "6,9,12,18,22").split(",")]
+TRIGGER_QUIET_PERIOD_MINUTES = int(os.getenv("TRIGGER_QUIET_PERIOD_MINUTES", "180"))
+SCHEDULER_WEATHER_LOCATION = os.getenv("SCHEDULER_WEATHER_LOCATION", "Seoul,KR")
+# 위치별 날씨 캐시 유효 시간 (초) / 날씨 구간 변화 감시 주기 (초, 0이면 도시 단위 일괄 재계산 끔)
+WEATHER_CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL_SECONDS", "300"))
+WEATHER_FANOUT_POLL_SECONDS = int(os.getenv("WEATHER_FANOUT_POLL_SECONDS", "600"))
+# 위치별 예보 일괄 갱신 주기 (초) / 조회할 예보 기간 (일, 3시간 간격, 최대 5일)
+WEATHER_FORECAST_REFRESH_SECONDS = int(os.getenv("WEATHER_FORECAST_REFRESH_SECONDS", "10800"))
+WEATHER_FORECAST_DAYS = int(os.getenv("WEATHER_FORECAST_DAYS", "2"))
+# 이 시간 뒤 예상 날씨가 다른 구간이면 미리 추천 (분, 0이면 예보 트리거 끔)
+TRIGGER_FORECAST_HORIZON_MINUTES = int(os.getenv("TRIGGER_FORECAST_HORIZON_MINUTES", "120"))
+# 자동 시작 시 등록할 사용자 (쉼표로 여러 명 지정 가능)
 SCHEDULER_USER_ID = os.getenv("SCHEDULER_USER_ID", "default_user")
+# 스케줄 상태 저장 주기 (초, 변경된 사용자만 일괄 저장) / 재시작 시 밀린 실행을 나눠 실행할 구간 (초)
+SCHEDULER_STATE_PERSIST_SECONDS = int(os.getenv("SCHEDULER_STATE_PERSIST_SECONDS", "60"))
+SCHEDULER_RESTART_SPREAD_SECONDS = int(os.getenv("SCHEDULER_RESTART_SPREAD_SECONDS", "300"))
+# 여러 워커/레플리카에서 스케줄러 리더 하나만 실행 (MongoDB 리스, 메모리 백엔드에서는 기본 비활성)
+SCHEDULER_LEASE_ENABLED = os.getenv("SCHEDULER_LEASE_ENABLED", str(STORAGE_BACKEND == "mongodb")).lower() == "true"
+SCHEDULER_LEASE_NAME = os.getenv("SCHEDULER_LEASE_NAME", "scheduler")
+# 리스 유효 시간 / 연장 주기 (초) - 리더 장애 시 최대 TTL 만큼 뒤에 다른 인스턴스가 이어받음
+# 인스턴스 간 시계 오차는 SCHEDULER_LEASE_SAFETY_MARGIN_SECONDS보다 작아야 함
+SCHEDULER_LEASE_TTL_SECONDS = float(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "30"))
+SCHEDULER_LEASE_RENEW_SECONDS = float(os.getenv("SCHEDULER_LEASE_RENEW_SECONDS", "10"))
+SCHEDULER_LEASE_SAFETY_MARGIN_SECONDS = float(os.getenv("SCHEDULER_LEASE_SAFETY_MARGIN_SECONDS", "2"))
+# 리스 보유자 식별자 (기본: 호스트명:PID)
+SCHEDULER_INSTANCE_ID = os.getenv("SCHEDULER_INSTANCE_ID")
+
+# =============================================================================
+# 추적 설정 (외부 수집기 없이 메모리에 보관)
+# =============================================================================
+# 이 시간 이상 걸린 요청/실행만 느린 추적 버퍼에 보관 (ms) / 버퍼 크기 / 추적당 최대 span 수
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000"))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "500"))
 
 # =============================================================================
 # 로깅 설정
 # =============================================================================
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# 출력 형식 (json / text) 및 로그 큐 크기 (가득 차면 INFO 이하는 버리고 WARNING 이상은 stderr로 바로 씀)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 로거별 INFO 이하 표본 비율 (예: "app.services.scheduler_service=0.1,app.agents=0.5")
+LOG_SAMPLING = {
+    name.strip(): float(rate)
+    for name, rate in (item.split("=", 1) for item in os.getenv("LOG_SAMPLING", "").split(",") if "=" in item)
+}
+# 호출 위치별 INFO 이하 초당 로그 수 제한 (기본 0: 끔, 로그 폭주 시에만 설정) / 순간 허용량
+LOG_RATE_LIMIT_PER_SECOND = float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", "0"))
+LOG_RATE_LIMIT_BURST = int(os.getenv("LOG_RATE_LIMIT_BURST", "50"))
 
@@ -1,12 +1,20 @@
 """
 GazeHome AI Services - Database Configuration
-MongoDB 연결 및 데이터베이스 관리
+MongoDB 연결 및 데이터베이스 관리 (모든 서비스가 공유하는 단일 클라이언트)
 """
 
 import logging
-from typing import Optional
+from collections import deque
+from typing import Optional, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from app.core.config import MONGODB_URL, MONGODB_DATABASE
+from pymongo import monitoring
+from app.core.metrics import STAGE_SECONDS
+from app.core.tracing import Span, current_trace
+from app.core.config import (
+    MONGODB_URL, MONGODB_DATABASE,
+    MONGODB_MAX_POOL_SIZE, MONGODB_MIN_POOL_SIZE,
+    MONGODB_MAX_IDLE_TIME_MS, MONGODB_SERVER_SELECTION_TIMEOUT_MS
+)
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +23,124 @@ _client: Optional[AsyncIOMotorClient] = None
 _database: Optional[AsyncIOMotorDatabase] = None
 
 
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    커넥션 풀 지표 수집기
+
+    체크아웃 대기 시간(최근 max_samples개)과 사용 중/열린 커넥션 수를 집계한다.
+    이벤트는 pymongo 내부 스레드에서 호출되므로 정수 증감과 deque 추가만 수행한다.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self.wait_ms = deque(maxlen=max_samples)
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.in_use = 0
+        self.open = 0
+        self.pool_clears = 0
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        self.checkouts += 1
+        self.in_use += 1
+        if event.duration is not None:
+            self.wait_ms.append(event.duration * 1000)
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+        logger.warning(f"⚠️ MongoDB 커넥션 체크아웃 실패: {event.reason}")
+
+    def connection_checked_in(self, event):
+        self.in_use -= 1
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """풀 지표 반환 (대기 시간은 ms)"""
+        samples = sorted(self.wait_ms)
+
+        def percentile(p: float) -> float:
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)], 3) if samples else 0.0
+
+        return {
+            "max_pool_size": MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": MONGODB_MIN_POOL_SIZE,
+            "connections_open": self.open,
+            "connections_in_use": self.in_use,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "pool_clears": self.pool_clears,
+            "checkout_wait_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(samples[-1], 3) if samples else 0.0
+            }
+        }
+
+
+# 전역 풀 지표 수집기
+pool_metrics = PoolMetrics()
+
+
+class CommandTracer(monitoring.CommandListener):
+    """
+    MongoDB 명령 소요 시간 기록
+
+    명령마다 mongo 단계 히스토그램에 관측하고, 추적 중이면 span으로도 남긴다.
+    Motor는 실행기 스레드에 컨텍스트를 복사해 넘기므로 시작 이벤트에서 현재 추적을 볼 수 있다.
+    """
+
+    def __init__(self):
+        self._spans: Dict[Any, Span] = {}
+
+    def started(self, event):
+        trace = current_trace()
+        if trace is not None:
+            span = trace.open_span("mongo", event.command_name)
+            if span is not None:
+                self._spans[(event.connection_id, event.request_id)] = span
+
+    def _finish(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        STAGE_SECONDS.observe(seconds, "mongo", event.command_name, "none", outcome)
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.duration = seconds
+            span.outcome = outcome
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+# 전역 명령 추적기
+command_tracer = CommandTracer()
+
+
 async def get_database() -> AsyncIOMotorDatabase:
     """MongoDB 데이터베이스 인스턴스 반환"""
     global _database
@@ -26,16 +152,31 @@ async def get_database() -> AsyncIOMotorDatabase:
 
 
 async def connect_to_mongo():
-    """MongoDB에 연결"""
+    """MongoDB에 연결 (풀 설정 적용)"""
     global _client, _database
     
+    if _client is not None:
+        return
+    if not MONGODB_URL:
+        raise RuntimeError("MONGODB_URL이 설정되지 않았습니다 (메모리 저장소는 STORAGE_BACKEND=memory로 지정)")
+    
     try:
-        _client = AsyncIOMotorClient(MONGODB_URL)
+        _client = AsyncIOMotorClient(
+            MONGODB_URL,
+            maxPoolSize=MONGODB_MAX_POOL_SIZE,
+            minPoolSize=MONGODB_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+            serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=[pool_metrics, command_tracer]
+        )
         _database = _client[MONGODB_DATABASE]
         
         # 연결 테스트
         await _client.admin.command('ping')
-        logger.info("✅ MongoDB 연결 성공")
+        logger.info(
+            f"✅ MongoDB 연결 성공 (풀: {MONGODB_MIN_POOL_SIZE}~{MONGODB_MAX_POOL_SIZE}, "
+            f"유휴 {MONGODB_MAX_IDLE_TIME_MS}ms)"
+        )
         
     except Exception as e:
         logger.error(f"❌ MongoDB 연결 실패: {e}")
@@ -44,8 +185,10 @@ async def connect_to_mongo():
 
 async def close_mongo_connection():
     """MongoDB 연결 종료"""
-    global _client
+    global _client, _database
     
     if _client:
         _client.close()
+        _client = None
+        _database = None
         logger.info("✅ MongoDB 연결 종료")
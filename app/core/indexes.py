@@ -0,0 +1,154 @@
+"""
+GazeHome AI Services - MongoDB Index Management
+컬렉션별 필수 인덱스 선언, 생성 및 쿼리 플랜 검증
+"""
+
+import logging
+from typing import Dict, List, Any
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.config import RECOMMENDATION_ARCHIVE_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+# 컬렉션별 필수 인덱스
+INDEX_SPECS: Dict[str, List[IndexModel]] = {
+    "recommendations": [
+        # 피드백마다 조회되는 추천 ID
+        IndexModel([("recommendation_id", ASCENDING)], name="recommendation_id_unique", unique=True),
+        # 상태별 최신순 조회 / 커서 페이지네이션 (created_at, _id)
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_created_at_id"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_at_id"
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        # 사용자/기기별 대기 중인 추천 (중복 추천 방지) - 대기 상태 문서만 색인
+        IndexModel(
+            [("user_id", ASCENDING), ("device_control.device_id", ASCENDING)],
+            name="pending_user_device",
+            partialFilterExpression={"status": "pending"}
+        ),
+    ],
+    "user_devices": [
+        # 사용자 기기 조회 (user_id + device_id + is_active), 중복 등록 감지
+        IndexModel(
+            [("user_id", ASCENDING), ("device_id", ASCENDING)],
+            name="user_device_unique", unique=True
+        ),
+    ],
+    "recommendations_archive": [
+        # 아카이브 보관 기간 (TTL)
+        IndexModel(
+            [("archived_at", ASCENDING)],
+            name="archived_at_ttl",
+            expireAfterSeconds=RECOMMENDATION_ARCHIVE_TTL_DAYS * 24 * 60 * 60
+        ),
+        IndexModel([("recommendation_id", ASCENDING)], name="recommendation_id"),
+    ],
+    "recommendation_stats": [
+        # 차원별 카운터 조회
+        IndexModel([("dimension", ASCENDING)], name="dimension"),
+    ],
+    "recommendation_agent_steps": [
+        # 추천별 Agent 반복 기록 조회 (중복으로 생략된 생성도 같은 추천 ID로 저장)
+        IndexModel(
+            [("recommendation_id", ASCENDING), ("generation_id", ASCENDING)],
+            name="recommendation_generation_unique", unique=True
+        ),
+        # 아카이브된 추천과 같은 기간만 보관 (TTL)
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=RECOMMENDATION_ARCHIVE_TTL_DAYS * 24 * 60 * 60
+        ),
+    ],
+}
+
+
+# 인덱스를 반드시 타야 하는 핫 쿼리 (컬렉션, 필터, 정렬)
+HOT_QUERIES: List[Dict[str, Any]] = [
+    {
+        "collection": "recommendations",
+        "filter": {"recommendation_id": "rec_explain_probe"},
+        "sort": None,
+    },
+    {
+        "collection": "recommendations",
+        "filter": {"status": "pending"},
+        "sort": [("created_at", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "collection": "recommendations",
+        "filter": {"user_id": "explain_probe"},
+        "sort": [("created_at", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "collection": "recommendations",
+        "filter": {"user_id": "explain_probe", "status": "pending"},
+        "sort": None,
+    },
+    {
+        "collection": "user_devices",
+        "filter": {"user_id": "explain_probe", "device_id": "explain_probe", "is_active": True},
+        "sort": None,
+    },
+]
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """선언된 인덱스 생성 (이미 존재하면 변경 없음)"""
+    created = {}
+    for collection_name, indexes in INDEX_SPECS.items():
+        try:
+            names = await db[collection_name].create_indexes(indexes)
+            created[collection_name] = names
+            logger.info(f"✅ 인덱스 확인 완료: {collection_name} -> {names}")
+        except OperationFailure as e:
+            # 같은 이름의 다른 스펙 인덱스가 있거나 unique 위반 데이터가 있는 경우
+            logger.error(f"❌ 인덱스 생성 실패: {collection_name} - {e}")
+            created[collection_name] = []
+    return created
+
+
+def _collect_stages(plan: Dict[str, Any]) -> List[str]:
+    """쿼리 플랜 트리에서 stage 이름 수집"""
+    stages = [plan.get("stage")] if plan.get("stage") else []
+    if "inputStage" in plan:
+        stages.extend(_collect_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_collect_stages(child))
+    # SBE 플랜은 queryPlan 아래에 트리가 위치
+    if "queryPlan" in plan:
+        stages.extend(_collect_stages(plan["queryPlan"]))
+    return stages
+
+
+async def verify_query_plans(db: AsyncIOMotorDatabase) -> Dict[str, bool]:
+    """핫 쿼리가 인덱스를 사용하는지 explain으로 확인"""
+    results = {}
+    for query in HOT_QUERIES:
+        key = f"{query['collection']}:{sorted(query['filter'].keys())}"
+        try:
+            cursor = db[query["collection"]].find(query["filter"])
+            if query["sort"]:
+                cursor = cursor.sort(query["sort"])
+            explain = await cursor.explain()
+            winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+            stages = _collect_stages(winning_plan)
+            uses_index = "COLLSCAN" not in stages
+            results[key] = uses_index
+
+            if uses_index:
+                logger.info(f"✅ 쿼리 플랜 확인: {key} -> {stages}")
+            else:
+                logger.warning(f"⚠️ 컬렉션 스캔 발생: {key} -> {stages}")
+        except Exception as e:
+            logger.warning(f"⚠️ 쿼리 플랜 확인 실패: {key} - {e}")
+            results[key] = False
+    return results
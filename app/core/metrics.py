@@ -0,0 +1,267 @@
+"""
+GazeHome AI Services - Metrics
+단계별 지연 히스토그램과 카운터 (Prometheus 텍스트 형식으로 /metrics에 노출)
+"""
+
+import functools
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 기본 지연 버킷 (초) - 기기 제어/Mongo(ms 단위)부터 LLM Agent(수십 초)까지
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # 버킷별 개수 (누적 아님, 마지막 칸은 +Inf)
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        """라벨 조합 하나의 시계열"""
+
+    def labels(self, *values: str):
+        """라벨 값 조합별 시계열 (처음 쓰는 조합이면 생성)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 {self.labelnames}에 맞지 않는 값 {values}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def header(self, name: Optional[str] = None) -> List[str]:
+        name = name or self.name
+        return [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.kind}"]
+
+    @abstractmethod
+    def collect(self) -> List[str]:
+        """Prometheus 텍스트 형식 줄"""
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, *values: str, amount: float = 1.0):
+        self.labels(*values).inc(amount)
+
+    def collect(self) -> List[str]:
+        # 텍스트 형식 0.0.4에서는 카운터 이름 자체에 _total을 붙여 노출
+        lines = self.header(f"{self.name}_total")
+        for values, child in sorted(self._children.items()):
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    지연 히스토그램
+
+    관측 한 번은 버킷 이분 탐색 + 정수/실수 덧셈뿐이며 락을 잡지 않는다.
+    Agent 도구가 실행되는 별도 스레드에서 동시에 관측하면 드물게 개수가 누락될 수 있지만
+    지연 분포 확인 용도로는 충분하다.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets if b != math.inf))
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float, *values: str):
+        child = self._children.get(values) or self.labels(*values)
+        child.counts[bisect_left(self.upper_bounds, value)] += 1
+        child.sum += value
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.upper_bounds + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """지표 등록 및 Prometheus 텍스트 형식(0.0.4) 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# 전역 지표 저장소
+registry = MetricsRegistry()
+
+# 단계별 소요 시간 (stage: agent/tool/gateway/hardware/recommendation/scheduler)
+STAGE_SECONDS = registry.histogram(
+    "gazehome_stage_duration_seconds",
+    "단계별 소요 시간 (초)",
+    ("stage", "operation", "device_type", "outcome")
+)
+_STAGE_CHILDREN = STAGE_SECONDS._children
+_STAGE_BOUNDS = STAGE_SECONDS.upper_bounds
+# 스케줄러 판단 결과 (실행 트리거 / 건너뛴 사유)
+SCHEDULER_DECISIONS = registry.counter(
+    "gazehome_scheduler_decisions",
+    "스케줄러 판단 결과",
+    ("decision", "reason")
+)
+# 추천 저장 결과 (created / superseded / duplicate)
+RECOMMENDATION_RESULTS = registry.counter(
+    "gazehome_recommendations",
+    "추천 저장 결과",
+    ("result", "device_type")
+)
+
+
+class StageTimer:
+    """
+    단계 소요 시간 측정 (with / async with)
+
+    블록 안에서 device_type, outcome을 정할 수 있고, 정하지 않으면
+    device_type="none", outcome은 예외 여부에 따라 "error" 또는 "ok"로 기록한다.
+    지표만 기록한다 - 추적 span도 남기려면 app.core.tracing.TracedStageTimer를 쓴다.
+    """
+
+    __slots__ = ("stage", "operation", "device_type", "outcome", "started")
+
+    def __init__(self, stage: str, operation: str, device_type: Optional[str] = None):
+        self.stage = stage
+        self.operation = operation
+        self.device_type = device_type
+        self.outcome: Optional[str] = None
+
+    def __enter__(self) -> "StageTimer":
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = perf_counter() - self.started
+        outcome = self.outcome or ("ok" if exc_type is None else "error")
+        # 관측 경로를 짧게 유지하려고 Histogram.observe를 풀어 씀
+        key = (self.stage, self.operation, self.device_type or "none", outcome)
+        child = _STAGE_CHILDREN.get(key) or STAGE_SECONDS.labels(*key)
+        child.counts[bisect_left(_STAGE_BOUNDS, elapsed)] += 1
+        child.sum += elapsed
+        return False
+
+    async def __aenter__(self) -> "StageTimer":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
+
+
+def stage_timer(stage: str, operation: str, device_type: Optional[str] = None) -> StageTimer:
+    """StageTimer 생성 (with stage_timer("gateway", "control") as timer: ...)"""
+    return StageTimer(stage, operation, device_type)
+
+
+def timed(
+    stage: str,
+    operation: Optional[str] = None,
+    outcome: Optional[Callable[[Any], str]] = None,
+    device_type: Optional[Callable[[Any], Optional[str]]] = None,
+    timer_class: Callable[..., StageTimer] = StageTimer
+):
+    """
+    async 함수 소요 시간 기록 데코레이터
+
+    operation 기본값은 함수 이름이다. device_type 키워드 인자가 있으면 라벨로 쓰고,
+    outcome/device_type 함수가 있으면 반환값으로 결과와 기기 종류를 정한다
+    (예외를 삼키고 실패 응답을 돌려주는 함수용). timer_class로 측정 방식을 바꿀 수 있다
+    (추적 span까지 남기는 app.core.tracing.traced).
+    """
+    def decorator(func):
+        name = operation or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with timer_class(stage, name, kwargs.get("device_type")) as timer:
+                result = await func(*args, **kwargs)
+                if outcome is not None:
+                    timer.outcome = outcome(result)
+                if device_type is not None:
+                    timer.device_type = device_type(result) or timer.device_type
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,297 @@
+"""
+GazeHome AI Services - Tracing
+contextvars 기반 요청/실행 추적 (외부 수집기 없이 프로세스 안에서 span 기록, 느린 추적 링 버퍼)
+"""
+
+import itertools
+import re
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from app.core.config import TRACE_BUFFER_SIZE, TRACE_MAX_SPANS, TRACE_SLOW_MS
+from app.core.metrics import StageTimer, timed
+
+# 다른 서비스로 전달하는 추적 ID 헤더
+TRACE_HEADER = "X-Request-ID"
+# 받아들이는 외부 추적 ID 형식 (헤더 주입/과도한 길이 방지)
+_VALID_TRACE_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("gazehome_trace", default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar("gazehome_span", default=None)
+
+
+class Span:
+    """추적 안의 구간 하나 (시작 시각은 추적 시작 기준 초)"""
+
+    __slots__ = ("span_id", "parent_id", "stage", "operation", "start", "duration", "outcome")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], stage: str, operation: str, start: float):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.stage = stage
+        self.operation = operation
+        self.start = start
+        self.duration: Optional[float] = None
+        self.outcome: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "stage": self.stage,
+            "operation": self.operation,
+            "start_ms": round(self.start * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "outcome": self.outcome
+        }
+
+
+class Trace:
+    """
+    요청 하나 또는 스케줄러 실행 하나의 추적
+
+    span은 max_spans개까지만 기록하고 나머지는 개수만 센다 (도시 단위 재계산처럼 큰 실행 대비).
+    끝난 추적은 closed가 되어, 추적 중에 만들어진 백그라운드 작업이 컨텍스트를 물려받아도
+    더 이상 span이 붙지 않는다.
+    """
+
+    __slots__ = (
+        "trace_id", "name", "started_at", "origin", "duration", "spans", "dropped_spans", "status", "closed", "_span_ids"
+    )
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self.origin = perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.status: Any = None
+        self.closed = False
+        # span ID 발급 (next()는 GIL 아래 원자적이라 스레드에서 동시에 열어도 겹치지 않음)
+        self._span_ids = itertools.count(1)
+
+    def open_span(self, stage: str, operation: str, parent_id: Optional[int] = None) -> Optional[Span]:
+        """span 시작 (parent_id를 생략하면 현재 컨텍스트의 span이 부모)"""
+        if len(self.spans) >= TRACE_MAX_SPANS:
+            self.dropped_spans += 1
+            return None
+        span = Span(
+            next(self._span_ids),
+            parent_id if parent_id is not None else _current_span.get(),
+            stage,
+            operation,
+            perf_counter() - self.origin
+        )
+        # 리스트 추가는 원자적이라 도구 스레드/Mongo 스레드에서 동시에 불러도 안전
+        self.spans.append(span)
+        return span
+
+    def stage_totals(self) -> Dict[str, List[float]]:
+        """단계별 [소요 시간 합(초), 호출 수] - 같은 단계 안에 중첩된 span은 바깥 span만 셈"""
+        totals: Dict[str, List[float]] = {}
+        by_id = {span.span_id: span for span in self.spans}
+        for span in self.spans:
+            if span.duration is None:
+                continue
+            parent = by_id.get(span.parent_id) if span.parent_id else None
+            if parent is not None and parent.stage == span.stage:
+                continue
+            total = totals.setdefault(span.stage, [0.0, 0])
+            total[0] += span.duration
+            total[1] += 1
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (단계별 합계 + 전체)"""
+        entries = [
+            f'{stage};dur={seconds * 1000:.1f};desc="{int(count)}"'
+            for stage, (seconds, count) in self.stage_totals().items()
+        ]
+        total = self.duration if self.duration is not None else perf_counter() - self.origin
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "spans": len(self.spans),
+            "dropped_spans": self.dropped_spans,
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, (seconds, _) in self.stage_totals().items()}
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "span_list": [span.to_dict() for span in self.spans]}
+
+
+class TraceBuffer:
+    """느린 추적 링 버퍼 (slow_ms 이상 걸린 추적만 최근 size개 보관)"""
+
+    def __init__(self, size: int = 200, slow_ms: float = 1000.0):
+        self.slow_ms = slow_ms
+        self._traces = deque(maxlen=size)
+        self.finished = 0
+        self.slow = 0
+
+    def offer(self, trace: Trace):
+        self.finished += 1
+        if trace.duration is not None and trace.duration * 1000 >= self.slow_ms:
+            self.slow += 1
+            self._traces.append(trace)
+
+    def recent(self, limit: int = 20, min_ms: float = 0.0, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """최근 느린 추적 요약 (최신순)"""
+        result = []
+        for trace in reversed(self._traces):
+            if trace.duration * 1000 < min_ms or (name and name not in trace.name):
+                continue
+            result.append(trace.summary())
+            if len(result) >= limit:
+                break
+        return result
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        for trace in reversed(self._traces):
+            if trace.trace_id == trace_id:
+                return trace.to_dict()
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "slow_ms": self.slow_ms,
+            "buffered": len(self._traces),
+            "capacity": self._traces.maxlen,
+            "finished": self.finished,
+            "slow": self.slow
+        }
+
+
+# 전역 느린 추적 버퍼
+trace_buffer = TraceBuffer(TRACE_BUFFER_SIZE, TRACE_SLOW_MS)
+
+
+def current_trace() -> Optional[Trace]:
+    """현재 컨텍스트의 진행 중인 추적 (없거나 이미 끝났으면 None)"""
+    trace = _current_trace.get()
+    return trace if trace is not None and not trace.closed else None
+
+
+def current_trace_id() -> Optional[str]:
+    trace = current_trace()
+    return trace.trace_id if trace is not None else None
+
+
+def propagation_headers() -> Dict[str, str]:
+    """다른 서비스 호출에 붙일 추적 ID 헤더 (추적 중이 아니면 빈 dict)"""
+    trace = current_trace()
+    return {TRACE_HEADER: trace.trace_id} if trace is not None else {}
+
+
+class start_trace:
+    """
+    추적 시작 (with / async with)
+
+    이미 진행 중인 추적이 있으면 새로 만들지 않고 그 추적을 그대로 쓴다.
+    trace_id가 형식에 맞지 않으면 새 ID를 만든다. 끝나면 느린 추적 버퍼에 넘긴다.
+    """
+
+    __slots__ = ("name", "trace_id", "trace", "_token", "_span_token")
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id if trace_id and _VALID_TRACE_ID.match(trace_id) else None
+        self.trace: Optional[Trace] = None
+        self._token = None
+        self._span_token = None
+
+    def __enter__(self) -> Trace:
+        existing = current_trace()
+        if existing is not None:
+            self.trace = existing
+            return existing
+        self.trace = Trace(self.name, self.trace_id)
+        self._token = _current_trace.set(self.trace)
+        self._span_token = _current_span.set(None)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._token is None:
+            return False
+        trace = self.trace
+        trace.duration = perf_counter() - trace.origin
+        trace.closed = True
+        if trace.status is None:
+            trace.status = "error" if exc_type is not None else "ok"
+        _current_span.reset(self._span_token)
+        _current_trace.reset(self._token)
+        trace_buffer.offer(trace)
+        return False
+
+    async def __aenter__(self) -> Trace:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
+
+
+def enter_span(stage: str, operation: str):
+    """
+    현재 추적에 span 시작 (TracedStageTimer에서 사용) - (span, 컨텍스트 토큰) 반환, 추적 중이 아니면 None
+
+    반환한 span을 exit_span에 넘겨 닫는다.
+    """
+    trace = _current_trace.get()
+    if trace is None or trace.closed:
+        return None
+    span = trace.open_span(stage, operation)
+    if span is None:
+        return None
+    return span, _current_span.set(span.span_id)
+
+
+def exit_span(entered, duration: float, outcome: str):
+    span, token = entered
+    span.duration = duration
+    span.outcome = outcome
+    _current_span.reset(token)
+
+
+class TracedStageTimer(StageTimer):
+    """
+    단계 지표 + 추적 span (with / async with)
+
+    지표는 StageTimer와 같이 기록하고, 추적 중이면 같은 구간을 span으로도 남긴다.
+    span 생성과 ContextVar 설정/복원이 더해지므로 요청 단위 I/O 단계에 쓰고,
+    루프 안의 짧은 구간은 StageTimer로 지표만 기록한다.
+    """
+
+    __slots__ = ("span",)
+
+    def __enter__(self) -> "TracedStageTimer":
+        self.span = enter_span(self.stage, self.operation)
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.span is not None:
+            exit_span(self.span, perf_counter() - self.started, self.outcome or ("ok" if exc_type is None else "error"))
+        return StageTimer.__exit__(self, exc_type, exc, tb)
+
+
+def traced_stage(stage: str, operation: str, device_type: Optional[str] = None) -> TracedStageTimer:
+    """TracedStageTimer 생성 (with traced_stage("tool", name) as timer: ...)"""
+    return TracedStageTimer(stage, operation, device_type)
+
+
+def traced(stage: str, operation: Optional[str] = None, outcome=None, device_type=None):
+    """지표와 추적 span을 함께 남기는 timed 데코레이터"""
+    return timed(stage, operation, outcome, device_type, timer_class=TracedStageTimer)
@@ -3,15 +3,18 @@ GazeHome AI Services - Main FastAPI Application
 시선으로 제어하는 스마트 홈 AI 서버 (명세서에 맞춤)
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import uvicorn
 import logging
 from datetime import datetime
 import pytz
+from typing import Optional
 from app.core.config import *
 from app.api.router import api_router
+from app.core.tracing import TRACE_HEADER, start_trace, trace_buffer
 from app.services.device_service import device_service
 
 # 한국 시간대 설정
@@ -33,14 +36,47 @@ async def lifespan(app: FastAPI):
     logger.info(f"Gateway Control: {GATEWAY_CONTROL_ENDPOINT}")
     logger.info(f"Hardware Recommendations: {HARDWARE_RECOMMENDATIONS_ENDPOINT}")
     logger.info(f"MongoDB 데이터베이스: {MONGODB_DATABASE}")
+    logger.info(f"저장소 백엔드: {STORAGE_BACKEND}")
+    # 저장소 설정이 잘못되면 시작하지 않음 (MONGODB_URL 없이 mongodb 백엔드 등)
+    check_storage_config()
     
-    # MongoDB 연결
+    if STORAGE_BACKEND != "memory":
+        # MongoDB 연결
+        try:
+            from app.core.database import connect_to_mongo
+            await connect_to_mongo()
+            logger.info("MongoDB 연결 완료")
+        except Exception as e:
+            logger.warning(f"MongoDB 연결 실패: {e}")
+        
+        # MongoDB 인덱스 생성 및 쿼리 플랜 확인
+        try:
+            from app.core.database import get_database
+            from app.core.indexes import ensure_indexes, verify_query_plans
+            db = await get_database()
+            await ensure_indexes(db)
+            await verify_query_plans(db)
+            logger.info("MongoDB 인덱스 확인 완료")
+        except Exception as e:
+            logger.warning(f"MongoDB 인덱스 확인 실패: {e}")
+    
+    # 추천 통계 재계산 작업 시작
     try:
-        from app.core.database import connect_to_mongo
-        await connect_to_mongo()
-        logger.info("MongoDB 연결 완료")
+        from app.services.recommendation_service import get_recommendation_service
+        recommendation_service = await get_recommendation_service()
+        recommendation_service.stats.start_reconciler(
+            recommendation_service.repository,
+            STATS_RECONCILE_INTERVAL_MINUTES
+        )
     except Exception as e:
-        logger.warning(f"MongoDB 연결 실패: {e}")
+        logger.warning(f"추천 통계 재계산 작업 시작 실패: {e}")
+    
+    # 추천 만료/아카이브 주기 작업 시작
+    try:
+        from app.services.lifecycle_service import lifecycle_service
+        await lifecycle_service.start()
+    except Exception as e:
+        logger.warning(f"추천 수명 주기 작업 시작 실패: {e}")
     
     # Device Service 연결
     try:
@@ -70,10 +106,9 @@ async def lifespan(app: FastAPI):
     if SCHEDULER_AUTO_START:
         try:
             from app.services.scheduler_service import scheduler_service
-            await scheduler_service.start(
-                user_id=SCHEDULER_USER_ID,
-                interval_minutes=SCHEDULER_INTERVAL_MINUTES
-            )
+            for user_id in filter(None, (u.strip() for u in SCHEDULER_USER_ID.split(","))):
+                scheduler_service.add_user(user_id, SCHEDULER_INTERVAL_MINUTES)
+            await scheduler_service.start(interval_minutes=SCHEDULER_INTERVAL_MINUTES)
             logger.info(f"스케줄러 자동 시작 완료 (간격: {SCHEDULER_INTERVAL_MINUTES}분)")
         except Exception as e:
             logger.warning(f"스케줄러 자동 시작 실패: {e}")
@@ -83,6 +118,13 @@ async def lifespan(app: FastAPI):
     # 종료 시
     logger.info("GazeHome AI Services 종료 중...")
     
+    # 스케줄러 중지 (실행 중인 워커 정리, 상태 저장, 리스 반납 - 쓰기 버퍼/DB 연결을 닫기 전에)
+    try:
+        from app.services.scheduler_service import scheduler_service
+        await scheduler_service.stop()
+    except Exception as e:
+        logger.warning(f"스케줄러 중지 실패: {e}")
+    
     # 추천 Agent 정리
     try:
         from app.agents.recommendation_agent import recommendation_agent
@@ -92,16 +134,32 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"추천 Agent 정리 실패: {e}")
     
-    # MongoDB 연결 해제
+    # 추천 수명 주기 작업 중지
+    try:
+        from app.services.lifecycle_service import lifecycle_service
+        await lifecycle_service.stop()
+    except Exception as e:
+        logger.warning(f"추천 수명 주기 작업 중지 실패: {e}")
+    
+    # 추천 쓰기 버퍼 플러시
+    try:
+        from app.services.recommendation_service import get_recommendation_service
+        recommendation_service = await get_recommendation_service()
+        await recommendation_service.close()
+        logger.info("추천 쓰기 버퍼 및 통계 플러시 완료")
+    except Exception as e:
+        logger.warning(f"추천 쓰기 버퍼 플러시 실패: {e}")
+    
+    # Device Service 정리
+    await device_service.disconnect()
+    
+    # 공유 MongoDB 클라이언트 종료
     try:
         from app.core.database import close_mongo_connection
         await close_mongo_connection()
         logger.info("MongoDB 연결 해제 완료")
     except Exception as e:
         logger.warning(f"MongoDB 연결 해제 실패: {e}")
-    
-    # Device Service 연결 해제
-    await device_service.disconnect()
 
 
 # 기본 FastAPI 앱 생성
@@ -130,6 +188,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """요청 추적 (X-Request-ID를 받아 이어 쓰고, 단계별 소요 시간을 Server-Timing으로 반환)"""
+    with start_trace(f"{request.method} {request.url.path}", request.headers.get(TRACE_HEADER)) as trace:
+        response = await call_next(request)
+        trace.status = response.status_code
+    response.headers["Server-Timing"] = trace.server_timing()
+    response.headers[TRACE_HEADER] = trace.trace_id
+    return response
+
+
 # API 라우터 등록
 app.include_router(api_router, prefix="/api")
 
@@ -155,6 +225,44 @@ async def health_check():
     }
 
 
+@app.get("/health/db")
+async def database_health():
+    """저장소 상태 및 MongoDB 커넥션 풀 지표"""
+    from app.core.database import pool_metrics
+    return {
+        "storage_backend": STORAGE_BACKEND,
+        "pool": pool_metrics.get_stats() if STORAGE_BACKEND != "memory" else None,
+        "timestamp": datetime.now(KST).isoformat()
+    }
+
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """단계별 지연 히스토그램과 카운터 (Prometheus 텍스트 형식)"""
+    from app.core.metrics import registry
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+
+@app.get("/debug/traces")
+async def list_slow_traces(limit: int = 20, min_ms: float = 0.0, name: Optional[str] = None):
+    """최근 느린 추적 목록 (TRACE_SLOW_MS 이상, 최신순)"""
+    return {
+        "buffer": trace_buffer.get_stats(),
+        "traces": trace_buffer.recent(limit=limit, min_ms=min_ms, name=name)
+    }
+
+
+@app.get("/debug/traces/{trace_id}")
+async def get_slow_trace(trace_id: str):
+    """느린 추적 상세 (span 목록 포함)"""
+    trace = trace_buffer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="추적을 찾을 수 없습니다 (느린 추적 버퍼에 없음)")
+    return trace
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
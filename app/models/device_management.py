@@ -44,6 +44,26 @@ class UserDevice(BaseModel):
         json_encoders = {ObjectId: str}
 
 
+class UserDeviceRecord:
+    """사용자 기기 경량 레코드 (내부 읽기 경로 전용, 검증 없음)"""
+    __slots__ = (
+        "id", "user_id", "device_id", "device_type", "alias",
+        "supported_actions", "is_active", "created_at", "updated_at"
+    )
+    
+    def __init__(self, doc: Dict[str, Any]):
+        get = doc.get
+        self.id = get("_id")
+        self.user_id = get("user_id")
+        self.device_id = get("device_id")
+        self.device_type = get("device_type")
+        self.alias = get("alias")
+        self.supported_actions = get("supported_actions", [])
+        self.is_active = get("is_active", True)
+        self.created_at = get("created_at")
+        self.updated_at = get("updated_at")
+
+
 class DeviceRegistrationRequest(BaseModel):
     """기기 등록 요청"""
     device_id: str = Field(..., description="Gateway 기기 ID")
@@ -63,12 +83,25 @@ class DeviceListResponse(BaseModel):
     devices: List[UserDevice]
 
 
-# 기기 타입별 지원 액션 매핑
+# 기기 타입별 지원 액션 매핑 (실제 하드웨어 명세서 기반, 기존 액션 포함)
 DEVICE_ACTIONS = {
-    DeviceType.AIR_PURIFIER: ["turn_on", "turn_off", "clean", "auto"],
-    DeviceType.AIR_CONDITIONER: ["aircon_on", "aircon_off"] + [f"temp_{i}" for i in range(18, 31)]
+    DeviceType.AIR_PURIFIER: [
+        "turn_on", "turn_off", "clean", "auto",
+        "purifier_on", "purifier_off",
+        "wind_low", "wind_mid", "wind_high", "wind_auto", "wind_power",
+        "circulator"
+    ],
+    DeviceType.AIR_CONDITIONER: [
+        "aircon_on", "aircon_off",
+        "aircon_wind_low", "aircon_wind_mid", "aircon_wind_high", "aircon_wind_auto",
+        "aircon_dry", "aircon_clean", "aircon_cool"
+    ] + [f"temp_{i}" for i in range(18, 31)]
 }
 
+# 전원 제어 액션 (실행 계획 검증용)
+POWER_ON_ACTIONS = {"turn_on", "purifier_on", "aircon_on"}
+POWER_OFF_ACTIONS = {"turn_off", "purifier_off", "aircon_off"}
+
 
 def get_supported_actions(device_type: DeviceType) -> List[str]:
     """기기 타입별 지원 액션 반환"""
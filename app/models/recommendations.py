@@ -8,6 +8,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
 from enum import Enum
+import secrets
 
 from app.models.user import PyObjectId
 
@@ -24,6 +25,7 @@ class RecommendationStatus(str, Enum):
     CONFIRMED = "confirmed"       # 승인됨 (사용자가 YES)
     REJECTED = "rejected"        # 거부됨 (사용자가 NO)
     EXPIRED = "expired"          # 만료됨 (시간 초과)
+    SUPERSEDED = "superseded"    # 대체됨 (같은 기기에 대한 새 추천으로 교체)
 
 
 class DeviceAction(BaseModel):
@@ -46,21 +48,38 @@ class DeviceControl(BaseModel):
     actions: Optional[List[DeviceAction]] = Field(None, description="순차 실행할 액션 리스트")
 
 
+class ControlStep(BaseModel):
+    """실행 계획의 개별 단계 (검증 및 정규화 완료)"""
+    action: str = Field(..., description="제어 액션")
+    description: Optional[str] = Field(None, description="액션 설명")
+    delay_after_seconds: int = Field(0, description="다음 단계 실행 전 대기 시간(초) - 마지막 단계는 0")
+
+
+class ControlPlan(BaseModel):
+    """추천 생성 시점에 컴파일된 실행 계획"""
+    device_type: str = Field(..., description="기기 타입")
+    device_id: str = Field(..., description="기기 ID")
+    steps: List[ControlStep] = Field(..., description="순서대로 실행할 단계 목록")
+
+
 class Recommendation(BaseModel):
     """추천 정보"""
     id: PyObjectId = Field(default_factory=lambda: str(ObjectId()), alias="_id")
-    recommendation_id: str = Field(..., description="추천 ID (rec_YYYYMMDD_HHMMSS)")
+    recommendation_id: str = Field(..., description="추천 ID (rec_YYYYMMDD_HHMMSS_xxxxxx)")
     user_id: str = Field(..., description="추천을 받은 사용자 ID")
     title: str = Field(..., description="추천 제목")
     contents: str = Field(..., description="추천 내용")
     context: Optional[str] = Field(None, description="추천 컨텍스트")
     device_control: Optional[DeviceControl] = Field(None, description="기기 제어 정보")
+    control_plan: Optional[ControlPlan] = Field(None, description="컴파일된 실행 계획")
     status: RecommendationStatus = Field(default=RecommendationStatus.PENDING, description="추천 상태")
     mode: str = Field(..., description="데모/운영 구분 (demo/production)")
     user_response: Optional[str] = Field(None, description="사용자 응답 (YES/NO)")
     created_at: datetime = Field(default_factory=get_kst_now, description="생성 시간 (KST)")
     confirmed_at: Optional[datetime] = Field(None, description="확인 시간")
     hardware_sent_at: Optional[datetime] = Field(None, description="하드웨어 전송 시간")
+    superseded_by: Optional[str] = Field(None, description="이 추천을 대체한 추천 ID")
+    plan_inputs: Optional[str] = Field(None, description="생성 당시 입력 신호 요약 (중복 생성 방지용)")
     
     class Config:
         validate_by_name = True
@@ -68,6 +87,69 @@ class Recommendation(BaseModel):
         json_encoders = {ObjectId: str}
 
 
+class ControlStepRecord:
+    """실행 계획 단계 경량 레코드 (검증 없음)"""
+    __slots__ = ("action", "description", "delay_after_seconds")
+    
+    def __init__(self, action: str, description: Optional[str], delay_after_seconds: int):
+        self.action = action
+        self.description = description
+        self.delay_after_seconds = delay_after_seconds
+
+
+class ControlPlanRecord:
+    """실행 계획 경량 레코드 (검증 없음)"""
+    __slots__ = ("device_type", "device_id", "steps")
+    
+    def __init__(self, device_type: str, device_id: str, steps: List[ControlStepRecord]):
+        self.device_type = device_type
+        self.device_id = device_id
+        self.steps = steps
+    
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "ControlPlanRecord":
+        return cls(
+            doc["device_type"],
+            doc["device_id"],
+            [ControlStepRecord(s["action"], s.get("description"), s.get("delay_after_seconds", 0)) for s in doc["steps"]]
+        )
+
+
+class RecommendationRecord:
+    """
+    추천 경량 레코드 (내부 읽기 경로 전용)
+
+    우리가 직접 저장한 문서를 검증 없이 감싼다. device_control은 원본 dict를
+    그대로 두고, 프로젝션으로 빠진 필드는 None이다. API 경계에서는
+    Recommendation 등 Pydantic 모델로 검증한다.
+    """
+    __slots__ = (
+        "id", "recommendation_id", "user_id", "title", "contents", "context",
+        "device_control", "control_plan", "status", "mode", "user_response",
+        "created_at", "confirmed_at", "hardware_sent_at", "superseded_by", "plan_inputs"
+    )
+    
+    def __init__(self, doc: Dict[str, Any]):
+        get = doc.get
+        self.id = get("_id")
+        self.recommendation_id = get("recommendation_id")
+        self.user_id = get("user_id")
+        self.title = get("title")
+        self.contents = get("contents")
+        self.context = get("context")
+        self.device_control = get("device_control")
+        control_plan = get("control_plan")
+        self.control_plan = ControlPlanRecord.from_doc(control_plan) if control_plan else None
+        self.status = get("status")
+        self.mode = get("mode")
+        self.user_response = get("user_response")
+        self.created_at = get("created_at")
+        self.confirmed_at = get("confirmed_at")
+        self.hardware_sent_at = get("hardware_sent_at")
+        self.superseded_by = get("superseded_by")
+        self.plan_inputs = get("plan_inputs")
+
+
 class RecommendationCreateRequest(BaseModel):
     """데모용 추천 생성 요청"""
     user_id: str = Field(..., description="추천을 요청한 사용자 ID")
@@ -114,7 +196,27 @@ class RecommendationResponse(BaseModel):
     confirmed_at: Optional[datetime] = Field(None, description="확인 시간")
 
 
+class RecommendationListItem(BaseModel):
+    """추천 목록 항목 (목록 화면에 필요한 필드만)"""
+    recommendation_id: str = Field(..., description="추천 ID")
+    user_id: str = Field(..., description="사용자 ID")
+    title: str = Field(..., description="추천 제목")
+    status: RecommendationStatus = Field(..., description="추천 상태")
+    mode: str = Field(..., description="데모/운영 구분")
+    created_at: datetime = Field(..., description="생성 시간")
+
+
+class RecommendationListResponse(BaseModel):
+    """추천 목록 응답 (커서 페이지네이션)"""
+    items: List[RecommendationListItem] = Field(..., description="추천 목록")
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (없으면 마지막 페이지)")
+
+
 def generate_recommendation_id() -> str:
-    """추천 ID 생성 (rec_YYYYMMDD_HHMMSS)"""
+    """추천 ID 생성 (rec_YYYYMMDD_HHMMSS_xxxxxx)
+
+    recommendation_id에는 unique 인덱스가 걸려 있으므로 같은 초에 생성된
+    추천끼리 충돌하지 않도록 임의 접미사를 붙인다.
+    """
     now = get_kst_now()
-    return f"rec_{now.strftime('%Y%m%d_%H%M%S')}"
\ No newline at end of file
+    return f"rec_{now.strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(3)}"
\ No newline at end of file
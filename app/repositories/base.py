@@ -0,0 +1,234 @@
+"""
+GazeHome AI Services - Repository Interfaces
+서비스가 사용하는 저장소 연산 정의 (MongoDB / 메모리 백엔드 공통)
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class RecommendationRepository(ABC):
+    """
+    추천 저장소
+
+    문서는 MongoDB에 저장되는 형태의 dict로 주고받는다.
+    목록 조회는 항상 (created_at, _id) 내림차순이다.
+    """
+
+    @abstractmethod
+    async def insert(
+        self, doc: Dict[str, Any], durable: bool = False, fence: Optional["Fence"] = None
+    ) -> Optional[Awaitable[None]]:
+        """
+        추천 문서 삽입 (durable=True면 저장 완료까지 대기) - 지연 쓰기면 반영/실패 시 완료되는 Future, 즉시 반영이면 None
+
+        fence가 있으면 쓰기 버퍼를 거치지 않고 토큰 확인 직후 바로 반영한다 (이하 쓰기 연산 공통).
+        """
+
+    @abstractmethod
+    async def set_fields(
+        self, recommendation_id: str, fields: Dict[str, Any], durable: bool = False, fence: Optional["Fence"] = None
+    ) -> Optional[bool]:
+        """추천 문서 필드 갱신 - 바로 반영하면 문서 존재 여부, 지연 쓰기라 결과를 알 수 없으면 None"""
+
+    @abstractmethod
+    async def find_by_id(self, recommendation_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """추천 ID로 문서 조회"""
+
+    @abstractmethod
+    async def transition(
+        self, recommendation_id: str, from_status: str, fields: Dict[str, Any], fence: Optional["Fence"] = None
+    ) -> bool:
+        """from_status 상태일 때만 원자적으로 갱신, 갱신 여부 반환"""
+
+    @abstractmethod
+    async def transition_and_get(
+        self,
+        recommendation_id: str,
+        from_status: str,
+        fields: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """from_status 상태일 때만 원자적으로 갱신하고 갱신 후 문서 반환"""
+
+    @abstractmethod
+    async def find_page(
+        self,
+        filter: Dict[str, Any],
+        after: Optional[Tuple[datetime, Any]],
+        limit: int,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """동등 조건 filter로 (created_at, _id) 내림차순 한 페이지 조회 (after 이후부터)"""
+
+    @abstractmethod
+    async def find_by_user_status(
+        self,
+        user_id: str,
+        status: str,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """사용자의 특정 상태 문서 전체 (대기 중인 추천 인덱스 적재용)"""
+
+    @abstractmethod
+    async def update_status_before(self, from_status: str, to_status: str, cutoff: datetime) -> int:
+        """created_at < cutoff 인 from_status 문서를 to_status로 일괄 전환, 전환 수 반환"""
+
+    @abstractmethod
+    async def archive_batch(self, statuses: Iterable[str], cutoff: datetime, batch_size: int) -> List[Dict[str, Any]]:
+        """created_at < cutoff 인 statuses 문서를 오래된 순으로 최대 batch_size개 아카이브로 이동"""
+
+    @abstractmethod
+    async def count_counters(self) -> Dict[str, int]:
+        """통계 카운터 ID별 문서 수 - 추천과 보관 기간 안의 아카이브 합계 (통계 재계산용)"""
+
+    async def flush(self) -> None:
+        """지연된 쓰기 반영"""
+
+    async def close(self) -> None:
+        """지연된 쓰기 반영 및 정리"""
+        await self.flush()
+
+
+class StatsRepository(ABC):
+    """통계 카운터 저장소 (카운터 ID는 "dimension:key")"""
+
+    @abstractmethod
+    async def increment(self, deltas: Dict[str, int]) -> None:
+        """카운터 증분 반영 (없는 카운터는 생성)"""
+
+    @abstractmethod
+    async def find_counts(self, dimension: str, keys: Optional[List[str]] = None) -> Dict[str, int]:
+        """차원별 key -> count (keys 지정 시 해당 키만)"""
+
+    @abstractmethod
+    async def get(self, counter_id: str) -> int:
+        """단일 카운터 값"""
+
+    @abstractmethod
+    async def replace_all(self, counts: Dict[str, int]) -> None:
+        """전체 카운터를 주어진 값으로 교체"""
+
+
+class DeviceRepository(ABC):
+    """사용자 기기 저장소 ((user_id, device_id) 단위)"""
+
+    @abstractmethod
+    async def insert_if_absent(self, doc: Dict[str, Any]) -> Optional[Any]:
+        """같은 (user_id, device_id)가 없을 때만 삽입, 삽입된 _id 반환 (이미 있으면 None)"""
+
+    @abstractmethod
+    async def find_active(self, user_id: str) -> List[Dict[str, Any]]:
+        """사용자의 활성 기기 목록"""
+
+    @abstractmethod
+    async def find_active_one(self, user_id: str, device_id: str) -> Optional[Dict[str, Any]]:
+        """사용자의 특정 활성 기기"""
+
+    @abstractmethod
+    async def update(self, user_id: str, device_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """기기 필드 갱신 후 문서 반환"""
+
+    @abstractmethod
+    async def deactivate(self, user_id: str, device_id: str, updated_at: datetime) -> bool:
+        """기기 비활성화, 변경 여부 반환"""
+
+    async def close(self) -> None:
+        """정리"""
+
+
+class LeaseRepository(ABC):
+    """
+    리스(lease) 저장소 - 여러 프로세스 중 하나만 작업을 맡도록 조정
+
+    리스를 새로 획득할 때마다 펜싱 토큰이 1씩 증가하므로
+    토큰이 더 큰 쪽이 항상 최신 보유자다.
+    """
+
+    @abstractmethod
+    async def acquire(self, name: str, holder: str, ttl_seconds: float, now: datetime) -> Optional[int]:
+        """비어 있거나 만료된 리스 획득, 새 펜싱 토큰 반환 (다른 보유자가 유효하게 보유 중이면 None)"""
+
+    @abstractmethod
+    async def renew(self, name: str, holder: str, token: int, ttl_seconds: float, now: datetime) -> bool:
+        """보유 중인 리스 연장 (holder/token이 그대로일 때만), 연장 여부 반환"""
+
+    @abstractmethod
+    async def release(self, name: str, holder: str, token: int) -> bool:
+        """보유 중인 리스 즉시 만료 처리"""
+
+    @abstractmethod
+    async def check_token(self, name: str, token: int, now: datetime) -> bool:
+        """token이 아직 현재 리스 토큰이고 만료되지 않았는지 (리스 문서에 대한 조건부 갱신으로 확인)"""
+
+    @abstractmethod
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """리스 문서 (holder, token, expires_at)"""
+
+
+class StaleFencingTokenError(RuntimeError):
+    """펜싱 토큰의 리스 임기가 끝나 저장소 쓰기를 거부함"""
+
+
+class Fence:
+    """
+    저장소 쓰기에 넘기는 펜싱 토큰
+
+    저장소는 쓰기 직전에 check()로 리스 문서의 현재 토큰과 비교하고,
+    다른 인스턴스가 리스를 가져갔으면 쓰지 않고 StaleFencingTokenError를 던진다.
+    """
+
+    def __init__(self, repository: LeaseRepository, name: str, token: int, now: Callable[[], datetime]):
+        self.repository = repository
+        self.name = name
+        self.token = token
+        self.now = now
+
+    async def check(self):
+        """리스 임기가 끝났으면 StaleFencingTokenError"""
+        if not await self.repository.check_token(self.name, self.token, self.now()):
+            raise StaleFencingTokenError(f"리스 {self.name}의 펜싱 토큰 {self.token}이 더 이상 유효하지 않습니다")
+
+
+class ScheduleStateRepository(ABC):
+    """스케줄러 사용자 상태 저장소 (재시작 후 복원용, user_id 단위 문서)"""
+
+    @abstractmethod
+    async def save_all(self, states: List[Dict[str, Any]]) -> None:
+        """상태 문서 일괄 저장 (_id = user_id, 있으면 교체)"""
+
+    @abstractmethod
+    async def load_all(self) -> List[Dict[str, Any]]:
+        """저장된 전체 상태"""
+
+    @abstractmethod
+    async def delete(self, user_ids: List[str]) -> None:
+        """사용자 상태 삭제"""
+
+
+class ForecastRepository(ABC):
+    """위치별 날씨 예보/관측 시계열 저장소 (재시작 후 예보를 다시 조회하지 않도록, location 단위 문서)"""
+
+    @abstractmethod
+    async def save(self, series: Dict[str, Any]) -> None:
+        """시계열 문서 저장 (_id = location, 있으면 교체)"""
+
+    @abstractmethod
+    async def load_all(self) -> List[Dict[str, Any]]:
+        """저장된 전체 시계열"""
+
+
+class AgentStepRepository(ABC):
+    """추천별 Agent 반복 기록 저장소 (recommendation_id + generation_id 단위 문서, 추천 문서와 별도 컬렉션)"""
+
+    @abstractmethod
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        """기록 삽입 (지연 쓰기 가능)"""
+
+    @abstractmethod
+    async def find_by_recommendation(self, recommendation_id: str) -> List[Dict[str, Any]]:
+        """추천 ID의 기록 전체 (생성 시각 순)"""
+
+    async def close(self) -> None:
+        """대기 중인 쓰기 반영"""
@@ -0,0 +1,363 @@
+"""
+GazeHome AI Services - In-Memory Repositories
+DB 없이 동작하는 메모리 저장소 구현 (테스트, 벤치마크, 엣지 배포용)
+
+모든 연산은 await 없이 한 번에 실행되므로 단일 이벤트 루프 안에서 원자적이다.
+"""
+
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
+
+from app.core.clock import Clock, get_clock
+from app.repositories.base import RecommendationRepository, StatsRepository, DeviceRepository, LeaseRepository, ScheduleStateRepository, ForecastRepository, AgentStepRepository, Fence
+from app.services.recommendation_stats import counter_keys, to_kst
+
+# 목록 조회용 보조 인덱스 필드 (전체 목록은 ("*", None) 인덱스)
+INDEXED_FIELDS = ("user_id", "status")
+
+
+def _plain(value: Any) -> Any:
+    """Enum을 값으로 바꾼 깊은 복사 (MongoDB에 저장/조회되는 형태와 동일하게)"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    """프로젝션 적용 후 복사본 반환 (_id는 항상 포함)"""
+    if projection is None:
+        return _plain(doc)
+    return _plain({k: v for k, v in doc.items() if k == "_id" or projection.get(k)})
+
+
+def _sort_key(doc: Dict[str, Any]) -> Tuple[datetime, str]:
+    """(created_at, _id) 정렬 키"""
+    return to_kst(doc["created_at"]), str(doc["_id"])
+
+
+class MemoryRecommendationRepository(RecommendationRepository):
+    """
+    메모리 추천 저장소
+
+    recommendation_id -> 문서 dict와 함께 user_id/status별 정렬 리스트
+    ((created_at, _id, recommendation_id) 오름차순)를 유지해
+    MongoDB 인덱스와 같은 조회 패턴을 범위 탐색으로 처리한다.
+    """
+
+    def __init__(self, archive_ttl_days: int = 90, clock: Optional[Clock] = None):
+        self.archive_ttl_days = archive_ttl_days
+        self.clock = clock or get_clock()
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[Tuple[str, Any], List[Tuple[datetime, str, str]]] = defaultdict(list)
+        self._archive: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _index_keys(self, doc: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        return [("*", None)] + [(field, doc.get(field)) for field in INDEXED_FIELDS]
+
+    def _index_add(self, doc: Dict[str, Any], index_key: Tuple[str, Any]):
+        insort(self._indexes[index_key], _sort_key(doc) + (doc["recommendation_id"],))
+
+    def _index_remove(self, doc: Dict[str, Any], index_key: Tuple[str, Any]):
+        entries = self._indexes[index_key]
+        entry = _sort_key(doc) + (doc["recommendation_id"],)
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+        if not entries:
+            del self._indexes[index_key]
+
+    def _apply(self, doc: Dict[str, Any], fields: Dict[str, Any]):
+        """필드 갱신 (인덱스 필드가 바뀌면 인덱스도 이동)"""
+        fields = _plain(fields)
+        for field in INDEXED_FIELDS:
+            if field in fields and fields[field] != doc.get(field):
+                self._index_remove(doc, (field, doc.get(field)))
+                doc[field] = fields[field]
+                self._index_add(doc, (field, doc[field]))
+        doc.update(fields)
+
+    def _remove(self, doc: Dict[str, Any]):
+        for index_key in self._index_keys(doc):
+            self._index_remove(doc, index_key)
+        del self._docs[doc["recommendation_id"]]
+
+    async def insert(self, doc: Dict[str, Any], durable: bool = False, fence: Optional[Fence] = None) -> None:
+        doc = _plain(doc)
+        if doc["recommendation_id"] in self._docs:
+            raise DuplicateKeyError(f"중복 추천 ID: {doc['recommendation_id']}")
+        if fence is not None:
+            await fence.check()
+        self._docs[doc["recommendation_id"]] = doc
+        for index_key in self._index_keys(doc):
+            self._index_add(doc, index_key)
+
+    async def set_fields(
+        self, recommendation_id: str, fields: Dict[str, Any], durable: bool = False, fence: Optional[Fence] = None
+    ) -> Optional[bool]:
+        if fence is not None:
+            await fence.check()
+        doc = self._docs.get(recommendation_id)
+        if doc is None:
+            return False
+        self._apply(doc, fields)
+        return True
+
+    async def find_by_id(self, recommendation_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        doc = self._docs.get(recommendation_id)
+        return _project(doc, projection) if doc is not None else None
+
+    async def transition(
+        self, recommendation_id: str, from_status: str, fields: Dict[str, Any], fence: Optional[Fence] = None
+    ) -> bool:
+        if fence is not None:
+            await fence.check()
+        doc = self._docs.get(recommendation_id)
+        if doc is None or doc.get("status") != _plain(from_status):
+            return False
+        self._apply(doc, fields)
+        return True
+
+    async def transition_and_get(
+        self,
+        recommendation_id: str,
+        from_status: str,
+        fields: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        if not await self.transition(recommendation_id, from_status, fields):
+            return None
+        return _project(self._docs[recommendation_id], projection)
+
+    async def find_page(
+        self,
+        filter: Dict[str, Any],
+        after: Optional[Tuple[datetime, Any]],
+        limit: int,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        filter = _plain(filter)
+        # 가장 선택적인 인덱스로 탐색하고 나머지 조건은 문서에서 확인
+        index_key = next(((field, filter[field]) for field in INDEXED_FIELDS if field in filter), ("*", None))
+        entries = self._indexes.get(index_key, [])
+        position = len(entries)
+        if after:
+            created_at, last_id = after
+            position = bisect_left(entries, (to_kst(created_at), str(last_id)))
+
+        docs = []
+        for i in range(position - 1, -1, -1):
+            if len(docs) == limit:
+                break
+            doc = self._docs[entries[i][2]]
+            if all(doc.get(field) == value for field, value in filter.items()):
+                docs.append(_project(doc, projection))
+        return docs
+
+    async def find_by_user_status(
+        self,
+        user_id: str,
+        status: str,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        status = _plain(status)
+        docs = (self._docs[entry[2]] for entry in self._indexes.get(("user_id", user_id), []))
+        return [_project(doc, projection) for doc in docs if doc.get("status") == status]
+
+    async def update_status_before(self, from_status: str, to_status: str, cutoff: datetime) -> int:
+        entries = self._indexes.get(("status", _plain(from_status)), [])
+        expired = entries[:bisect_left(entries, (to_kst(cutoff),))]
+        for _, _, recommendation_id in expired:
+            self._apply(self._docs[recommendation_id], {"status": to_status})
+        return len(expired)
+
+    async def archive_batch(self, statuses: Iterable[str], cutoff: datetime, batch_size: int) -> List[Dict[str, Any]]:
+        archived_at = self.clock.now()
+        self._prune_archive(archived_at)
+
+        candidates = []
+        for status in statuses:
+            entries = self._indexes.get(("status", _plain(status)), [])
+            candidates.extend(entries[:min(bisect_left(entries, (to_kst(cutoff),)), batch_size)])
+        candidates.sort()
+
+        docs = []
+        for _, _, recommendation_id in candidates[:batch_size]:
+            doc = self._docs[recommendation_id]
+            self._remove(doc)
+            doc["archived_at"] = archived_at
+            self._archive[recommendation_id] = doc
+            docs.append(_plain(doc))
+        return docs
+
+    def _prune_archive(self, now: datetime):
+        """보관 기간이 지난 아카이브 제거 (MongoDB TTL 인덱스 대응)"""
+        expire_before = now - timedelta(days=self.archive_ttl_days)
+        while self._archive:
+            recommendation_id, doc = next(iter(self._archive.items()))
+            if doc["archived_at"] >= expire_before:
+                break
+            del self._archive[recommendation_id]
+
+    async def count_counters(self) -> Dict[str, int]:
+        self._prune_archive(self.clock.now())
+        counts = Counter()
+        for doc in self._docs.values():
+            counts.update(counter_keys(doc))
+        for doc in self._archive.values():
+            counts.update(counter_keys(doc))
+        return dict(counts)
+
+
+class MemoryStatsRepository(StatsRepository):
+    """메모리 통계 카운터 저장소 (dimension -> key -> count)"""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+    async def increment(self, deltas: Dict[str, int]) -> None:
+        for counter_id, delta in deltas.items():
+            dimension, _, key = counter_id.partition(":")
+            counters = self._counts[dimension]
+            counters[key] = counters.get(key, 0) + delta
+
+    async def find_counts(self, dimension: str, keys: Optional[List[str]] = None) -> Dict[str, int]:
+        counters = self._counts.get(dimension, {})
+        if keys is None:
+            return dict(counters)
+        return {key: counters[key] for key in keys if key in counters}
+
+    async def get(self, counter_id: str) -> int:
+        dimension, _, key = counter_id.partition(":")
+        return self._counts.get(dimension, {}).get(key, 0)
+
+    async def replace_all(self, counts: Dict[str, int]) -> None:
+        self._counts.clear()
+        await self.increment(counts)
+
+
+class MemoryDeviceRepository(DeviceRepository):
+    """메모리 사용자 기기 저장소 (user_id -> device_id -> 문서)"""
+
+    def __init__(self):
+        self._devices: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+
+    async def insert_if_absent(self, doc: Dict[str, Any]) -> Optional[Any]:
+        devices = self._devices[doc["user_id"]]
+        if doc["device_id"] in devices:
+            return None
+        devices[doc["device_id"]] = _plain(doc)
+        return doc["_id"]
+
+    async def find_active(self, user_id: str) -> List[Dict[str, Any]]:
+        return [_plain(doc) for doc in self._devices.get(user_id, {}).values() if doc.get("is_active")]
+
+    async def find_active_one(self, user_id: str, device_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._devices.get(user_id, {}).get(device_id)
+        return _plain(doc) if doc is not None and doc.get("is_active") else None
+
+    async def update(self, user_id: str, device_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        doc = self._devices.get(user_id, {}).get(device_id)
+        if doc is None:
+            return None
+        doc.update(_plain(fields))
+        return _plain(doc)
+
+    async def deactivate(self, user_id: str, device_id: str, updated_at: datetime) -> bool:
+        doc = self._devices.get(user_id, {}).get(device_id)
+        if doc is None or not doc.get("is_active"):
+            return False
+        doc.update({"is_active": False, "updated_at": updated_at})
+        return True
+
+
+class MemoryLeaseRepository(LeaseRepository):
+    """메모리 리스 저장소 (한 프로세스 안의 여러 인스턴스 간 조정, 테스트/시뮬레이션용)"""
+
+    def __init__(self):
+        self._leases: Dict[str, Dict[str, Any]] = {}
+
+    async def acquire(self, name: str, holder: str, ttl_seconds: float, now: datetime) -> Optional[int]:
+        lease = self._leases.get(name)
+        if lease is not None and lease["expires_at"] > now:
+            return None
+        token = (lease["token"] if lease else 0) + 1
+        self._leases[name] = {
+            "_id": name, "holder": holder, "token": token,
+            "expires_at": now + timedelta(seconds=ttl_seconds), "acquired_at": now
+        }
+        return token
+
+    async def renew(self, name: str, holder: str, token: int, ttl_seconds: float, now: datetime) -> bool:
+        lease = self._leases.get(name)
+        if lease is None or lease["holder"] != holder or lease["token"] != token:
+            return False
+        lease["expires_at"] = now + timedelta(seconds=ttl_seconds)
+        return True
+
+    async def release(self, name: str, holder: str, token: int) -> bool:
+        lease = self._leases.get(name)
+        if lease is None or lease["holder"] != holder or lease["token"] != token:
+            return False
+        lease["expires_at"] = datetime(1970, 1, 1)
+        return True
+
+    async def check_token(self, name: str, token: int, now: datetime) -> bool:
+        lease = self._leases.get(name)
+        return lease is not None and lease["token"] == token and lease["expires_at"] > now
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        lease = self._leases.get(name)
+        return dict(lease) if lease is not None else None
+
+
+class MemoryScheduleStateRepository(ScheduleStateRepository):
+    """메모리 스케줄러 상태 저장소 (user_id -> 상태 문서)"""
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    async def save_all(self, states: List[Dict[str, Any]]) -> None:
+        for state in states:
+            self._states[state["_id"]] = _plain(state)
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        return [_plain(state) for state in self._states.values()]
+
+    async def delete(self, user_ids: List[str]) -> None:
+        for user_id in user_ids:
+            self._states.pop(user_id, None)
+
+
+class MemoryForecastRepository(ForecastRepository):
+    """메모리 날씨 시계열 저장소 (location -> 시계열 문서)"""
+
+    def __init__(self):
+        self._series: Dict[str, Dict[str, Any]] = {}
+
+    async def save(self, series: Dict[str, Any]) -> None:
+        self._series[series["_id"]] = _plain(series)
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        return [_plain(series) for series in self._series.values()]
+
+
+class MemoryAgentStepRepository(AgentStepRepository):
+    """메모리 Agent 반복 기록 저장소 (recommendation_id -> generation_id -> 문서)"""
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[Optional[str], Dict[str, Any]]] = defaultdict(dict)
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        self._docs[doc["recommendation_id"]][doc.get("generation_id")] = _plain(doc)
+
+    async def find_by_recommendation(self, recommendation_id: str) -> List[Dict[str, Any]]:
+        docs = self._docs.get(recommendation_id, {}).values()
+        return [_plain(doc) for doc in sorted(docs, key=lambda doc: doc["created_at"])]
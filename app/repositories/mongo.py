@@ -0,0 +1,371 @@
+"""
+GazeHome AI Services - MongoDB Repositories
+Motor 기반 저장소 구현
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne, ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.core.config import RECOMMENDATION_WRITE_BATCH_SIZE, RECOMMENDATION_WRITE_LINGER_MS
+from app.core.clock import Clock, get_clock
+from app.repositories.base import RecommendationRepository, StatsRepository, DeviceRepository, LeaseRepository, ScheduleStateRepository, ForecastRepository, AgentStepRepository, Fence
+from app.services.write_behind import WriteBehindBuffer
+from app.services.recommendation_stats import DIMENSIONS, HOUR_KEY_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# 커서 페이지네이션 정렬 키 (created_at, _id)
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+# 통계 차원별 $group 키
+COUNTER_GROUP_KEYS = {
+    "total": "all",
+    "status": "$status",
+    "user": "$user_id",
+    "mode": "$mode",
+    "device_type": {"$ifNull": ["$device_control.device_type", "none"]},
+    "hour": {"$dateToString": {"format": HOUR_KEY_FORMAT, "date": "$created_at", "timezone": "+09:00"}},
+}
+
+
+class MongoRecommendationRepository(RecommendationRepository):
+    """MongoDB 추천 저장소 (삽입/필드 갱신은 쓰기 버퍼 경유)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase, clock: Optional[Clock] = None):
+        self.collection = db.recommendations
+        self.clock = clock or get_clock()
+        self.archive_collection = db.recommendations_archive
+        # 삽입/상태 갱신 배치 버퍼
+        self.write_buffer = WriteBehindBuffer(
+            self.collection,
+            max_batch_size=RECOMMENDATION_WRITE_BATCH_SIZE,
+            max_linger_ms=RECOMMENDATION_WRITE_LINGER_MS
+        )
+
+    async def _flush_if_pending(self, recommendation_id: str):
+        """아직 버퍼에 있는 쓰기가 있으면 먼저 반영"""
+        if self.write_buffer.is_pending(recommendation_id):
+            await self.write_buffer.flush()
+
+    async def insert(self, doc: Dict[str, Any], durable: bool = False, fence: Optional[Fence] = None) -> Optional[Awaitable[None]]:
+        if fence is not None:
+            # 버퍼에서 기다리는 동안 임기가 끝나지 않도록 토큰 확인 직후 바로 삽입
+            await fence.check()
+            await self.collection.insert_one(doc)
+            return None
+        return await self.write_buffer.insert(doc, durable=durable)
+
+    async def set_fields(
+        self, recommendation_id: str, fields: Dict[str, Any], durable: bool = False, fence: Optional[Fence] = None
+    ) -> Optional[bool]:
+        if fence is not None or durable:
+            # 결과(문서 존재 여부)가 필요하므로 버퍼를 거치지 않고 바로 갱신
+            await self._flush_if_pending(recommendation_id)
+            if fence is not None:
+                await fence.check()
+            result = await self.collection.update_one({"recommendation_id": recommendation_id}, {"$set": fields})
+            return result.matched_count > 0
+        await self.write_buffer.update(
+            {"recommendation_id": recommendation_id},
+            {"$set": fields}
+        )
+        return None
+
+    async def find_by_id(self, recommendation_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        await self._flush_if_pending(recommendation_id)
+        return await self.collection.find_one({"recommendation_id": recommendation_id}, projection)
+
+    async def transition(
+        self, recommendation_id: str, from_status: str, fields: Dict[str, Any], fence: Optional[Fence] = None
+    ) -> bool:
+        await self._flush_if_pending(recommendation_id)
+        if fence is not None:
+            await fence.check()
+        result = await self.collection.update_one(
+            {"recommendation_id": recommendation_id, "status": from_status},
+            {"$set": fields}
+        )
+        return result.modified_count > 0
+
+    async def transition_and_get(
+        self,
+        recommendation_id: str,
+        from_status: str,
+        fields: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        await self._flush_if_pending(recommendation_id)
+        return await self.collection.find_one_and_update(
+            {"recommendation_id": recommendation_id, "status": from_status},
+            {"$set": fields},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def find_page(
+        self,
+        filter: Dict[str, Any],
+        after: Optional[Tuple[datetime, Any]],
+        limit: int,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """(created_at, _id) 기준 커서 쿼리 - 페이지 깊이와 무관하게 인덱스 범위 탐색"""
+        if self.write_buffer.pending_count:
+            await self.write_buffer.flush()
+
+        query = dict(filter)
+        if after:
+            created_at, last_id = after
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": last_id}}
+            ]
+        return await self.collection.find(query, projection).sort(KEYSET_SORT).limit(limit).to_list(length=limit)
+
+    async def find_by_user_status(
+        self,
+        user_id: str,
+        status: str,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        if self.write_buffer.pending_count:
+            await self.write_buffer.flush()
+        return await self.collection.find({"user_id": user_id, "status": status}, projection).to_list(length=None)
+
+    async def update_status_before(self, from_status: str, to_status: str, cutoff: datetime) -> int:
+        result = await self.collection.update_many(
+            {"status": from_status, "created_at": {"$lt": cutoff}},
+            {"$set": {"status": to_status}}
+        )
+        return result.modified_count
+
+    async def archive_batch(self, statuses: Iterable[str], cutoff: datetime, batch_size: int) -> List[Dict[str, Any]]:
+        query = {"status": {"$in": list(statuses)}, "created_at": {"$lt": cutoff}}
+        docs = await self.collection.find(query).sort("created_at", 1).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            return []
+
+        archived_at = self.clock.now()
+        for doc in docs:
+            doc["archived_at"] = archived_at
+
+        try:
+            await self.archive_collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # 이전 실행에서 아카이브만 되고 삭제되지 않은 문서는 중복 키로 건너뜀
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+        await self.collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        return docs
+
+    async def count_counters(self) -> Dict[str, int]:
+        # $facet은 결과 문서 16MB 제한이 있어 차원마다 따로 집계, 아카이브된 추천도 합산
+        counts: Dict[str, int] = {}
+        for collection in (self.collection, self.archive_collection):
+            for dimension in DIMENSIONS:
+                pipeline = [{"$group": {"_id": COUNTER_GROUP_KEYS[dimension], "count": {"$sum": 1}}}]
+                async for row in collection.aggregate(pipeline, allowDiskUse=True):
+                    counter_id = f"{dimension}:{row['_id']}"
+                    counts[counter_id] = counts.get(counter_id, 0) + row["count"]
+        return counts
+
+    async def flush(self) -> None:
+        await self.write_buffer.flush()
+
+    async def close(self) -> None:
+        await self.write_buffer.close()
+
+
+class MongoStatsRepository(StatsRepository):
+    """MongoDB 통계 카운터 저장소 (recommendation_stats 컬렉션)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.recommendation_stats
+
+    async def increment(self, deltas: Dict[str, int]) -> None:
+        ops = []
+        for counter_id, delta in deltas.items():
+            dimension, _, key = counter_id.partition(":")
+            ops.append(UpdateOne(
+                {"_id": counter_id},
+                {"$inc": {"count": delta}, "$setOnInsert": {"dimension": dimension, "key": key}},
+                upsert=True
+            ))
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+
+    async def find_counts(self, dimension: str, keys: Optional[List[str]] = None) -> Dict[str, int]:
+        if keys is not None:
+            query = {"_id": {"$in": [f"{dimension}:{key}" for key in keys]}}
+        else:
+            query = {"dimension": dimension}
+        counts = {}
+        async for doc in self.collection.find(query, {"key": 1, "count": 1}):
+            counts[doc["key"]] = doc["count"]
+        return counts
+
+    async def get(self, counter_id: str) -> int:
+        doc = await self.collection.find_one({"_id": counter_id}, {"count": 1})
+        return doc["count"] if doc else 0
+
+    async def replace_all(self, counts: Dict[str, int]) -> None:
+        ops = []
+        for counter_id, count in counts.items():
+            dimension, _, key = counter_id.partition(":")
+            ops.append(ReplaceOne(
+                {"_id": counter_id},
+                {"dimension": dimension, "key": key, "count": count},
+                upsert=True
+            ))
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+        await self.collection.delete_many({"_id": {"$nin": list(counts)}})
+
+
+class MongoDeviceRepository(DeviceRepository):
+    """MongoDB 사용자 기기 저장소 (user_devices 컬렉션)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.user_devices
+
+    async def insert_if_absent(self, doc: Dict[str, Any]) -> Optional[Any]:
+        try:
+            result = await self.collection.update_one(
+                {"user_id": doc["user_id"], "device_id": doc["device_id"]},
+                {"$setOnInsert": doc},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # 동시 등록 경쟁에서 진 경우 (unique 인덱스로 감지)
+            return None
+        return result.upserted_id
+
+    async def find_active(self, user_id: str) -> List[Dict[str, Any]]:
+        return await self.collection.find({"user_id": user_id, "is_active": True}).to_list(length=None)
+
+    async def find_active_one(self, user_id: str, device_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"user_id": user_id, "device_id": device_id, "is_active": True})
+
+    async def update(self, user_id: str, device_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one_and_update(
+            {"user_id": user_id, "device_id": device_id},
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def deactivate(self, user_id: str, device_id: str, updated_at: datetime) -> bool:
+        result = await self.collection.update_one(
+            {"user_id": user_id, "device_id": device_id},
+            {"$set": {"is_active": False, "updated_at": updated_at}}
+        )
+        return result.modified_count > 0
+
+
+class MongoLeaseRepository(LeaseRepository):
+    """MongoDB 리스 저장소 (scheduler_leases 컬렉션, 리스 이름이 _id)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.scheduler_leases
+
+    async def acquire(self, name: str, holder: str, ttl_seconds: float, now: datetime) -> Optional[int]:
+        try:
+            # 만료된 리스만 가져오고, 문서가 없으면 upsert로 생성
+            # (유효한 리스가 있으면 upsert가 같은 _id로 삽입을 시도해 DuplicateKeyError)
+            doc = await self.collection.find_one_and_update(
+                {"_id": name, "expires_at": {"$lte": now}},
+                {
+                    "$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl_seconds), "acquired_at": now},
+                    "$inc": {"token": 1}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return None
+        return doc["token"]
+
+    async def renew(self, name: str, holder: str, token: int, ttl_seconds: float, now: datetime) -> bool:
+        result = await self.collection.update_one(
+            {"_id": name, "holder": holder, "token": token},
+            {"$set": {"expires_at": now + timedelta(seconds=ttl_seconds)}}
+        )
+        return result.matched_count > 0
+
+    async def release(self, name: str, holder: str, token: int) -> bool:
+        result = await self.collection.update_one(
+            {"_id": name, "holder": holder, "token": token},
+            {"$set": {"expires_at": datetime(1970, 1, 1)}}
+        )
+        return result.modified_count > 0
+
+    async def check_token(self, name: str, token: int, now: datetime) -> bool:
+        # 조건부 갱신이라 같은 리스 문서에 대한 acquire와 순서가 정해짐 (획득보다 먼저 확인된 쓰기만 통과)
+        result = await self.collection.update_one(
+            {"_id": name, "token": token, "expires_at": {"$gt": now}},
+            {"$set": {"checked_at": now}}
+        )
+        return result.matched_count > 0
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": name})
+
+
+class MongoScheduleStateRepository(ScheduleStateRepository):
+    """MongoDB 스케줄러 상태 저장소 (scheduler_state 컬렉션)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.scheduler_state
+
+    async def save_all(self, states: List[Dict[str, Any]]) -> None:
+        ops = [ReplaceOne({"_id": state["_id"]}, state, upsert=True) for state in states]
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        return await self.collection.find({}).to_list(length=None)
+
+    async def delete(self, user_ids: List[str]) -> None:
+        if user_ids:
+            await self.collection.delete_many({"_id": {"$in": list(user_ids)}})
+
+
+class MongoForecastRepository(ForecastRepository):
+    """MongoDB 날씨 시계열 저장소 (weather_forecasts 컬렉션)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.weather_forecasts
+
+    async def save(self, series: Dict[str, Any]) -> None:
+        await self.collection.replace_one({"_id": series["_id"]}, series, upsert=True)
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        return await self.collection.find({}).to_list(length=None)
+
+
+class MongoAgentStepRepository(AgentStepRepository):
+    """MongoDB Agent 반복 기록 저장소 (recommendation_agent_steps 컬렉션, 삽입은 쓰기 버퍼 경유)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.recommendation_agent_steps
+        self.write_buffer = WriteBehindBuffer(
+            self.collection,
+            max_batch_size=RECOMMENDATION_WRITE_BATCH_SIZE,
+            max_linger_ms=RECOMMENDATION_WRITE_LINGER_MS
+        )
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        await self.write_buffer.insert(doc)
+
+    async def find_by_recommendation(self, recommendation_id: str) -> List[Dict[str, Any]]:
+        if self.write_buffer.is_pending(recommendation_id):
+            await self.write_buffer.flush()
+        cursor = self.collection.find({"recommendation_id": recommendation_id}, {"_id": 0}).sort("created_at", 1)
+        return await cursor.to_list(length=None)
+
+    async def close(self) -> None:
+        await self.write_buffer.close()
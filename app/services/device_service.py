@@ -1,14 +1,18 @@
 """
 GazeHome AI Services - Device Management Service
-MongoDB 기기 관리 서비스
+기기 관리 서비스 (저장소: MongoDB 또는 메모리)
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
-from app.core.config import MONGODB_URL, MONGODB_DATABASE
-from app.models.device_management import UserDevice, DeviceType, DeviceRegistrationRequest
+from app.core.config import STORAGE_BACKEND
+from app.core.database import get_database
+from app.repositories.base import DeviceRepository
+from app.models.device_management import (
+    UserDevice, DeviceType, DeviceRegistrationRequest,
+    DEVICE_ACTIONS, get_supported_actions, UserDeviceRecord
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,42 +21,33 @@ class DeviceService:
     """기기 관리 서비스"""
     
     def __init__(self):
-        self.client = None
-        self.database = None
-        self.collection = None
+        self.repository: Optional[DeviceRepository] = None
     
     async def connect(self):
-        """MongoDB 연결"""
+        """저장소 연결 (STORAGE_BACKEND=memory면 메모리 저장소)"""
         try:
-            if MONGODB_URL:
-                self.client = AsyncIOMotorClient(MONGODB_URL)
-                self.database = self.client[MONGODB_DATABASE or "gazehome"]
-                self.collection = self.database["user_devices"]
-                logger.info("MongoDB 연결 성공")
+            if STORAGE_BACKEND == "memory":
+                from app.repositories.memory import MemoryDeviceRepository
+                self.repository = MemoryDeviceRepository()
+                logger.info("메모리 기기 저장소 사용")
             else:
-                logger.warning("MONGODB_URL이 설정되지 않음. 메모리 모드로 동작")
+                from app.repositories.mongo import MongoDeviceRepository
+                # 공유 MongoDB 클라이언트 사용 (별도 커넥션 풀을 만들지 않음)
+                self.repository = MongoDeviceRepository(await get_database())
+                logger.info("MongoDB 기기 저장소 사용")
         except Exception as e:
             logger.error(f"MongoDB 연결 실패: {e}")
             raise
     
     async def disconnect(self):
-        """MongoDB 연결 해제"""
-        if self.client:
-            self.client.close()
-            logger.info("MongoDB 연결 해제")
+        """저장소 정리 (공유 MongoDB 클라이언트는 lifespan에서 종료)"""
+        if self.repository:
+            await self.repository.close()
+            self.repository = None
     
     async def register_device(self, user_id: str, device_data: DeviceRegistrationRequest) -> UserDevice:
-        """기기 등록"""
+        """기기 등록 (upsert 단일 라운드트립, 중복은 unique 인덱스로 감지)"""
         try:
-            # 중복 기기 확인
-            existing_device = await self.collection.find_one({
-                "user_id": user_id,
-                "device_id": device_data.device_id
-            })
-            
-            if existing_device:
-                raise ValueError(f"기기 {device_data.device_id}가 이미 등록되어 있습니다")
-            
             # 새 기기 생성
             device = UserDevice(
                 user_id=user_id,
@@ -62,9 +57,12 @@ class DeviceService:
                 supported_actions=device_data.supported_actions
             )
             
-            # MongoDB에 저장
-            result = await self.collection.insert_one(device.dict(by_alias=True))
-            device.id = result.inserted_id
+            # 존재하지 않을 때만 삽입
+            inserted_id = await self.repository.insert_if_absent(device.dict(by_alias=True))
+            if inserted_id is None:
+                raise ValueError(f"기기 {device_data.device_id}가 이미 등록되어 있습니다")
+            
+            device.id = inserted_id
             
             logger.info(f"기기 등록 완료: {device_data.device_id}")
             return device
@@ -73,15 +71,11 @@ class DeviceService:
             logger.error(f"기기 등록 실패: {e}")
             raise
     
-    async def get_user_devices(self, user_id: str) -> List[UserDevice]:
-        """사용자 기기 목록 조회"""
+    async def get_user_devices(self, user_id: str, lean: bool = True) -> List[Union[UserDevice, UserDeviceRecord]]:
+        """사용자 기기 목록 조회 (lean=True면 검증 생략)"""
         try:
-            cursor = self.collection.find({"user_id": user_id, "is_active": True})
-            devices = []
-            
-            async for doc in cursor:
-                device = UserDevice(**doc)
-                devices.append(device)
+            docs = await self.repository.find_active(user_id)
+            devices = [UserDeviceRecord(doc) if lean else UserDevice(**doc) for doc in docs]
             
             logger.info(f"사용자 {user_id}의 기기 {len(devices)}개 조회")
             return devices
@@ -90,35 +84,28 @@ class DeviceService:
             logger.error(f"기기 목록 조회 실패: {e}")
             raise
     
-    async def get_device_by_id(self, user_id: str, device_id: str) -> Optional[UserDevice]:
-        """특정 기기 조회"""
+    async def get_device_by_id(self, user_id: str, device_id: str, lean: bool = True) -> Optional[Union[UserDevice, UserDeviceRecord]]:
+        """특정 기기 조회 (lean=True면 검증 생략)"""
         try:
-            doc = await self.collection.find_one({
-                "user_id": user_id,
-                "device_id": device_id,
-                "is_active": True
-            })
+            doc = await self.repository.find_active_one(user_id, device_id)
             
             if doc:
-                return UserDevice(**doc)
+                return UserDeviceRecord(doc) if lean else UserDevice(**doc)
             return None
             
         except Exception as e:
             logger.error(f"기기 조회 실패: {e}")
             raise
     
-    async def update_device(self, user_id: str, device_id: str, update_data: Dict[str, Any]) -> Optional[UserDevice]:
-        """기기 정보 업데이트"""
+    async def update_device(self, user_id: str, device_id: str, update_data: Dict[str, Any], lean: bool = True) -> Optional[Union[UserDevice, UserDeviceRecord]]:
+        """기기 정보 업데이트 (갱신 후 문서를 한 번에 반환, lean=True면 검증 생략)"""
         try:
             update_data["updated_at"] = datetime.utcnow()
             
-            result = await self.collection.update_one(
-                {"user_id": user_id, "device_id": device_id},
-                {"$set": update_data}
-            )
+            doc = await self.repository.update(user_id, device_id, update_data)
             
-            if result.modified_count > 0:
-                return await self.get_device_by_id(user_id, device_id)
+            if doc and doc.get("is_active", True):
+                return UserDeviceRecord(doc) if lean else UserDevice(**doc)
             return None
             
         except Exception as e:
@@ -128,29 +115,12 @@ class DeviceService:
     async def deactivate_device(self, user_id: str, device_id: str) -> bool:
         """기기 비활성화"""
         try:
-            result = await self.collection.update_one(
-                {"user_id": user_id, "device_id": device_id},
-                {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
-            )
-            
-            return result.modified_count > 0
+            return await self.repository.deactivate(user_id, device_id, datetime.utcnow())
             
         except Exception as e:
             logger.error(f"기기 비활성화 실패: {e}")
             raise
 
 
-# 기기 타입별 지원 액션 매핑
-DEVICE_ACTIONS = {
-    DeviceType.AIR_PURIFIER: ["turn_on", "turn_off", "clean", "auto"],
-    DeviceType.AIR_CONDITIONER: ["aircon_on", "aircon_off"] + [f"temp_{i}" for i in range(18, 31)]
-}
-
-
-def get_supported_actions(device_type: DeviceType) -> List[str]:
-    """기기 타입별 지원 액션 반환"""
-    return DEVICE_ACTIONS.get(device_type, [])
-
-
 # 전역 서비스 인스턴스
 device_service = DeviceService()
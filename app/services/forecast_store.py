@@ -0,0 +1,221 @@
+"""
+GazeHome AI Services - Forecast Store
+위치별 날씨 예보/관측 시계열 (NumPy 배열, 시각 t의 온도·습도 보간)
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.clock import Clock, get_clock
+from app.repositories.base import ForecastRepository
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# (epoch 초, 온도, 습도)
+WeatherPoint = Tuple[float, float, float]
+
+
+class LocationSeries:
+    """위치 하나의 시계열 (시각 오름차순 float64 시각, float32 온도/습도)"""
+
+    __slots__ = ("times", "temperature", "humidity", "refreshed_at")
+
+    def __init__(self, times: np.ndarray, temperature: np.ndarray, humidity: np.ndarray, refreshed_at: float):
+        self.times = times
+        self.temperature = temperature
+        self.humidity = humidity
+        self.refreshed_at = refreshed_at
+
+    @classmethod
+    def from_points(cls, points: Sequence[WeatherPoint], refreshed_at: float) -> "LocationSeries":
+        data = np.array(sorted(points), dtype=np.float64).reshape(-1, 3)
+        return cls(data[:, 0], data[:, 1].astype(np.float32), data[:, 2].astype(np.float32), refreshed_at)
+
+    def points(self) -> List[WeatherPoint]:
+        return list(zip(self.times.tolist(), self.temperature.tolist(), self.humidity.tolist()))
+
+
+class ForecastStore:
+    """
+    위치별 날씨 시계열 저장소
+
+    예보는 위치마다 refresh_seconds에 한 번 일괄 조회해 배열로 보관하고 (예보 시작 이후 지점 교체,
+    실패 시 retry_seconds 뒤 재시도), 그 사이 들어온 현재 날씨 관측값은 같은 배열에 끼워 넣는다.
+    at()/sample()은 np.interp로 선형 보간하며 범위를 벗어난 시각은 양 끝 값으로 고정한다.
+    retention_seconds보다 오래된 지점은 버린다.
+    저장소가 있으면 예보를 갱신할 때마다 위치별 문서로 저장하고 재시작 시 load()로 복원한다.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Optional[List[WeatherPoint]]]],
+        repository: Optional[ForecastRepository] = None,
+        refresh_seconds: float = 10800.0,
+        retention_seconds: float = 86400.0,
+        retry_seconds: float = 600.0,
+        clock: Optional[Clock] = None
+    ):
+        self.fetch = fetch
+        self.repository = repository
+        self.refresh_seconds = refresh_seconds
+        self.retention_seconds = retention_seconds
+        self.retry_seconds = retry_seconds
+        self.clock = clock or get_clock()
+        self._series: Dict[str, LocationSeries] = {}
+        self._refreshing = set()
+        self._retry_at: Dict[str, float] = {}
+        self.stats = Counter()
+
+    def __contains__(self, location: str) -> bool:
+        return location in self._series
+
+    async def load(self) -> int:
+        """저장된 시계열 복원, 복원한 위치 수 반환"""
+        if self.repository is None:
+            return 0
+        try:
+            documents = await self.repository.load_all()
+        except Exception as e:
+            logger.error(f"❌ 날씨 시계열 복원 실패: {e}")
+            return 0
+        for document in documents:
+            if document.get("times"):
+                points = list(zip(document["times"], document["temperature"], document["humidity"]))
+                self._series[document["_id"]] = LocationSeries.from_points(points, document["refreshed_at"])
+        logger.info(f"✅ 날씨 시계열 복원: {len(documents)}개 위치")
+        return len(documents)
+
+    def needs_refresh(self, location: str) -> bool:
+        now = self.clock.time()
+        if now < self._retry_at.get(location, 0.0):
+            return False
+        series = self._series.get(location)
+        return series is None or now - series.refreshed_at >= self.refresh_seconds
+
+    async def refresh(self, location: str) -> bool:
+        """위치 예보 일괄 조회 후 교체 (같은 위치 갱신이 진행 중이면 건너뜀)"""
+        if location in self._refreshing:
+            return False
+        self._refreshing.add(location)
+        try:
+            self.stats["fetches"] += 1
+            points = await self.fetch(location)
+        except Exception as e:
+            logger.warning(f"⚠️ 날씨 예보 조회 실패 ({location}): {e}")
+            points = None
+        finally:
+            self._refreshing.discard(location)
+        now = self.clock.time()
+        if not points:
+            self.stats["failures"] += 1
+            self._retry_at[location] = now + self.retry_seconds
+            return False
+
+        self._retry_at.pop(location, None)
+        first = min(point[0] for point in points)
+        previous = self._series.get(location)
+        # 지난 관측/예보 지점은 보존 (보관 기간 내, 새 예보 시작 전까지), 이전 예보의 미래 지점은 교체
+        kept = [
+            point for point in previous.points()
+            if now - self.retention_seconds <= point[0] <= now and point[0] < first
+        ] if previous else []
+        series = LocationSeries.from_points(kept + list(points), now)
+        self._series[location] = series
+
+        if self.repository is not None:
+            try:
+                await self.repository.save({
+                    "_id": location,
+                    "times": series.times.tolist(),
+                    "temperature": series.temperature.tolist(),
+                    "humidity": series.humidity.tolist(),
+                    "refreshed_at": now
+                })
+            except Exception as e:
+                logger.error(f"❌ 날씨 시계열 저장 실패 ({location}): {e}")
+        return True
+
+    async def refresh_due(self, locations: Iterable[str]) -> int:
+        """갱신 주기가 지난 위치만 동시에 갱신, 갱신한 위치 수 반환"""
+        due = [location for location in locations if self.needs_refresh(location)]
+        if not due:
+            return 0
+        results = await asyncio.gather(*(self.refresh(location) for location in due))
+        return sum(results)
+
+    def observe(self, location: str, weather: Dict[str, Any]):
+        """현재 날씨 관측값을 현재 시각 지점으로 추가 (LocationWeather 조회 결과)"""
+        temperature, humidity = weather.get("temperature"), weather.get("humidity")
+        if temperature is None or humidity is None:
+            return
+        now = self.clock.time()
+        series = self._series.get(location)
+        if series is None:
+            self._series[location] = LocationSeries.from_points([(now, temperature, humidity)], 0.0)
+            self.stats["observations"] += 1
+            return
+
+        keep = series.times >= now - self.retention_seconds
+        times, temperatures, humidities = series.times[keep], series.temperature[keep], series.humidity[keep]
+        index = int(np.searchsorted(times, now))
+        series.times = np.insert(times, index, now)
+        series.temperature = np.insert(temperatures, index, np.float32(temperature))
+        series.humidity = np.insert(humidities, index, np.float32(humidity))
+        self.stats["observations"] += 1
+
+    def sample(self, location: str, times: Any) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """시각 배열(epoch 초)의 (온도, 습도) 보간 배열 - 시계열이 없으면 None"""
+        series = self._series.get(location)
+        if series is None:
+            return None
+        times = np.asarray(times, dtype=np.float64)
+        self.stats["interpolations"] += times.size
+        return np.interp(times, series.times, series.temperature), np.interp(times, series.times, series.humidity)
+
+    def at(self, location: str, timestamp: float) -> Optional[Tuple[float, float]]:
+        """시각 timestamp의 (온도, 습도) 보간값"""
+        sampled = self.sample(location, timestamp)
+        if sampled is None:
+            return None
+        return round(float(sampled[0]), 1), round(float(sampled[1]), 1)
+
+    def outlook(self, location: str, start: float, horizon_seconds: float, step_seconds: float = 1800.0) -> Optional[Dict[str, float]]:
+        """start부터 horizon_seconds 동안의 예상 범위 (step_seconds 간격 표본의 최저/최고, 끝 시각 값)"""
+        times = start + np.arange(0.0, horizon_seconds + step_seconds / 2, step_seconds)
+        sampled = self.sample(location, times)
+        if sampled is None:
+            return None
+        temperature, humidity = sampled
+        return {
+            "temperature_min": round(float(temperature.min()), 1),
+            "temperature_max": round(float(temperature.max()), 1),
+            "temperature_end": round(float(temperature[-1]), 1),
+            "humidity_min": round(float(humidity.min()), 1),
+            "humidity_max": round(float(humidity.max()), 1),
+            "humidity_end": round(float(humidity[-1]), 1)
+        }
+
+    def forget(self, location: str):
+        """더 이상 사용자가 없는 위치 정리"""
+        self._series.pop(location, None)
+        self._retry_at.pop(location, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계 반환"""
+        now = self.clock.time()
+        return {
+            "locations": len(self._series),
+            "points": int(sum(series.times.size for series in self._series.values())),
+            "covered_until": max((float(series.times[-1]) for series in self._series.values()), default=None),
+            "oldest_refresh_age_seconds": round(max(
+                (now - series.refreshed_at for series in self._series.values() if series.refreshed_at), default=0.0
+            ), 1),
+            "fetches": self.stats["fetches"],
+            "failures": self.stats["failures"],
+            "observations": self.stats["observations"],
+            "interpolations": self.stats["interpolations"]
+        }
@@ -0,0 +1,125 @@
+"""
+GazeHome AI Services - Recommendation Lifecycle Service
+대기 추천 만료 및 종료된 추천 아카이브 주기 작업
+"""
+
+import asyncio
+from typing import Dict, Any, Optional
+
+from app.core.config import (
+    RECOMMENDATION_PENDING_TTL_HOURS, RECOMMENDATION_ARCHIVE_AFTER_HOURS,
+    LIFECYCLE_SWEEP_INTERVAL_MINUTES, LIFECYCLE_LEASE_NAME,
+    SCHEDULER_LEASE_ENABLED, SCHEDULER_LEASE_TTL_SECONDS, SCHEDULER_LEASE_RENEW_SECONDS,
+    SCHEDULER_LEASE_SAFETY_MARGIN_SECONDS, SCHEDULER_INSTANCE_ID
+)
+from app.core.clock import Clock, get_clock
+from app.services.scheduler_lease import SchedulerLease
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RecommendationLifecycleService:
+    """
+    추천 수명 주기 관리 서비스
+
+    리스(lease)가 설정되면 리스를 보유한 인스턴스만 만료/아카이브를 실행하고,
+    나머지 레플리카는 같은 배치를 두고 경쟁하지 않도록 건너뛴다.
+    """
+
+    def __init__(self, clock: Optional[Clock] = None):
+        self.clock = clock or get_clock()
+        self.is_running = False
+        self.interval_minutes = LIFECYCLE_SWEEP_INTERVAL_MINUTES
+        self.task = None
+        self.last_sweep = None
+        self.last_result: Dict[str, int] = {}
+        self.lease: Optional[SchedulerLease] = None
+        self.skipped_sweeps = 0
+
+    async def start(self, interval_minutes: Optional[int] = None):
+        """주기 작업 시작"""
+        if self.is_running:
+            await self.stop()
+
+        self.interval_minutes = interval_minutes or LIFECYCLE_SWEEP_INTERVAL_MINUTES
+        if SCHEDULER_LEASE_ENABLED and self.lease is None:
+            from app.core.database import get_database
+            from app.repositories.mongo import MongoLeaseRepository
+            self.lease = SchedulerLease(
+                MongoLeaseRepository(await get_database()),
+                name=LIFECYCLE_LEASE_NAME,
+                holder_id=SCHEDULER_INSTANCE_ID,
+                ttl_seconds=SCHEDULER_LEASE_TTL_SECONDS,
+                renew_seconds=SCHEDULER_LEASE_RENEW_SECONDS,
+                safety_margin_seconds=SCHEDULER_LEASE_SAFETY_MARGIN_SECONDS,
+                clock=self.clock
+            )
+        if self.lease is not None:
+            await self.lease.start()
+
+        self.is_running = True
+        self.task = asyncio.create_task(self._run())
+        logger.info(f"추천 수명 주기 작업 시작: 간격={self.interval_minutes}분")
+
+    async def stop(self):
+        """주기 작업 중지"""
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        if self.lease is not None:
+            await self.lease.stop()
+        logger.info("추천 수명 주기 작업 중지")
+
+    async def _run(self):
+        """만료/아카이브 루프"""
+        while self.is_running:
+            try:
+                if self.lease is not None and not self.lease.is_leader:
+                    # 다른 인스턴스가 실행 중 - 리스는 백그라운드에서 계속 획득 시도
+                    self.skipped_sweeps += 1
+                else:
+                    await self.sweep_once()
+                await self.clock.sleep(self.interval_minutes * 60)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"추천 수명 주기 작업 오류: {e}")
+                await self.clock.sleep(60)
+
+    async def sweep_once(self) -> Dict[str, int]:
+        """한 번 실행: 오래된 대기 추천 만료 후 종료된 추천 아카이브"""
+        from app.services.recommendation_service import get_recommendation_service
+
+        recommendation_service = await get_recommendation_service()
+
+        expired = await recommendation_service.cleanup_expired_recommendations(
+            hours=RECOMMENDATION_PENDING_TTL_HOURS
+        )
+        archived = await recommendation_service.archive_recommendations(
+            older_than_hours=RECOMMENDATION_ARCHIVE_AFTER_HOURS
+        )
+
+        self.last_sweep = self.clock.now().isoformat()
+        self.last_result = {"expired": expired, "archived": archived}
+        logger.info(f"✅ 추천 수명 주기 작업 완료: 만료 {expired}개, 아카이브 {archived}개")
+        return self.last_result
+
+    def get_status(self) -> Dict[str, Any]:
+        """작업 상태 반환"""
+        return {
+            "is_running": self.is_running,
+            "interval_minutes": self.interval_minutes,
+            "last_sweep": self.last_sweep or "없음",
+            "last_result": self.last_result,
+            "skipped_sweeps": self.skipped_sweeps,
+            "leadership": self.lease.get_status() if self.lease is not None else None
+        }
+
+
+# 전역 수명 주기 서비스 인스턴스
+lifecycle_service = RecommendationLifecycleService()
@@ -0,0 +1,90 @@
+"""
+GazeHome AI Services - Pending Recommendation Index
+사용자/기기별 대기 중인 추천 인덱스 (중복 추천 방지용)
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from app.services.recommendation_stats import to_kst
+
+
+class PendingEntry:
+    """대기 중인 추천 한 건 요약"""
+
+    __slots__ = ("recommendation_id", "fingerprint", "created_at", "inputs")
+
+    def __init__(self, recommendation_id: str, fingerprint: str, created_at: datetime, inputs: Optional[str] = None):
+        self.recommendation_id = recommendation_id
+        self.fingerprint = fingerprint
+        self.created_at = to_kst(created_at)
+        # 생성 당시 입력 신호 요약 (없으면 비교하지 않음)
+        self.inputs = inputs
+
+
+class PendingIndex:
+    """
+    user_id -> device_id -> PendingEntry
+
+    사용자별로 처음 조회할 때 저장소(부분 인덱스 pending_user_device)에서 적재하고
+    이후에는 생성/확인/대체/만료 시점에 같이 갱신한다.
+    프로세스 로컬 인덱스이므로 다른 인스턴스에서 처리한 추천은 반영되지 않는다
+    (중복으로 판단하기 전에 저장소에서 다시 적재해 확인).
+    기기 제어가 없는 추천은 device_id None으로 묶는다.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Optional[str], PendingEntry]] = {}
+
+    def is_loaded(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def load(self, user_id: str, entries: Iterable[tuple]):
+        """(device_id, PendingEntry) 목록으로 사용자 인덱스 교체 (같은 기기는 최신 항목 유지)"""
+        devices: Dict[Optional[str], PendingEntry] = {}
+        for device_id, entry in entries:
+            current = devices.get(device_id)
+            if current is None or entry.created_at > current.created_at:
+                devices[device_id] = entry
+        self._entries[user_id] = devices
+
+    def devices(self, user_id: str) -> Dict[Optional[str], PendingEntry]:
+        return dict(self._entries.get(user_id, {}))
+
+    def get(self, user_id: str, device_id: Optional[str]) -> Optional[PendingEntry]:
+        return self._entries.get(user_id, {}).get(device_id)
+
+    def add(self, user_id: str, device_id: Optional[str], entry: PendingEntry):
+        """적재된 사용자에만 반영 (적재 전이면 다음 조회 때 저장소에서 읽음)"""
+        devices = self._entries.get(user_id)
+        if devices is not None:
+            devices[device_id] = entry
+
+    def discard(self, user_id: str, recommendation_id: str) -> bool:
+        """해당 추천이 인덱스에 있으면 제거 (다른 추천으로 이미 바뀌었으면 그대로)"""
+        devices = self._entries.get(user_id, {})
+        for device_id, entry in devices.items():
+            if entry.recommendation_id == recommendation_id:
+                del devices[device_id]
+                return True
+        return False
+
+    def discard_before(self, cutoff: datetime) -> int:
+        """cutoff 이전에 생성된 항목 제거 (만료 처리 후 호출)"""
+        cutoff = to_kst(cutoff)
+        removed = 0
+        for devices in self._entries.values():
+            stale = [device_id for device_id, entry in devices.items() if entry.created_at < cutoff]
+            for device_id in stale:
+                del devices[device_id]
+            removed += len(stale)
+        return removed
+
+    def forget(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return sum(len(devices) for devices in self._entries.values())
+
+    def loaded_users(self) -> int:
+        return len(self._entries)
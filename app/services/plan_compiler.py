@@ -0,0 +1,89 @@
+"""
+GazeHome AI Services - Control Plan Compiler
+LLM이 생성한 기기 제어 정보를 실행 가능한 계획으로 컴파일
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.models.device_management import (
+    DeviceType, POWER_ON_ACTIONS, POWER_OFF_ACTIONS, get_supported_actions
+)
+from app.models.recommendations import DeviceControl, ControlPlan, ControlStep
+
+logger = logging.getLogger(__name__)
+
+# 액션 간 기본 지연 시간 (기기 제어 간 충분한 간격)
+DEFAULT_ACTION_DELAY_SECONDS = 3
+
+# 한 계획에 허용되는 최대 단계 수
+MAX_PLAN_STEPS = 10
+
+
+class ControlPlanError(ValueError):
+    """실행 불가능한 제어 계획"""
+
+
+def compile_control_plan(
+    device_control: DeviceControl,
+    supported_actions: Optional[List[str]] = None
+) -> ControlPlan:
+    """
+    기기 제어 정보를 검증하고 정규화된 실행 계획으로 변환
+
+    - 기기 타입/ID 및 액션 지원 여부 검증
+    - order 기준 정렬 (같은 order는 원래 순서 유지)
+    - 단계별 지연 시간 확정 (기본 3초, 마지막 단계는 0)
+    - 전원을 끈 뒤 켜기 외의 액션이 오는 계획 거부
+    """
+    try:
+        device_type = DeviceType(device_control.device_type)
+    except ValueError:
+        raise ControlPlanError(f"지원하지 않는 기기 타입: {device_control.device_type}")
+
+    if not device_control.device_id:
+        raise ControlPlanError("device_id가 없는 제어 계획은 실행할 수 없습니다")
+
+    if device_control.actions:
+        ordered = sorted(device_control.actions, key=lambda a: a.order)
+        raw_steps = [(a.action, a.description, a.delay_seconds) for a in ordered]
+    elif device_control.action:
+        raw_steps = [(device_control.action, None, None)]
+    else:
+        raise ControlPlanError("실행할 액션이 없습니다")
+
+    if len(raw_steps) > MAX_PLAN_STEPS:
+        raise ControlPlanError(f"액션 수 초과: {len(raw_steps)}개 (최대 {MAX_PLAN_STEPS}개)")
+
+    allowed = set(supported_actions if supported_actions is not None else get_supported_actions(device_type))
+
+    steps = []
+    powered_off = False
+    for i, (action, description, delay_seconds) in enumerate(raw_steps):
+        if action not in allowed:
+            raise ControlPlanError(f"{device_type.value}에서 지원하지 않는 액션: {action}")
+
+        if powered_off and action not in POWER_ON_ACTIONS:
+            raise ControlPlanError(f"전원이 꺼진 뒤 실행할 수 없는 액션: {action}")
+        if action in POWER_OFF_ACTIONS:
+            powered_off = True
+        elif action in POWER_ON_ACTIONS:
+            powered_off = False
+
+        is_last = i == len(raw_steps) - 1
+        delay = 0 if is_last else (delay_seconds if delay_seconds and delay_seconds > 0 else DEFAULT_ACTION_DELAY_SECONDS)
+        steps.append(ControlStep(action=action, description=description, delay_after_seconds=delay))
+
+    plan = ControlPlan(
+        device_type=device_type.value,
+        device_id=device_control.device_id,
+        steps=steps
+    )
+    logger.info(f"✅ 실행 계획 컴파일 완료: {plan.device_id} ({len(steps)}단계)")
+    return plan
+
+
+def plan_fingerprint(plan: Dict[str, Any]) -> str:
+    """실행 계획 지문 (기기 + 액션 순서) - 같은 제어를 다시 추천하는지 비교용"""
+    actions = ">".join(step["action"] for step in plan.get("steps", []))
+    return f"{plan.get('device_type')}:{plan.get('device_id')}:{actions}"
@@ -0,0 +1,83 @@
+"""
+GazeHome AI Services - Recommendation Cache
+생성~확인 구간의 추천 문서를 보관하는 프로세스 내 LRU 캐시
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.core.clock import Clock, get_clock
+
+
+class RecommendationCache:
+    """
+    추천 문서 LRU 캐시
+
+    recommendation_id -> 문서(dict)를 최대 max_size개, ttl_seconds 동안 보관한다.
+    상태가 바뀌면 update()로 캐시된 문서도 함께 갱신(write-through)한다.
+    get()은 얕은 복사본을 반환하므로 호출자가 문서를 고쳐도 캐시는 바뀌지 않는다.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: int = 1800, clock: Optional[Clock] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock or get_clock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, recommendation_id: str) -> Optional[Dict[str, Any]]:
+        """캐시 조회 (만료된 항목은 제거, 얕은 복사본 반환)"""
+        entry = self._entries.get(recommendation_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, doc = entry
+        if expires_at < self.clock.monotonic():
+            del self._entries[recommendation_id]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(recommendation_id)
+        self.hits += 1
+        return dict(doc)
+
+    def put(self, doc: Dict[str, Any]):
+        """문서 저장 (용량 초과 시 가장 오래 사용되지 않은 항목 제거)"""
+        recommendation_id = doc["recommendation_id"]
+        self._entries[recommendation_id] = (self.clock.monotonic() + self.ttl_seconds, dict(doc))
+        self._entries.move_to_end(recommendation_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def update(self, recommendation_id: str, fields: Dict[str, Any]):
+        """캐시된 문서 필드 갱신 (write-through)"""
+        entry = self._entries.get(recommendation_id)
+        if entry is not None:
+            entry[1].update(fields)
+
+    def invalidate(self, recommendation_ids: Iterable[str]):
+        """지정한 항목 제거"""
+        for recommendation_id in recommendation_ids:
+            if self._entries.pop(recommendation_id, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Dict[str, Any]], bool]):
+        """조건에 맞는 항목 제거 (일괄 상태 변경용)"""
+        self.invalidate([key for key, (_, doc) in self._entries.items() if predicate(doc)])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 지표 반환"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -1,151 +1,558 @@
 """
 GazeHome AI Services - Recommendation Service
-MongoDB 추천 관리 서비스
+추천 관리 서비스 (저장소: MongoDB 또는 메모리)
 """
 
-from typing import List, Optional, Dict, Any
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from bson import ObjectId
+from collections import Counter
+from typing import List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
+import base64
+import json
 import logging
+import warnings
 
 from app.models.recommendations import (
-    Recommendation, RecommendationStatus, DeviceControl,
-    generate_recommendation_id, get_kst_now
+    Recommendation, RecommendationStatus, DeviceControl, ControlPlan,
+    generate_recommendation_id, RecommendationRecord
 )
+from app.core.clock import Clock, get_clock
 from app.core.database import get_database
+from app.core.metrics import RECOMMENDATION_RESULTS
+from app.core.tracing import traced
+from app.core.config import (
+    RECOMMENDATION_WRITE_LINGER_MS, RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_CACHE_TTL_SECONDS,
+    RECOMMENDATION_ARCHIVE_TTL_DAYS, STORAGE_BACKEND
+)
+from app.repositories.base import RecommendationRepository, StatsRepository, AgentStepRepository, Fence, StaleFencingTokenError
+from app.services.device_service import DeviceService, device_service
+from app.services.plan_compiler import compile_control_plan, plan_fingerprint
+from app.services.pending_index import PendingIndex, PendingEntry
+from app.services.recommendation_stats import RecommendationStatsStore, HOUR_KEY_FORMAT, to_kst
+from app.services.recommendation_cache import RecommendationCache
 
 logger = logging.getLogger(__name__)
 
+# 확인 처리 후 기기 제어 실행에 필요한 필드
+EXECUTION_PROJECTION = {
+    "recommendation_id": 1, "user_id": 1, "status": 1, "user_response": 1,
+    "device_control": 1, "control_plan": 1, "confirmed_at": 1
+}
+
+# 아카이브 대상 종료 상태
+TERMINAL_STATUSES = (
+    RecommendationStatus.EXPIRED,
+    RecommendationStatus.CONFIRMED,
+    RecommendationStatus.REJECTED,
+    RecommendationStatus.SUPERSEDED
+)
+
+# 목록 화면에 필요한 필드
+LIST_PROJECTION = {
+    "recommendation_id": 1, "user_id": 1, "title": 1,
+    "status": 1, "mode": 1, "created_at": 1
+}
+
+# 대기 중인 추천 인덱스 적재에 필요한 필드
+PENDING_PROJECTION = {
+    "recommendation_id": 1, "title": 1, "device_control": 1,
+    "control_plan": 1, "created_at": 1, "plan_inputs": 1
+}
+
+
+def recommendation_fingerprint(doc: Dict[str, Any]) -> str:
+    """같은 추천인지 비교하는 지문 (실행 계획이 있으면 계획, 없으면 제목)"""
+    plan = doc.get("control_plan")
+    if plan:
+        return plan_fingerprint(plan)
+    return f"text:{doc.get('title')}"
+
+
+def pending_device_id(doc: Dict[str, Any]) -> Optional[str]:
+    """대기 중인 추천 인덱스의 기기 키"""
+    device_control = doc.get("device_control") or {}
+    return device_control.get("device_id")
+
+
+def pending_entry(doc: Dict[str, Any]) -> PendingEntry:
+    """대기 중인 추천 인덱스 항목"""
+    return PendingEntry(doc["recommendation_id"], recommendation_fingerprint(doc), doc["created_at"], doc.get("plan_inputs"))
+
+
+def _found(result: Any) -> str:
+    """조회/전환 결과 분류 (실패해도 예외 대신 None/False를 돌려주는 연산용)"""
+    return "ok" if result else "miss"
+
+
+def encode_cursor(created_at: datetime, last_id: Any) -> str:
+    """마지막 항목의 (created_at, _id)를 불투명 커서 문자열로 변환"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(last_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    """커서 문자열을 (created_at, _id)로 복원 (잘못된 커서는 ValueError)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        # _id는 문자열로 저장됨 (PyObjectId = str)
+        return datetime.fromisoformat(payload["c"]), payload["i"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+
 
 class RecommendationService:
     """추천 관리 서비스"""
     
-    def __init__(self, db: AsyncIOMotorDatabase):
-        self.db = db
-        self.collection = db.recommendations
+    def __init__(
+        self,
+        repository: RecommendationRepository,
+        stats_repository: StatsRepository,
+        clock: Optional[Clock] = None,
+        agent_step_repository: Optional[AgentStepRepository] = None,
+        devices: Optional[DeviceService] = None
+    ):
+        self.repository = repository
+        # 실행 계획 검증에 쓸 사용자 기기 레코드 (지원 액션)
+        self.devices = devices or device_service
+        # 추천별 Agent 반복 기록 (없으면 저장하지 않음)
+        self.agent_steps = agent_step_repository
+        # 생성/확인 시각, 만료 기준 시각 (시뮬레이션에서는 가상 시계)
+        self.clock = clock or get_clock()
+        # 증분 통계 카운터
+        self.stats = RecommendationStatsStore(
+            stats_repository,
+            max_linger_ms=RECOMMENDATION_WRITE_LINGER_MS
+        )
+        # 생성~확인 구간 조회 캐시
+        self.cache = RecommendationCache(
+            max_size=RECOMMENDATION_CACHE_SIZE,
+            ttl_seconds=RECOMMENDATION_CACHE_TTL_SECONDS,
+            clock=self.clock
+        )
+        # 사용자/기기별 대기 중인 추천 (중복 생성 방지)
+        self.pending = PendingIndex()
+        self.dedup = Counter()
     
+    async def close(self):
+        """대기 중인 쓰기 및 통계 플러시"""
+        await self.repository.close()
+        await self.stats.close()
+        if self.agent_steps is not None:
+            await self.agent_steps.close()
+    
+    @staticmethod
+    def _to_model(doc: Dict[str, Any], lean: bool) -> Union[Recommendation, RecommendationRecord]:
+        """DB 문서를 모델로 변환 (lean=True면 검증 없는 경량 레코드)"""
+        return RecommendationRecord(doc) if lean else Recommendation(**doc)
+    
+    @traced("recommendation")
     async def create_recommendation(
         self, 
         title: str, 
         contents: str, 
         device_control: Optional[DeviceControl] = None,
         user_id: str = "default_user",
-        mode: str = "production"
+        mode: str = "production",
+        durable: bool = False,
+        control_plan: Optional[ControlPlan] = None,
+        agent_steps: Optional[Dict[str, Any]] = None,
+        plan_inputs: Optional[str] = None,
+        fence: Optional[Fence] = None
     ) -> str:
-        """새 추천 생성"""
+        """
+        새 추천 생성 (기본은 지연 쓰기, durable=True면 저장 완료까지 대기, agent_steps는 별도 컬렉션에 저장)
+        
+        fence가 있으면 저장소가 쓰기 직전에 리스 임기를 확인한다 (끝났으면 StaleFencingTokenError).
+        """
         try:
             recommendation_id = generate_recommendation_id()
             
+            # 실행 계획 컴파일 (검증 실패 시 ControlPlanError)
+            if control_plan is None and device_control:
+                control_plan = await self.compile_plan(user_id, device_control)
+            
             recommendation = Recommendation(
                 recommendation_id=recommendation_id,
                 user_id=user_id,
                 title=title,
                 contents=contents,
                 device_control=device_control,
+                control_plan=control_plan,
                 mode=mode,
-                status=RecommendationStatus.PENDING
+                status=RecommendationStatus.PENDING,
+                created_at=self.clock.now(),
+                plan_inputs=plan_inputs
             )
             
-            result = await self.collection.insert_one(recommendation.dict(by_alias=True))
+            doc = recommendation.dict(by_alias=True)
+            written = await self.repository.insert(doc, durable=durable, fence=fence)
+            self.stats.record_created(doc)
+            if written is not None and not durable:
+                written.add_done_callback(lambda future: self._on_deferred_insert(doc, future))
+            self.cache.put(doc)
+            self.pending.add(user_id, pending_device_id(doc), pending_entry(doc))
+            if agent_steps:
+                await self._save_agent_steps(recommendation_id, user_id, agent_steps, doc["created_at"])
             
-            if result.inserted_id:
-                logger.info(f"✅ 추천 생성 완료: {recommendation_id}")
-                return recommendation_id
-            else:
-                raise Exception("추천 생성 실패")
+            logger.info(f"✅ 추천 생성 완료: {recommendation_id}")
+            return recommendation_id
                 
         except Exception as e:
             logger.error(f"❌ 추천 생성 실패: {e}")
             raise
     
-    async def get_recommendation_by_id(self, recommendation_id: str) -> Optional[Recommendation]:
-        """추천 ID로 추천 조회"""
+    async def compile_plan(self, user_id: str, device_control: DeviceControl) -> ControlPlan:
+        """
+        사용자 기기 레코드의 지원 액션으로 실행 계획 컴파일
+        
+        등록되지 않은 기기이거나 기기 저장소가 연결되지 않았으면 기기 타입 기본 액션으로 검증
+        """
+        supported_actions = None
+        if self.devices.repository is not None and device_control.device_id:
+            device = await self.devices.get_device_by_id(user_id, device_control.device_id)
+            if device is not None:
+                supported_actions = device.supported_actions
+        return compile_control_plan(device_control, supported_actions)
+    
+    def _on_deferred_insert(self, doc: Dict[str, Any], future):
+        """지연 삽입이 실패하면 이미 반영한 통계/캐시/대기 인덱스를 되돌림"""
+        if future.cancelled() or future.exception() is None:
+            return
+        recommendation_id = doc["recommendation_id"]
+        self.stats.record_removed([doc])
+        self.cache.invalidate([recommendation_id])
+        self.pending.discard(doc["user_id"], recommendation_id)
+        logger.error(f"❌ 추천 지연 저장 실패, 통계에서 제외: {recommendation_id}")
+    
+    @traced("recommendation", outcome=_found)
+    async def get_recommendation_by_id(
+        self,
+        recommendation_id: str,
+        lean: bool = True,
+        fields: Optional[List[str]] = None
+    ) -> Optional[Union[Recommendation, RecommendationRecord]]:
+        """추천 ID로 추천 조회 (캐시 우선, lean=True면 경량 레코드, fields로 프로젝션)"""
         try:
-            doc = await self.collection.find_one({"recommendation_id": recommendation_id})
+            cached = self.cache.get(recommendation_id)
+            if cached is not None:
+                return self._to_model(cached, lean)
+            
+            projection = {field: 1 for field in fields} if fields else None
+            doc = await self.repository.find_by_id(recommendation_id, projection)
             
             if doc:
-                return Recommendation(**doc)
+                # 프로젝션 없이 읽은 전체 문서만 캐시
+                if projection is None:
+                    self.cache.put(doc)
+                return self._to_model(doc, lean)
             return None
             
         except Exception as e:
             logger.error(f"❌ 추천 조회 실패: {e}")
             return None
     
+    @traced("recommendation", outcome=_found)
     async def confirm_recommendation(
         self, 
         recommendation_id: str, 
-        user_response: str
-    ) -> Optional[Recommendation]:
-        """추천 확인 처리"""
+        user_response: str,
+        lean: bool = True
+    ) -> Optional[Union[Recommendation, RecommendationRecord]]:
+        """추천 확인 처리 (PENDING 상태에서만 전환, 캐시 적중 시 조회 없이 갱신만 수행)"""
         try:
-            # 추천 조회
-            recommendation = await self.get_recommendation_by_id(recommendation_id)
-            
-            if not recommendation:
-                logger.warning(f"❌ 추천을 찾을 수 없음: {recommendation_id}")
+            cached = self.cache.get(recommendation_id)
+            if cached is not None and cached.get("status") != RecommendationStatus.PENDING:
+                logger.warning(f"❌ 이미 처리된 추천: {recommendation_id}")
                 return None
             
-            # 상태 업데이트
             status = RecommendationStatus.CONFIRMED if user_response.upper() == "YES" else RecommendationStatus.REJECTED
             
             update_data = {
                 "status": status,
                 "user_response": user_response.upper(),
-                "confirmed_at": get_kst_now()
+                "confirmed_at": self.clock.now()
             }
             
-            result = await self.collection.update_one(
-                {"recommendation_id": recommendation_id},
-                {"$set": update_data}
-            )
+            # PENDING 상태 조건으로 원자적 갱신 - 중복 피드백에 의한 이중 실행 방지
+            # (결과 확인이 필요하므로 쓰기 버퍼를 거치지 않음)
+            if cached is not None:
+                # 캐시 적중: 문서는 캐시에 있으므로 갱신 결과만 확인
+                if await self.repository.transition(recommendation_id, RecommendationStatus.PENDING, update_data):
+                    self.cache.update(recommendation_id, update_data)
+                    updated_doc = {**cached, **update_data}
+                else:
+                    # 다른 프로세스에서 이미 처리됨 - 오래된 캐시/대기 인덱스 항목 제거
+                    self.cache.invalidate([recommendation_id])
+                    self.pending.discard(cached["user_id"], recommendation_id)
+                    updated_doc = None
+            else:
+                updated_doc = await self.repository.transition_and_get(
+                    recommendation_id,
+                    RecommendationStatus.PENDING,
+                    update_data,
+                    projection=EXECUTION_PROJECTION if lean else None
+                )
+            
+            if updated_doc:
+                self.stats.record_transition(RecommendationStatus.PENDING, status)
             
-            if result.modified_count > 0:
+            if updated_doc:
+                self.pending.discard(updated_doc["user_id"], recommendation_id)
                 logger.info(f"✅ 추천 확인 처리 완료: {recommendation_id} -> {status}")
-                
-                # 업데이트된 추천 반환
-                updated_doc = await self.collection.find_one({"recommendation_id": recommendation_id})
-                return Recommendation(**updated_doc)
+                return self._to_model(updated_doc, lean)
             else:
-                logger.warning(f"❌ 추천 확인 처리 실패: {recommendation_id}")
+                logger.warning(f"❌ 추천을 찾을 수 없거나 이미 처리됨: {recommendation_id}")
                 return None
                 
         except Exception as e:
             logger.error(f"❌ 추천 확인 처리 실패: {e}")
             return None
     
-    async def mark_hardware_sent(self, recommendation_id: str) -> bool:
-        """하드웨어 전송 완료 표시"""
+    async def get_outstanding(self, user_id: str, confirm: bool = False) -> Dict[Optional[str], PendingEntry]:
+        """
+        사용자의 대기 중인 추천 (기기별, 처음 조회 시 저장소에서 적재)
+        
+        confirm=True면 저장소(부분 인덱스 pending_user_device)에서 다시 적재한다.
+        다른 인스턴스에서 확인/대체된 추천은 로컬 인덱스에 남아 있으므로 중복으로 판단하기 전에 사용한다.
+        """
+        if confirm or not self.pending.is_loaded(user_id):
+            docs = await self.repository.find_by_user_status(user_id, RecommendationStatus.PENDING, PENDING_PROJECTION)
+            self.pending.load(user_id, ((pending_device_id(doc), pending_entry(doc)) for doc in docs))
+        return self.pending.devices(user_id)
+    
+    @traced("recommendation", outcome=lambda result: result[1])
+    async def create_or_supersede(
+        self,
+        title: str,
+        contents: str,
+        device_control: Optional[DeviceControl] = None,
+        user_id: str = "default_user",
+        mode: str = "production",
+        agent_steps: Optional[Dict[str, Any]] = None,
+        durable: bool = False,
+        plan_inputs: Optional[str] = None,
+        fence: Optional[Fence] = None
+    ) -> Tuple[str, str]:
+        """
+        같은 기기에 대기 중인 추천이 있으면 중복 생성 대신 처리
+        
+        - duplicate: 대기 중인 추천과 실행 계획이 같음 (저장소에서 대기 상태 확인) → 저장/전송 없이 기존 ID 반환
+        - superseded: 계획이 다름 → 새 추천을 만들고 기존 추천은 superseded로 전환
+        - created: 대기 중인 추천 없음
+        fence가 있으면 새 추천 저장과 기존 추천 대체 모두 리스 임기를 확인한 뒤 쓴다.
+        """
+        control_plan = await self.compile_plan(user_id, device_control) if device_control else None
+        probe = {
+            "title": title,
+            "device_control": device_control.dict() if device_control else None,
+            "control_plan": control_plan.dict() if control_plan else None
+        }
+        device_id = pending_device_id(probe)
+        device_type = device_control.device_type if device_control else "none"
+        
+        fingerprint = recommendation_fingerprint(probe)
+        existing = (await self.get_outstanding(user_id)).get(device_id)
+        if existing is not None and existing.fingerprint == fingerprint:
+            # 로컬 인덱스만 믿지 않고 저장소에서 아직 대기 중인지 확인
+            existing = (await self.get_outstanding(user_id, confirm=True)).get(device_id)
+        if existing is not None and existing.fingerprint == fingerprint:
+            self.dedup["duplicate"] += 1
+            RECOMMENDATION_RESULTS.inc("duplicate", device_type)
+            if agent_steps:
+                # 생략된 생성도 비용 집계를 위해 기존 추천 ID로 기록
+                await self._save_agent_steps(
+                    existing.recommendation_id, user_id, agent_steps, self.clock.now(), dedup="duplicate"
+                )
+            logger.info(f"중복 추천 생략: 사용자={user_id}, 기기={device_id}, 대기 중={existing.recommendation_id}")
+            return existing.recommendation_id, "duplicate"
+        
+        recommendation_id = await self.create_recommendation(
+            title=title,
+            contents=contents,
+            device_control=device_control,
+            user_id=user_id,
+            mode=mode,
+            control_plan=control_plan,
+            agent_steps=agent_steps,
+            durable=durable,
+            plan_inputs=plan_inputs,
+            fence=fence
+        )
+        
+        if existing is not None and await self.supersede_recommendation(
+            existing.recommendation_id, recommendation_id, fence=fence
+        ):
+            self.dedup["superseded"] += 1
+            RECOMMENDATION_RESULTS.inc("superseded", device_type)
+            return recommendation_id, "superseded"
+        
+        self.dedup["created"] += 1
+        RECOMMENDATION_RESULTS.inc("created", device_type)
+        return recommendation_id, "created"
+    
+    @traced("recommendation", outcome=_found)
+    async def supersede_recommendation(
+        self, recommendation_id: str, superseded_by: str, fence: Optional[Fence] = None
+    ) -> bool:
+        """대기 중인 추천을 새 추천으로 대체 (PENDING 상태에서만 전환)"""
         try:
-            result = await self.collection.update_one(
-                {"recommendation_id": recommendation_id},
-                {"$set": {"hardware_sent_at": get_kst_now()}}
-            )
+            update_data = {
+                "status": RecommendationStatus.SUPERSEDED,
+                "superseded_by": superseded_by
+            }
+            if not await self.repository.transition(
+                recommendation_id, RecommendationStatus.PENDING, update_data, fence=fence
+            ):
+                # 그 사이 확인/만료됨
+                self.cache.invalidate([recommendation_id])
+                return False
+            self.stats.record_transition(RecommendationStatus.PENDING, RecommendationStatus.SUPERSEDED)
             
-            if result.modified_count > 0:
-                logger.info(f"✅ 하드웨어 전송 완료 표시: {recommendation_id}")
-                return True
-            else:
-                logger.warning(f"❌ 하드웨어 전송 표시 실패: {recommendation_id}")
+            self.cache.update(recommendation_id, update_data)
+            logger.info(f"✅ 추천 대체 완료: {recommendation_id} -> {superseded_by}")
+            return True
+            
+        except StaleFencingTokenError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ 추천 대체 실패: {e}")
+            return False
+    
+    async def _save_agent_steps(
+        self,
+        recommendation_id: str,
+        user_id: str,
+        agent_steps: Dict[str, Any],
+        created_at: datetime,
+        dedup: Optional[str] = None
+    ):
+        """Agent 반복 기록 저장 (dedup은 중복으로 생략된 생성 표시, 실패해도 추천 생성은 계속)"""
+        if self.agent_steps is None:
+            return
+        doc = {
+            **agent_steps,
+            "recommendation_id": recommendation_id,
+            "user_id": user_id,
+            "created_at": created_at
+        }
+        if dedup is not None:
+            doc["dedup"] = dedup
+        try:
+            await self.agent_steps.insert(doc)
+        except Exception as e:
+            logger.error(f"❌ Agent 반복 기록 저장 실패: {recommendation_id}: {e}")
+    
+    async def get_agent_steps(self, recommendation_id: str) -> Optional[Dict[str, Any]]:
+        """추천별 Agent 반복 기록 조회 (추천을 만든 생성 + duplicates: 중복으로 생략된 이후 생성)"""
+        if self.agent_steps is None:
+            return None
+        docs = await self.agent_steps.find_by_recommendation(recommendation_id)
+        if not docs:
+            return None
+        created = next((doc for doc in docs if doc.get("dedup") is None), docs[0])
+        return {**created, "duplicates": [doc for doc in docs if doc is not created]}
+    
+    def get_dedup_stats(self) -> Dict[str, Any]:
+        """중복 추천 방지 통계"""
+        return {
+            "created": self.dedup["created"],
+            "superseded": self.dedup["superseded"],
+            "duplicate": self.dedup["duplicate"],
+            "skipped_before_generation": self.dedup["skipped_before_generation"],
+            "outstanding": len(self.pending),
+            "loaded_users": self.pending.loaded_users()
+        }
+    
+    @traced("recommendation", outcome=_found)
+    async def mark_hardware_sent(
+        self, recommendation_id: str, durable: bool = False, fence: Optional[Fence] = None
+    ) -> bool:
+        """
+        하드웨어 전송 완료 표시 (지연 쓰기, fence가 있으면 리스 임기 확인 후 바로 반영)
+
+        durable=True 또는 fence가 있으면 추천이 있어 표시했는지를 반환한다.
+        지연 쓰기는 반영 결과를 알 수 없으므로 예약되면 True를 반환한다 (없는 추천도 True).
+        """
+        try:
+            update_data = {"hardware_sent_at": self.clock.now()}
+            matched = await self.repository.set_fields(recommendation_id, update_data, durable=durable, fence=fence)
+            if matched is False:
+                logger.warning(f"⚠️ 하드웨어 전송 표시 대상 추천 없음: {recommendation_id}")
                 return False
+            self.cache.update(recommendation_id, update_data)
+            logger.info(f"✅ 하드웨어 전송 완료 표시: {recommendation_id}")
+            return True
                 
+        except StaleFencingTokenError:
+            raise
         except Exception as e:
             logger.error(f"❌ 하드웨어 전송 표시 실패: {e}")
             return False
     
+    async def _keyset_page(
+        self,
+        filter: Dict[str, Any],
+        cursor: Optional[str],
+        projection: Optional[Dict[str, int]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """(created_at, _id) 기준 커서 페이지 조회 - 다음 페이지 확인을 위해 하나 더 조회"""
+        after = decode_cursor(cursor) if cursor else None
+        return await self.repository.find_page(filter, after, limit + 1, projection)
+    
+    @traced("recommendation")
+    async def list_recommendations(
+        self,
+        user_id: Optional[str] = None,
+        status: Optional[RecommendationStatus] = None,
+        mode: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """추천 목록 조회 (커서 페이지네이션, 목록 필드만 반환)"""
+        filter = {}
+        if user_id:
+            filter["user_id"] = user_id
+        if status:
+            filter["status"] = status
+        if mode:
+            filter["mode"] = mode
+        
+        docs = await self._keyset_page(filter, cursor, LIST_PROJECTION, limit)
+        
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+        
+        logger.info(f"✅ 추천 목록 조회 완료: {len(docs)}개 (filter={filter})")
+        return docs, next_cursor
+    
+    @traced("recommendation")
     async def get_recommendations_by_status(
         self, 
         status: RecommendationStatus,
         limit: int = 10,
-        skip: int = 0
-    ) -> List[Recommendation]:
-        """상태별 추천 목록 조회"""
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        lean: bool = True
+    ) -> List[Union[Recommendation, RecommendationRecord]]:
+        """
+        상태별 추천 목록 조회 (커서 페이지네이션)
+
+        skip은 이전 호출 방식 호환용으로 남겨 둔 인자다 (deprecated, cursor 사용 권장).
+        cursor 없이 skip을 주면 앞의 skip개를 읽고 버리므로 페이지가 깊을수록 느려진다.
+        """
         try:
-            cursor = self.collection.find({"status": status}).sort("created_at", -1).skip(skip).limit(limit)
-            
-            recommendations = []
-            async for doc in cursor:
-                recommendations.append(Recommendation(**doc))
+            if skip and cursor is None:
+                warnings.warn(
+                    "get_recommendations_by_status(skip=...)는 deprecated입니다. cursor를 사용하세요.",
+                    DeprecationWarning,
+                    stacklevel=3  # traced 래퍼를 건너뛰고 호출한 곳을 가리킴
+                )
+                docs = (await self._keyset_page({"status": status}, None, None, skip + limit))[skip:]
+            else:
+                docs = await self._keyset_page({"status": status}, cursor, None, limit)
+            recommendations = [self._to_model(doc, lean) for doc in docs[:limit]]
             
             logger.info(f"✅ 상태별 추천 조회 완료: {status} ({len(recommendations)}개)")
             return recommendations
@@ -158,56 +565,84 @@ class RecommendationService:
         """대기중인 추천 목록 조회"""
         return await self.get_recommendations_by_status(RecommendationStatus.PENDING, limit)
     
-    async def get_recommendation_statistics(self) -> Dict[str, Any]:
-        """추천 통계 조회"""
+    @traced("recommendation")
+    async def get_recommendation_statistics(self, hours: int = 24) -> Dict[str, Any]:
+        """추천 통계 조회 (증분 카운터 기반 - 컬렉션 크기와 무관)"""
         try:
-            pipeline = [
-                {
-                    "$group": {
-                        "_id": "$status",
-                        "count": {"$sum": 1}
-                    }
-                }
-            ]
-            
-            stats = {}
-            async for doc in self.collection.aggregate(pipeline):
-                stats[doc["_id"]] = doc["count"]
-            
-            # 전체 개수
-            total_count = await self.collection.count_documents({})
+            stats = await self.stats.get_counts("status")
+            now = self.clock.now()
+            hour_keys = [(now - timedelta(hours=h)).strftime(HOUR_KEY_FORMAT) for h in range(hours)]
             
             return {
-                "total_recommendations": total_count,
+                "total_recommendations": await self.stats.get_count("total", "all"),
                 "by_status": stats,
-                "pending_count": stats.get(RecommendationStatus.PENDING, 0),
-                "confirmed_count": stats.get(RecommendationStatus.CONFIRMED, 0),
-                "rejected_count": stats.get(RecommendationStatus.REJECTED, 0)
+                "by_mode": await self.stats.get_counts("mode"),
+                "by_device_type": await self.stats.get_counts("device_type"),
+                "by_hour": await self.stats.get_counts("hour", hour_keys),
+                "pending_count": stats.get(RecommendationStatus.PENDING.value, 0),
+                "confirmed_count": stats.get(RecommendationStatus.CONFIRMED.value, 0),
+                "rejected_count": stats.get(RecommendationStatus.REJECTED.value, 0)
             }
             
         except Exception as e:
             logger.error(f"❌ 추천 통계 조회 실패: {e}")
             return {}
     
+    async def get_user_recommendation_count(self, user_id: str) -> int:
+        """사용자별 추천 수 조회"""
+        return await self.stats.get_count("user", user_id)
+    
+    @traced("recommendation")
     async def cleanup_expired_recommendations(self, hours: int = 24) -> int:
         """만료된 추천 정리 (24시간 이상 대기중인 것들)"""
         try:
-            cutoff_time = get_kst_now() - timedelta(hours=hours)
-            
-            result = await self.collection.update_many(
-                {
-                    "status": RecommendationStatus.PENDING,
-                    "created_at": {"$lt": cutoff_time}
-                },
-                {"$set": {"status": RecommendationStatus.EXPIRED}}
+            cutoff_time = self.clock.now() - timedelta(hours=hours)
+            
+            expired = await self.repository.update_status_before(
+                RecommendationStatus.PENDING, RecommendationStatus.EXPIRED, cutoff_time
             )
+            self.stats.record_transition(RecommendationStatus.PENDING, RecommendationStatus.EXPIRED, expired)
             
-            logger.info(f"✅ 만료된 추천 정리 완료: {result.modified_count}개")
-            return result.modified_count
+            if expired:
+                self.cache.invalidate_where(
+                    lambda doc: doc.get("status") == RecommendationStatus.PENDING
+                    and to_kst(doc["created_at"]) < cutoff_time
+                )
+                self.pending.discard_before(cutoff_time)
+            logger.info(f"✅ 만료된 추천 정리 완료: {expired}개")
+            return expired
             
         except Exception as e:
             logger.error(f"❌ 만료된 추천 정리 실패: {e}")
             return 0
+    
+    @traced("recommendation")
+    async def archive_recommendations(self, older_than_hours: int = 24, batch_size: int = 1000) -> int:
+        """종료 상태(만료/승인/거부) 추천을 아카이브 컬렉션으로 일괄 이동"""
+        cutoff_time = self.clock.now() - timedelta(hours=older_than_hours)
+        statuses = [s.value for s in TERMINAL_STATUSES]
+        archived = 0
+        
+        try:
+            while True:
+                # 아카이브된 추천도 통계에 포함 (카운터는 그대로, 재계산은 두 컬렉션 합계)
+                docs = await self.repository.archive_batch(statuses, cutoff_time, batch_size)
+                if not docs:
+                    break
+                
+                self.cache.invalidate(doc["recommendation_id"] for doc in docs)
+                archived += len(docs)
+                
+                if len(docs) < batch_size:
+                    break
+            
+            if archived:
+                logger.info(f"✅ 추천 아카이브 완료: {archived}개")
+            return archived
+            
+        except Exception as e:
+            logger.error(f"❌ 추천 아카이브 실패: {e}")
+            return archived
 
 
 # 전역 서비스 인스턴스
@@ -219,7 +654,21 @@ async def get_recommendation_service() -> RecommendationService:
     global _recommendation_service
     
     if _recommendation_service is None:
-        db = await get_database()
-        _recommendation_service = RecommendationService(db)
+        if STORAGE_BACKEND == "memory":
+            from app.repositories.memory import MemoryRecommendationRepository, MemoryStatsRepository, MemoryAgentStepRepository
+            _recommendation_service = RecommendationService(
+                MemoryRecommendationRepository(archive_ttl_days=RECOMMENDATION_ARCHIVE_TTL_DAYS),
+                MemoryStatsRepository(),
+                agent_step_repository=MemoryAgentStepRepository()
+            )
+        else:
+            from app.repositories.mongo import MongoRecommendationRepository, MongoStatsRepository, MongoAgentStepRepository
+            db = await get_database()
+            _recommendation_service = RecommendationService(
+                MongoRecommendationRepository(db),
+                MongoStatsRepository(db),
+                agent_step_repository=MongoAgentStepRepository(db)
+            )
+        logger.info(f"추천 저장소: {STORAGE_BACKEND}")
     
     return _recommendation_service
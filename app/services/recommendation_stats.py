@@ -0,0 +1,207 @@
+"""
+GazeHome AI Services - Recommendation Statistics Store
+추천 통계 카운터 증분 관리 및 주기적 재계산
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.recommendations import RecommendationStatus, get_kst_now
+
+logger = logging.getLogger(__name__)
+
+# 카운터 차원
+DIMENSIONS = ("total", "status", "user", "mode", "device_type", "hour")
+
+# 시간대별 카운터 키 형식 (KST)
+HOUR_KEY_FORMAT = "%Y%m%d%H"
+
+
+def _counter_id(dimension: str, key: str) -> str:
+    """카운터 문서 ID"""
+    return f"{dimension}:{key}"
+
+
+def _status_value(status: Any) -> str:
+    """RecommendationStatus 또는 문자열을 문자열 값으로 변환"""
+    return status.value if isinstance(status, RecommendationStatus) else str(status)
+
+
+def to_kst(value: datetime) -> datetime:
+    """DB에서 읽은 naive UTC 시간을 포함해 KST로 변환"""
+    kst = get_kst_now().tzinfo
+    if value.tzinfo is None:
+        return (value + timedelta(hours=9)).replace(tzinfo=kst)
+    return value.astimezone(kst)
+
+
+def counter_keys(doc: Dict[str, Any]) -> List[str]:
+    """추천 문서가 기여하는 카운터 ID 목록"""
+    device_control = doc.get("device_control") or {}
+    created_at = doc.get("created_at") or get_kst_now()
+    return [
+        _counter_id("total", "all"),
+        _counter_id("status", _status_value(doc.get("status", RecommendationStatus.PENDING))),
+        _counter_id("user", doc.get("user_id", "unknown")),
+        _counter_id("mode", doc.get("mode", "unknown")),
+        _counter_id("device_type", device_control.get("device_type") or "none"),
+        _counter_id("hour", to_kst(created_at).strftime(HOUR_KEY_FORMAT)),
+    ]
+
+
+class RecommendationStatsStore:
+    """
+    추천 통계 카운터 저장소
+
+    생성/상태 전환 시 증분을 메모리에 모아 두었다가 배치로 카운터 저장소
+    (StatsRepository)에 반영한다. 조회는 카운터만 읽으므로 추천 컬렉션 크기와 무관하다.
+
+    카운터는 추천과 다른 컬렉션에 있어 문서 쓰기와 같은 bulk_write로 $inc 할 수 없고,
+    트랜잭션은 레플리카 셋이 필요하며 쓰기 버퍼 배치를 깨므로 쓰지 않는다. 따라서 카운터는
+    근사값이다 (반영 전 프로세스가 죽으면 최대 linger 구간의 증분이 사라짐). 지연 삽입이
+    실패하면 호출자가 record_removed로 되돌리고, 남은 오차는 주기적 재계산(reconcile)이 보정한다.
+    """
+
+    def __init__(self, repository, max_linger_ms: int = 50):
+        self.repository = repository
+        self.max_linger_ms = max_linger_ms
+        self._deltas: Dict[str, int] = defaultdict(int)
+        self._flush_lock = asyncio.Lock()
+        self._linger_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+    def record_created(self, doc: Dict[str, Any]):
+        """추천 생성 반영"""
+        for key in counter_keys(doc):
+            self._deltas[key] += 1
+        self._schedule_flush()
+
+    def record_transition(self, old_status: Any, new_status: Any, count: int = 1):
+        """상태 전환 반영"""
+        if count <= 0:
+            return
+        self._deltas[_counter_id("status", _status_value(old_status))] -= count
+        self._deltas[_counter_id("status", _status_value(new_status))] += count
+        self._schedule_flush()
+
+    def record_removed(self, docs: Iterable[Dict[str, Any]]):
+        """반영되지 않은 추천 제거 (지연 삽입 실패 등)"""
+        for doc in docs:
+            for key in counter_keys(doc):
+                self._deltas[key] -= 1
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """최대 대기 시간 후 플러시 예약"""
+        if self._linger_handle is None:
+            self._linger_handle = asyncio.get_running_loop().call_later(self.max_linger_ms / 1000, self._linger)
+
+    def _linger(self):
+        self._linger_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """누적된 증분을 카운터 컬렉션에 반영"""
+        async with self._flush_lock:
+            await self._flush_deltas()
+
+    async def _flush_deltas(self):
+        deltas = {key: delta for key, delta in self._deltas.items() if delta}
+        self._deltas.clear()
+        if not deltas:
+            return
+        try:
+            await self.repository.increment(deltas)
+        except BaseException as e:
+            # 실패/취소된 증분은 되돌려 다음 플러시에서 재시도
+            for key, delta in deltas.items():
+                self._deltas[key] += delta
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"❌ 추천 통계 반영 실패: {e}")
+
+    def _pending(self, key: str) -> int:
+        """아직 반영되지 않은 증분"""
+        return self._deltas.get(key, 0)
+
+    async def get_counts(self, dimension: str, keys: Optional[List[str]] = None) -> Dict[str, int]:
+        """차원별 카운터 조회 (keys 지정 시 해당 키만)"""
+        counts = await self.repository.find_counts(dimension, keys)
+        prefix = f"{dimension}:"
+        for key, delta in self._deltas.items():
+            if key.startswith(prefix) and delta:
+                value = key[len(prefix):]
+                if keys is None or value in keys:
+                    counts[value] = counts.get(value, 0) + delta
+        return counts
+
+    async def get_count(self, dimension: str, key: str) -> int:
+        """단일 카운터 조회"""
+        counter_id = _counter_id(dimension, key)
+        return await self.repository.get(counter_id) + self._pending(counter_id)
+
+    async def reconcile(self, source) -> int:
+        """
+        추천 저장소(RecommendationRepository) 집계로 카운터 보정 (드리프트 보정) - 보정한 카운터 수 반환
+
+        추천 쓰기 버퍼와 누적 증분을 먼저 반영한 뒤 집계한다. 카운터는 덮어쓰지 않고
+        (집계 - 현재 카운터)만큼 $inc 하므로 다른 레플리카가 그 사이 반영한 증분을 지우지 않는다.
+        집계 중에 들어온 쓰기는 이번 보정에 오차로 남을 수 있으며 다음 회차에 보정된다.
+        """
+        async with self._flush_lock:
+            await source.flush()
+            await self._flush_deltas()
+            current = {
+                _counter_id(dimension, key): count
+                for dimension in DIMENSIONS
+                for key, count in (await self.repository.find_counts(dimension)).items()
+            }
+            counts = await source.count_counters()
+
+            corrections: Dict[str, int] = {}
+            for key in set(counts) | set(current):
+                correction = counts.get(key, 0) - current.get(key, 0)
+                if correction:
+                    corrections[key] = correction
+            if corrections:
+                await self.repository.increment(corrections)
+        logger.info(f"✅ 추천 통계 재계산 완료: 카운터 {len(counts)}개, 보정 {len(corrections)}개")
+        return len(corrections)
+
+    def start_reconciler(self, source, interval_minutes: int):
+        """주기적 재계산 작업 시작"""
+        if self._reconcile_task and not self._reconcile_task.done():
+            return
+        self._reconcile_task = asyncio.create_task(self._run_reconciler(source, interval_minutes))
+        logger.info(f"추천 통계 재계산 작업 시작: 간격={interval_minutes}분")
+
+    async def _run_reconciler(self, source, interval_minutes: int):
+        """재계산 루프"""
+        while True:
+            try:
+                await asyncio.sleep(interval_minutes * 60)
+                await self.reconcile(source)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ 추천 통계 재계산 실패: {e}")
+
+    async def close(self):
+        """재계산 작업 중지 및 남은 증분 반영 (진행 중인 플러시는 취소하지 않고 기다림)"""
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+        if self._linger_handle is not None:
+            self._linger_handle.cancel()
+            self._linger_handle = None
+        if self._flush_task is not None and not self._flush_task.done():
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
@@ -0,0 +1,128 @@
+"""
+GazeHome AI Services - Schedule Queue
+사용자별 다음 실행 시각을 관리하는 최소 힙 (추가/삭제/재조정 O(log n))
+"""
+
+import hashlib
+import heapq
+import itertools
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 실행 슬롯 기준 시각 (1970-01-01 00:00 KST) - 하루를 나누는 간격이면 매일 같은 시각에 실행
+ANCHOR_EPOCH = -9 * 3600
+
+
+def phase_offset(user_id: str, interval_seconds: float) -> float:
+    """사용자별 고정 위상 (간격 내 균등 분산, 프로세스와 무관하게 항상 같은 값)"""
+    digest = hashlib.md5(user_id.encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64 * interval_seconds
+
+
+def next_slot(user_id: str, interval_seconds: float, after: float) -> float:
+    """ANCHOR_EPOCH + 위상 + k * 간격 중 after 이후 가장 이른 슬롯"""
+    base = ANCHOR_EPOCH + phase_offset(user_id, interval_seconds)
+    k = math.floor((after - base) / interval_seconds) + 1
+    return base + k * interval_seconds
+
+
+class UserSchedule:
+    """사용자별 스케줄 상태 (시각은 epoch 초)"""
+
+    __slots__ = ("user_id", "interval_minutes", "next_run", "last_run", "last_result", "version")
+
+    def __init__(self, user_id: str, interval_minutes: int, next_run: float):
+        self.user_id = user_id
+        self.interval_minutes = interval_minutes
+        self.next_run = next_run
+        self.last_run: Optional[float] = None
+        self.last_result: Optional[str] = None
+        self.version = 0
+
+    @property
+    def interval_seconds(self) -> float:
+        return self.interval_minutes * 60
+
+
+class ScheduleQueue:
+    """
+    스케줄 최소 힙
+
+    재조정/삭제 시 기존 힙 항목을 찾아 지우지 않고 버전만 올린 뒤
+    꺼낼 때 오래된 항목을 버린다 (lazy deletion). 오래된 항목이 많이
+    쌓이면 힙을 다시 만든다.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._schedules: Dict[str, UserSchedule] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._schedules
+
+    def __iter__(self) -> Iterator[UserSchedule]:
+        return iter(list(self._schedules.values()))
+
+    def get(self, user_id: str) -> Optional[UserSchedule]:
+        return self._schedules.get(user_id)
+
+    def _push(self, schedule: UserSchedule):
+        schedule.version += 1
+        heapq.heappush(self._heap, (schedule.next_run, next(self._seq), schedule.user_id, schedule.version))
+        if len(self._heap) > 2 * len(self._schedules) + 64:
+            self._compact()
+
+    def _compact(self):
+        """오래된 힙 항목 제거 후 재구성"""
+        self._heap = [item for item in self._heap if self._is_current(item)]
+        heapq.heapify(self._heap)
+
+    def _is_current(self, item: Tuple[float, int, str, int]) -> bool:
+        schedule = self._schedules.get(item[2])
+        return schedule is not None and schedule.version == item[3]
+
+    def add(self, user_id: str, interval_minutes: int, next_run: float) -> UserSchedule:
+        """사용자 추가 (이미 있으면 간격과 다음 실행 시각 재조정)"""
+        schedule = self._schedules.get(user_id)
+        if schedule is None:
+            schedule = UserSchedule(user_id, interval_minutes, next_run)
+            self._schedules[user_id] = schedule
+        else:
+            schedule.interval_minutes = interval_minutes
+            schedule.next_run = next_run
+        self._push(schedule)
+        return schedule
+
+    def reschedule(self, user_id: str, next_run: float) -> Optional[UserSchedule]:
+        """다음 실행 시각 변경"""
+        schedule = self._schedules.get(user_id)
+        if schedule is not None:
+            schedule.next_run = next_run
+            self._push(schedule)
+        return schedule
+
+    def remove(self, user_id: str) -> bool:
+        """사용자 제거 (힙 항목은 꺼낼 때 버려짐)"""
+        return self._schedules.pop(user_id, None) is not None
+
+    def peek(self) -> Optional[UserSchedule]:
+        """가장 먼저 실행될 스케줄"""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._schedules[self._heap[0][2]] if self._heap else None
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> List[UserSchedule]:
+        """now 이전에 실행 예정인 스케줄을 꺼냄 (재조정 전까지 힙에서 빠짐)"""
+        due = []
+        while limit is None or len(due) < limit:
+            schedule = self.peek()
+            if schedule is None or schedule.next_run > now:
+                break
+            heapq.heappop(self._heap)
+            schedule.version += 1
+            due.append(schedule)
+        return due
@@ -0,0 +1,186 @@
+"""
+GazeHome AI Services - Scheduler Executor
+스케줄러 실행을 고정 개수의 워커와 제한된 큐로 처리하는 실행기
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 이전 실행이 끝나지 않은 사용자 처리 방식
+OVERLAP_POLICIES = ("skip", "merge")
+
+
+class SchedulerExecutor:
+    """
+    스케줄러 실행기
+
+    - 워커 worker_count개가 크기 queue_size인 큐에서 사용자를 꺼내 실행한다.
+    - 큐가 가득 차면 submit()이 빈자리가 날 때까지 대기한다 (백프레셔).
+    - 같은 사용자가 이미 큐에 있으면 합친다 (중복 실행 없음).
+    - 같은 사용자가 실행 중이면 overlap_policy에 따라
+      skip: 이번 실행을 버리고, merge: 현재 실행이 끝난 뒤 한 번만 다시 실행한다.
+    - 워커 밖에서 여러 사용자를 함께 실행할 때(도시 단위 재계산)는 claim()/release()로
+      같은 중복 실행 방지를 거치고, slots()로 워커와 같은 동시 실행 한도를 나눠 쓴다.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str], Awaitable[Any]],
+        worker_count: int = 4,
+        queue_size: int = 100,
+        overlap_policy: str = "skip",
+        max_samples: int = 1000
+    ):
+        if overlap_policy not in OVERLAP_POLICIES:
+            raise ValueError(f"지원하지 않는 중복 실행 정책: {overlap_policy}")
+        self.run = run
+        self.worker_count = worker_count
+        self.queue_size = queue_size
+        self.overlap_policy = overlap_policy
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._queued: Set[str] = set()
+        self._running: Set[str] = set()
+        self._rerun: Set[str] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._durations_ms = deque(maxlen=max_samples)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.merged = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def start(self):
+        """워커 시작"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._slots = asyncio.Semaphore(self.worker_count)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.worker_count)]
+        logger.info(f"스케줄러 실행기 시작: 워커={self.worker_count}, 큐={self.queue_size}, 중복 정책={self.overlap_policy}")
+
+    async def close(self):
+        """워커 중지 (대기 중인 실행은 버림)"""
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        self._queued.clear()
+        self._running.clear()
+        self._rerun.clear()
+
+    def slots(self) -> asyncio.Semaphore:
+        """워커와 워커 밖 실행이 함께 쓰는 동시 실행 한도 (worker_count개)"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.worker_count)
+        return self._slots
+
+    def claim(self, user_ids: List[str]) -> List[str]:
+        """워커 밖에서 실행할 사용자 중 큐에 있거나 실행 중이 아닌 사용자만 실행 중으로 표시해 반환"""
+        claimed = []
+        for user_id in user_ids:
+            if user_id in self._queued or user_id in self._running:
+                self.skipped += 1
+                continue
+            self._running.add(user_id)
+            claimed.append(user_id)
+        return claimed
+
+    def release(self, user_ids: List[str]):
+        """claim()한 사용자 실행 완료 (그사이 합쳐진 재실행 요청은 큐에 넣음)"""
+        for user_id in user_ids:
+            self._running.discard(user_id)
+            if user_id in self._rerun:
+                self._rerun.discard(user_id)
+                if self._queue is not None:
+                    self._resubmit(user_id)
+
+    async def submit(self, user_id: str) -> str:
+        """실행 요청 (queued / merged / skipped 반환, 큐가 가득 차면 대기)"""
+        if user_id in self._queued:
+            self.merged += 1
+            return "merged"
+        if user_id in self._running:
+            if self.overlap_policy == "merge":
+                self._rerun.add(user_id)
+                self.merged += 1
+                return "merged"
+            self.skipped += 1
+            logger.info(f"이전 실행이 끝나지 않아 건너뜀: 사용자={user_id}")
+            return "skipped"
+
+        self._queued.add(user_id)
+        self.submitted += 1
+        await self._queue.put(user_id)
+        return "queued"
+
+    async def _worker(self, index: int):
+        """큐에서 사용자를 꺼내 실행"""
+        while True:
+            user_id = await self._queue.get()
+            self._queued.discard(user_id)
+            self._running.add(user_id)
+            started = time.perf_counter()
+            try:
+                async with self.slots():
+                    await self.run(user_id)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"스케줄러 실행 실패: 사용자={user_id}, 워커={index}, 오류={e}")
+            finally:
+                self._durations_ms.append((time.perf_counter() - started) * 1000)
+                self._running.discard(user_id)
+                self._queue.task_done()
+
+            if user_id in self._rerun:
+                self._rerun.discard(user_id)
+                self._resubmit(user_id)
+
+    def _resubmit(self, user_id: str):
+        """합쳐진 재실행 요청 (워커가 대기하지 않도록 큐가 가득 차면 버림)"""
+        try:
+            self._queue.put_nowait(user_id)
+            self._queued.add(user_id)
+            self.submitted += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"스케줄러 큐가 가득 차 재실행을 버림: 사용자={user_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """실행기 지표 반환"""
+        samples = sorted(self._durations_ms)
+
+        def percentile(p: float) -> float:
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)], 1) if samples else 0.0
+
+        return {
+            "workers": self.worker_count,
+            "queue_size": self.queue_size,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "overlap_policy": self.overlap_policy,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "merged": self.merged,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "run_duration_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(samples[-1], 1) if samples else 0.0
+            }
+        }
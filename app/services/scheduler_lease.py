@@ -0,0 +1,152 @@
+"""
+GazeHome AI Services - Scheduler Lease
+여러 프로세스/레플리카 중 하나만 스케줄러를 실행하도록 하는 리더 리스
+"""
+
+import asyncio
+import os
+import socket
+from typing import Any, Dict, Optional
+
+from app.core.clock import Clock, get_clock
+from app.repositories.base import Fence, LeaseRepository
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def default_holder_id() -> str:
+    """프로세스 식별자 (호스트명:PID)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SchedulerLease:
+    """
+    스케줄러 리더 리스
+
+    renew_seconds마다 리스를 연장(보유 중이 아니면 획득 시도)한다.
+    보유 여부는 마지막으로 연장 요청을 보낸 시각 + ttl - 여유 시간까지만 인정하므로
+    연장이 실패하거나 저장소에 연결할 수 없으면 다른 인스턴스가 획득하기 전에 스스로 물러난다.
+    획득할 때마다 증가하는 펜싱 토큰으로 부작용 직전에 여전히 같은 임기인지 확인하고,
+    저장소 쓰기에는 fence()를 넘겨 저장소가 쓰기 직전에 리스 문서의 현재 토큰과 다시 비교하게 한다.
+    """
+
+    def __init__(
+        self,
+        repository: LeaseRepository,
+        name: str = "scheduler",
+        holder_id: Optional[str] = None,
+        ttl_seconds: float = 30.0,
+        renew_seconds: float = 10.0,
+        safety_margin_seconds: float = 2.0,
+        clock: Optional[Clock] = None
+    ):
+        if renew_seconds >= ttl_seconds - safety_margin_seconds:
+            raise ValueError("renew_seconds는 ttl_seconds - safety_margin_seconds보다 짧아야 합니다")
+        self.repository = repository
+        self.clock = clock or get_clock()
+        self.name = name
+        self.holder_id = holder_id or default_holder_id()
+        self.ttl_seconds = ttl_seconds
+        self.renew_seconds = renew_seconds
+        self.safety_margin_seconds = safety_margin_seconds
+        self.token: Optional[int] = None
+        self._valid_until = 0.0
+        self.task = None
+        self.acquisitions = 0
+        self.losses = 0
+        self.renew_failures = 0
+
+    @property
+    def is_leader(self) -> bool:
+        """현재 리스 보유 중인지 (로컬 단조 시계 기준, 저장소 조회 없음)"""
+        return self.token is not None and self.clock.monotonic() < self._valid_until
+
+    def holds(self, token: Optional[int]) -> bool:
+        """주어진 펜싱 토큰의 임기가 아직 유효한지"""
+        return token is not None and self.is_leader and self.token == token
+
+    def fence(self, token: int) -> Fence:
+        """저장소 쓰기에 넘길 펜싱 토큰 (쓰기 직전에 리스 문서와 비교)"""
+        return Fence(self.repository, self.name, token, self.clock.utcnow)
+
+    async def start(self):
+        """리스 유지 루프 시작 (즉시 한 번 획득 시도)"""
+        if self.task:
+            return
+        await self.renew_once()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """리스 유지 루프 중지 및 리스 반납 (다른 인스턴스가 TTL을 기다리지 않고 획득)"""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.token is not None:
+            try:
+                await self.repository.release(self.name, self.holder_id, self.token)
+                logger.info(f"스케줄러 리스 반납: {self.holder_id} (토큰 {self.token})")
+            except Exception as e:
+                logger.warning(f"스케줄러 리스 반납 실패: {e}")
+            self._lose()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.clock.sleep(self.renew_seconds)
+                await self.renew_once()
+            except asyncio.CancelledError:
+                break
+
+    async def renew_once(self) -> bool:
+        """보유 중이면 연장, 아니면 획득 시도 (보유 여부 반환)"""
+        # 요청 전에 시각을 기록해 왕복 시간만큼 임기를 짧게 본다
+        requested_at = self.clock.monotonic()
+        now = self.clock.utcnow()
+        try:
+            if self.token is not None:
+                if await self.repository.renew(self.name, self.holder_id, self.token, self.ttl_seconds, now):
+                    self._valid_until = requested_at + self.ttl_seconds - self.safety_margin_seconds
+                    return True
+                logger.warning(f"⚠️ 스케줄러 리스 상실: {self.holder_id} (토큰 {self.token})")
+                self._lose()
+
+            token = await self.repository.acquire(self.name, self.holder_id, self.ttl_seconds, now)
+            if token is not None:
+                self.token = token
+                self._valid_until = requested_at + self.ttl_seconds - self.safety_margin_seconds
+                self.acquisitions += 1
+                logger.info(f"✅ 스케줄러 리스 획득: {self.holder_id} (토큰 {token})")
+                return True
+            return False
+
+        except Exception as e:
+            # 저장소 오류 시 임기가 끝날 때까지는 보유 상태 유지, 이후 is_leader가 False
+            self.renew_failures += 1
+            logger.error(f"❌ 스케줄러 리스 갱신 실패: {e}")
+            return self.is_leader
+
+    def _lose(self):
+        if self.token is not None:
+            self.losses += 1
+        self.token = None
+        self._valid_until = 0.0
+
+    def get_status(self) -> Dict[str, Any]:
+        """리스 상태 반환"""
+        return {
+            "name": self.name,
+            "holder_id": self.holder_id,
+            "is_leader": self.is_leader,
+            "fencing_token": self.token,
+            "valid_for_seconds": round(max(0.0, self._valid_until - self.clock.monotonic()), 3) if self.token else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+            "renew_seconds": self.renew_seconds,
+            "acquisitions": self.acquisitions,
+            "losses": self.losses,
+            "renew_failures": self.renew_failures
+        }
@@ -4,39 +4,192 @@ GazeHome AI Services - Scheduler Service
 """
 
 import asyncio
+import json
 import logging
+import math
+from collections import Counter, defaultdict
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 import pytz
+from app.core.clock import Clock, get_clock
+from app.core.metrics import SCHEDULER_DECISIONS, StageTimer
+from app.core.tracing import start_trace, traced
+from app.core.config import (
+    SCHEDULER_WORKERS, SCHEDULER_QUEUE_SIZE, SCHEDULER_OVERLAP_POLICY,
+    SCHEDULER_CATCHUP_GRACE_SECONDS, SCHEDULER_WEATHER_LOCATION, WEATHER_API_KEY,
+    TRIGGER_TEMPERATURE_BAND, TRIGGER_HUMIDITY_BAND, TRIGGER_TIME_BOUNDARIES,
+    TRIGGER_QUIET_PERIOD_MINUTES, SCHEDULER_LEASE_ENABLED, SCHEDULER_LEASE_NAME, SCHEDULER_LEASE_TTL_SECONDS,
+    SCHEDULER_LEASE_RENEW_SECONDS, SCHEDULER_LEASE_SAFETY_MARGIN_SECONDS, SCHEDULER_INSTANCE_ID,
+    SCHEDULER_STATE_PERSIST_SECONDS, SCHEDULER_RESTART_SPREAD_SECONDS, STORAGE_BACKEND,
+    WEATHER_CACHE_TTL_SECONDS, WEATHER_FANOUT_POLL_SECONDS, WEATHER_FORECAST_REFRESH_SECONDS,
+    WEATHER_FORECAST_DAYS, TRIGGER_FORECAST_HORIZON_MINUTES
+)
+from app.repositories.base import Fence, ScheduleStateRepository, StaleFencingTokenError
+from app.services.forecast_store import ForecastStore, WeatherPoint
+from app.services.schedule_queue import ScheduleQueue, UserSchedule, next_slot
+from app.services.scheduler_executor import SchedulerExecutor
+from app.services.scheduler_lease import SchedulerLease
+from app.services.trigger_engine import TriggerEngine, TriggerSignals
+from app.services.weather_fanout import DeviceProfile, LocationWeather, profile_key, retarget_device_control
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 대기 중인 추천이 있어도 계획 입력이 바뀌었으면 새로 생성할 트리거 (환경/기기 상태 변화, 예보상 변화, 수동 실행)
+MATERIAL_TRIGGERS = ("temperature", "humidity", "forecast", "device_state", "manual")
+
+
+def _run_outcome(result: Dict[str, Any]) -> str:
+    """run_once 결과 분류 (예외는 결과의 reason으로만 돌려줌)"""
+    if "trigger" not in result:
+        return "error"
+    return "recommended" if result.get("should_recommend") else "skipped"
+
+
+def _run_device_type(result: Dict[str, Any]) -> Optional[str]:
+    return (result.get("device_control") or {}).get("device_type")
+
+
 class SchedulerService:
-    """스마트 홈 추천 스케줄러 서비스"""
+    """
+    스마트 홈 추천 스케줄러 서비스
+
+    모든 사용자의 다음 실행 시각을 하나의 최소 힙(ScheduleQueue)에 두고
+    단일 루프가 가장 이른 실행 시각까지 대기한 뒤 도래한 사용자를
+    실행기(SchedulerExecutor)의 워커 풀에 넘긴다.
+    
+    실행 시각은 고정 기준 시각 + 사용자별 위상 + k * 간격 슬롯으로 정해지므로
+    실행 시간만큼 주기가 밀리지 않고, 같은 간격의 사용자들이 간격 전체에 고르게 분산된다.
+    슬롯보다 SCHEDULER_CATCHUP_GRACE_SECONDS 이상 늦은 회차는 건너뛰고
+    놓친 회차는 몰아서 실행하지 않는다.
+    
+    리스(lease)가 설정되면 리더인 인스턴스만 실행을 넘기고, 나머지는 슬롯만 넘기며 대기한다.
+    실행 도중 리스를 잃으면 (펜싱 토큰 확인) LLM 호출/저장/하드웨어 전송 전에 중단한다.
     
-    def __init__(self):
+    사용자별 다음 실행 시각, 마지막 결과, 트리거 기준값은 변경된 사용자만 모아
+    SCHEDULER_STATE_PERSIST_SECONDS마다 일괄 저장하고, 재시작 시 복원한다.
+    복원 시 이미 지난 실행은 한꺼번에 실행하지 않고 우선순위 순으로
+    SCHEDULER_RESTART_SPREAD_SECONDS 구간에 나눠 배치한다.
+    
+    날씨는 위치별로 공유(LocationWeather)하고, WEATHER_FANOUT_POLL_SECONDS마다 위치별 날씨 구간 변화를
+    한 번만 확인해 바뀐 도시의 사용자를 한꺼번에 다시 평가한다 (fan_out). 이때 기기 구성이 같은
+    가구끼리 묶어 추천을 한 번만 생성하고 가구별 device_id로 바꿔 저장/전송한다.
+    
+    예보는 위치별로 WEATHER_FORECAST_REFRESH_SECONDS마다 일괄 조회해 ForecastStore에 두고,
+    판단마다 추가 날씨 호출 없이 TRIGGER_FORECAST_HORIZON_MINUTES 뒤의 예상 날씨를 보간해 쓴다.
+    """
+    
+    def __init__(self, clock: Optional[Clock] = None):
+        # 시간 조회/대기 (시뮬레이션에서는 가상 시계)
+        self.clock = clock or get_clock()
         self.is_running = False
-        self.user_id = None
         self.interval_minutes = 30
+        self.queue = ScheduleQueue()
+        self.executor = SchedulerExecutor(
+            self._execute,
+            worker_count=SCHEDULER_WORKERS,
+            queue_size=SCHEDULER_QUEUE_SIZE,
+            overlap_policy=SCHEDULER_OVERLAP_POLICY
+        )
+        # 변화가 있을 때만 LLM을 호출하도록 판단
+        self.trigger_engine = TriggerEngine(
+            temperature_band=TRIGGER_TEMPERATURE_BAND,
+            humidity_band=TRIGGER_HUMIDITY_BAND,
+            time_boundaries=TRIGGER_TIME_BOUNDARIES,
+            quiet_period_minutes=TRIGGER_QUIET_PERIOD_MINUTES
+        )
         self.task = None
         self.last_check = None
+        self.last_lag_seconds = 0.0
+        self.catchup_grace_seconds = SCHEDULER_CATCHUP_GRACE_SECONDS
+        self.late_skips = 0
+        self.missed_slots = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        # 여러 인스턴스 중 리더만 실행 (None이면 항상 실행)
+        self.lease: Optional[SchedulerLease] = None
+        self.standby_skips = 0
+        self.fenced_runs = 0
+        # 재시작 복원용 상태 저장소 (None이면 저장하지 않음)
+        self.state_repository: Optional[ScheduleStateRepository] = None
+        self.persist_task = None
+        self._dirty = set()
+        self._removed = set()
+        self._restored = False
+        self.restored_users = 0
+        self.restored_overdue = 0
+        self.last_persist: Optional[float] = None
+        # 사용자별 날씨 위치와 위치별 사용자 (도시 단위 일괄 재계산용)
+        self.locations: Dict[str, str] = {}
+        self._users_by_location: Dict[str, Set[str]] = defaultdict(set)
+        # 위치별 예보/관측 시계열 (새로 조회한 현재 날씨도 관측값으로 기록)
+        self.forecasts = ForecastStore(
+            self._fetch_forecast,
+            refresh_seconds=WEATHER_FORECAST_REFRESH_SECONDS,
+            clock=self.clock
+        )
+        self.forecast_horizon_seconds = TRIGGER_FORECAST_HORIZON_MINUTES * 60
+        self.weather = LocationWeather(
+            self._fetch_weather,
+            ttl_seconds=WEATHER_CACHE_TTL_SECONDS,
+            temperature_band=TRIGGER_TEMPERATURE_BAND,
+            humidity_band=TRIGGER_HUMIDITY_BAND,
+            clock=self.clock,
+            on_update=self.forecasts.observe
+        )
+        self.weather_task = None
+        self.fanout = Counter()
+        
+    async def start(self, user_id: Optional[str] = None, interval_minutes: int = 30):
+        """스케줄러 시작 (user_id가 있으면 해당 사용자도 등록)"""
+        self.interval_minutes = interval_minutes
+        if user_id:
+            self.add_user(user_id, interval_minutes)
         
-    async def start(self, user_id: str, interval_minutes: int = 30):
-        """스케줄러 시작"""
         if self.is_running:
-            await self.stop()
+            return
+        
+        if SCHEDULER_LEASE_ENABLED and self.lease is None:
+            from app.core.database import get_database
+            from app.repositories.mongo import MongoLeaseRepository
+            self.lease = SchedulerLease(
+                MongoLeaseRepository(await get_database()),
+                name=SCHEDULER_LEASE_NAME,
+                holder_id=SCHEDULER_INSTANCE_ID,
+                ttl_seconds=SCHEDULER_LEASE_TTL_SECONDS,
+                renew_seconds=SCHEDULER_LEASE_RENEW_SECONDS,
+                safety_margin_seconds=SCHEDULER_LEASE_SAFETY_MARGIN_SECONDS,
+                clock=self.clock
+            )
+        if self.lease is not None:
+            await self.lease.start()
+        
+        if self.state_repository is None and STORAGE_BACKEND != "memory":
+            from app.core.database import get_database
+            from app.repositories.mongo import MongoScheduleStateRepository
+            self.state_repository = MongoScheduleStateRepository(await get_database())
+        if self.state_repository is not None:
+            if not self._restored:
+                await self.restore()
+            self.persist_task = asyncio.create_task(self._run_persister())
+        
+        if self.forecasts.repository is None and STORAGE_BACKEND != "memory":
+            from app.core.database import get_database
+            from app.repositories.mongo import MongoForecastRepository
+            self.forecasts.repository = MongoForecastRepository(await get_database())
+            await self.forecasts.load()
         
-        self.user_id = user_id
-        self.interval_minutes = interval_minutes
         self.is_running = True
+        self._wakeup = asyncio.Event()
+        self.executor.start()
         
         # 백그라운드 태스크 시작
         self.task = asyncio.create_task(self._run_scheduler())
-        logger.info(f"스케줄러 시작: 사용자={user_id}, 간격={interval_minutes}분")
+        if WEATHER_FANOUT_POLL_SECONDS > 0:
+            self.weather_task = asyncio.create_task(self._run_weather_watch())
+        logger.info(f"스케줄러 시작: 등록 사용자={len(self.queue)}명")
     
     async def stop(self):
-        """스케줄러 중지"""
+        """스케줄러 중지 (등록된 사용자 스케줄은 유지)"""
         self.is_running = False
         if self.task:
             self.task.cancel()
@@ -44,129 +197,313 @@ class SchedulerService:
                 await self.task
             except asyncio.CancelledError:
                 pass
+            self.task = None
+        if self.weather_task:
+            self.weather_task.cancel()
+            try:
+                await self.weather_task
+            except asyncio.CancelledError:
+                pass
+            self.weather_task = None
+        await self.executor.close()
+        if self.persist_task:
+            self.persist_task.cancel()
+            try:
+                await self.persist_task
+            except asyncio.CancelledError:
+                pass
+            self.persist_task = None
+        if self.state_repository is not None:
+            await self.persist_state()
+        if self.lease is not None:
+            await self.lease.stop()
         logger.info("스케줄러 중지")
     
+    def add_user(
+        self,
+        user_id: str,
+        interval_minutes: Optional[int] = None,
+        delay_seconds: Optional[float] = None,
+        location: Optional[str] = None
+    ) -> UserSchedule:
+        """사용자 스케줄 등록 또는 재조정 (O(log n), 기본은 다음 슬롯, delay_seconds 지정 시 그 후 실행)"""
+        interval_minutes = interval_minutes or self.interval_minutes
+        self._set_location(user_id, location or self.locations.get(user_id) or SCHEDULER_WEATHER_LOCATION)
+        now = self.clock.time()
+        if delay_seconds is None:
+            first_run = next_slot(user_id, interval_minutes * 60, now)
+        else:
+            first_run = now + delay_seconds
+        schedule = self.queue.add(user_id, interval_minutes, first_run)
+        self._mark_dirty(user_id)
+        self._wake()
+        logger.info(f"스케줄 등록: 사용자={user_id}, 간격={schedule.interval_minutes}분")
+        return schedule
+    
+    def remove_user(self, user_id: str) -> bool:
+        """사용자 스케줄 제거"""
+        removed = self.queue.remove(user_id)
+        if removed:
+            self.trigger_engine.forget(user_id)
+            self._set_location(user_id, None)
+            self._dirty.discard(user_id)
+            self._removed.add(user_id)
+            self._wake()
+            logger.info(f"스케줄 제거: 사용자={user_id}")
+        return removed
+    
+    def _set_location(self, user_id: str, location: Optional[str]):
+        """사용자 날씨 위치 변경 (None이면 제거)"""
+        previous = self.locations.pop(user_id, None)
+        if previous is not None:
+            users = self._users_by_location[previous]
+            users.discard(user_id)
+            if not users:
+                del self._users_by_location[previous]
+                self.weather.forget(previous)
+                self.forecasts.forget(previous)
+        if location is not None:
+            self.locations[user_id] = location
+            self._users_by_location[location].add(user_id)
+    
+    def location_of(self, user_id: str) -> str:
+        """사용자 날씨 위치 (등록되지 않았으면 기본 위치)"""
+        return self.locations.get(user_id, SCHEDULER_WEATHER_LOCATION)
+    
+    def _mark_dirty(self, user_id: str):
+        self._dirty.add(user_id)
+        self._removed.discard(user_id)
+    
+    def _wake(self):
+        """대기 중인 루프를 깨워 가장 이른 실행 시각을 다시 계산"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
     async def _run_scheduler(self):
-        """스케줄러 실행 루프"""
+        """스케줄러 실행 루프 (가장 이른 실행 시각까지 대기 후 도래한 사용자 실행)"""
         while self.is_running:
             try:
-                await self.run_once(self.user_id)
-                await asyncio.sleep(self.interval_minutes * 60)  # 분을 초로 변환
+                self._wakeup.clear()
+                head = self.queue.peek()
+                now = self.clock.time()
+                
+                if head is None or head.next_run > now:
+                    timeout = head.next_run - now if head else None
+                    await self.clock.wait(self._wakeup, timeout)
+                    continue
+                
+                due = self.queue.pop_due(now)
+                self.last_lag_seconds = now - due[0].next_run
+                # 도래한 사용자 배분 한 회 (큐 백프레셔 대기 포함)
+                with StageTimer("scheduler", "dispatch"):
+                    for schedule in due:
+                        lateness = now - schedule.next_run
+                        # 다음 슬롯은 실행 시간과 무관하게 기준 시각에서 계산 (드리프트 없음)
+                        self.queue.reschedule(schedule.user_id, next_slot(schedule.user_id, schedule.interval_seconds, now))
+                        self._mark_dirty(schedule.user_id)
+                        self.missed_slots += int(lateness // schedule.interval_seconds)
+                        if lateness > self.catchup_grace_seconds:
+                            self.late_skips += 1
+                            SCHEDULER_DECISIONS.inc("skip", "late_slot")
+                            continue
+                        # 리더가 아니면 슬롯만 넘김 (리더가 바뀌어도 같은 슬롯 기준으로 이어서 실행)
+                        if self.lease is not None and not self.lease.is_leader:
+                            self.standby_skips += 1
+                            SCHEDULER_DECISIONS.inc("skip", "standby")
+                            continue
+                        # 큐가 가득 차면 여기서 대기 (백프레셔)
+                        await self.executor.submit(schedule.user_id)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"스케줄러 실행 중 오류: {e}")
-                await asyncio.sleep(60)  # 오류 시 1분 대기
+                await self.clock.sleep(60)  # 오류 시 1분 대기
+    
+    async def _execute(self, user_id: str):
+        """워커에서 사용자 한 명 실행 및 결과 기록"""
+        started = self.clock.time()
+        fencing_token = self.lease.token if self.lease is not None else None
+        async with start_trace(f"scheduler.run {user_id}") as trace:
+            result = await self.run_once(user_id, fencing_token=fencing_token)
+            trace.status = result.get("trigger") or "error"
+        schedule = self.queue.get(user_id)
+        if schedule is not None:
+            schedule.last_run = started
+            schedule.last_result = result.get("recommendation_id") or result.get("reason")
+            self._mark_dirty(user_id)
+    
+    async def restore(self) -> int:
+        """저장된 스케줄 상태 복원 (지난 실행은 우선순위 순으로 분산 배치), 복원 사용자 수 반환"""
+        try:
+            states = await self.state_repository.load_all()
+        except Exception as e:
+            logger.error(f"❌ 스케줄 상태 복원 실패: {e}")
+            return 0
+        
+        now = self.clock.time()
+        overdue = []
+        for state in states:
+            user_id = state["_id"]
+            # 이미 등록된 사용자는 현재 간격 설정 유지
+            current = self.queue.get(user_id)
+            interval_minutes = current.interval_minutes if current else state["interval_minutes"]
+            schedule = self.queue.add(user_id, interval_minutes, state["next_run"])
+            if user_id not in self.locations:
+                self._set_location(user_id, state.get("location") or SCHEDULER_WEATHER_LOCATION)
+            schedule.last_run = state.get("last_run")
+            schedule.last_result = state.get("last_result")
+            if state.get("trigger_baseline"):
+                self.trigger_engine.restore_baseline(user_id, state["trigger_baseline"])
+            if schedule.next_run <= now:
+                overdue.append(schedule)
+        
+        # 간격 대비 가장 많이 밀린 사용자, 그다음 오래전에 실행된 사용자 먼저
+        overdue.sort(key=lambda s: (-(now - s.next_run) / s.interval_seconds, s.last_run or 0.0))
+        step = SCHEDULER_RESTART_SPREAD_SECONDS / len(overdue) if overdue else 0.0
+        for i, schedule in enumerate(overdue):
+            # 원래 슬롯이 더 빠르면 그 슬롯에 실행
+            spread_at = now + i * step
+            regular_at = next_slot(schedule.user_id, schedule.interval_seconds, now)
+            self.queue.reschedule(schedule.user_id, min(spread_at, regular_at))
+        
+        self._restored = True
+        self.restored_users = len(states)
+        self.restored_overdue = len(overdue)
+        self._wake()
+        logger.info(f"✅ 스케줄 상태 복원: {len(states)}명 (밀린 실행 {len(overdue)}명을 {SCHEDULER_RESTART_SPREAD_SECONDS}초에 분산)")
+        return len(states)
+    
+    async def persist_state(self) -> int:
+        """변경된 사용자 상태 일괄 저장 (리스 사용 시 리더만), 저장한 사용자 수 반환"""
+        if self.lease is not None and not self.lease.is_leader:
+            return 0
+        if not self._dirty and not self._removed:
+            return 0
+        
+        dirty, removed = self._dirty, self._removed
+        self._dirty, self._removed = set(), set()
+        states = []
+        for user_id in dirty:
+            schedule = self.queue.get(user_id)
+            if schedule is None:
+                continue
+            states.append({
+                "_id": user_id,
+                "interval_minutes": schedule.interval_minutes,
+                "location": self.location_of(user_id),
+                "next_run": schedule.next_run,
+                "last_run": schedule.last_run,
+                "last_result": schedule.last_result,
+                "trigger_baseline": self.trigger_engine.export_baseline(user_id),
+                "updated_at": self.clock.utcnow()
+            })
+        
+        try:
+            await self.state_repository.save_all(states)
+            await self.state_repository.delete(list(removed))
+        except Exception as e:
+            # 다음 주기에 다시 저장
+            self._dirty |= dirty
+            self._removed |= removed
+            logger.error(f"❌ 스케줄 상태 저장 실패: {e}")
+            return 0
+        
+        self.last_persist = self.clock.time()
+        logger.info(f"스케줄 상태 저장: {len(states)}명, 삭제 {len(removed)}명")
+        return len(states)
+    
+    async def _run_persister(self):
+        """스케줄 상태 주기 저장 루프"""
+        while True:
+            try:
+                await self.clock.sleep(SCHEDULER_STATE_PERSIST_SECONDS)
+                await self.persist_state()
+            except asyncio.CancelledError:
+                break
+    
+    def _fenced(self, fencing_token: Optional[int]) -> bool:
+        """실행을 시작한 리스 임기가 끝났는지 (끝났으면 부작용 없이 중단)"""
+        if fencing_token is None or self.lease is None or self.lease.holds(fencing_token):
+            return False
+        self.fenced_runs += 1
+        SCHEDULER_DECISIONS.inc("skip", "lease_lost")
+        logger.warning(f"⚠️ 리더 리스 상실로 실행 중단: 토큰 {fencing_token}")
+        return True
+    
+    def _fence(self, fencing_token: Optional[int]) -> Optional[Fence]:
+        """저장소 쓰기에 넘길 펜싱 토큰 (리스를 쓰지 않으면 None)"""
+        if fencing_token is None or self.lease is None:
+            return None
+        return self.lease.fence(fencing_token)
+    
+    def _record_fenced_write(self, error: StaleFencingTokenError, result: Dict[str, Any]):
+        """저장소가 오래된 펜싱 토큰의 쓰기를 거부함 (확인 이후 임기가 끝난 경우)"""
+        self.fenced_runs += 1
+        SCHEDULER_DECISIONS.inc("skip", "lease_lost")
+        result["reason"] = "리더 리스 상실로 저장/전송 생략"
+        logger.warning(f"⚠️ 리더 리스 상실로 저장 거부: {error}")
     
-    async def run_once(self, user_id: str) -> Dict[str, Any]:
-        """한 번만 추천 실행"""
+    @traced("scheduler", outcome=_run_outcome, device_type=_run_device_type)
+    async def run_once(self, user_id: str, force: bool = False, fencing_token: Optional[int] = None) -> Dict[str, Any]:
+        """
+        한 번만 추천 실행 (트리거가 없으면 LLM 호출 없이 건너뜀, force=True면 항상 실행)
+        
+        fencing_token이 있으면 LLM 호출 전과 저장 직전에 해당 리스 임기가 유효한지 확인하고,
+        저장소 쓰기에도 토큰을 넘겨 그 사이 임기가 끝났으면 저장소가 쓰기를 거부한다.
+        """
         try:
             # 현재 시간 정보
-            KST = pytz.timezone('Asia/Seoul')
-            now = datetime.now(KST)
+            now = self.clock.now()
             self.last_check = now.isoformat()
             
-            # 추천 조건 확인
-            should_recommend = self._should_recommend(now)
+            # 추천 트리거 확인
+            signals = await self._collect_signals(user_id, now)
+            if force:
+                should_recommend, trigger = True, "manual"
+                SCHEDULER_DECISIONS.inc("trigger", trigger)
+            else:
+                should_recommend, trigger = self.trigger_engine.evaluate(user_id, signals)
+            
+            # 중복 방지: 대기 중인 추천이 있으면 계획 입력이 바뀌었을 때만 새로 생성
+            if should_recommend and await self._pending_suppressed(user_id, trigger, signals):
+                should_recommend, trigger = False, "pending_outstanding"
             
             result = {
                 "should_recommend": should_recommend,
+                "trigger": trigger,
                 "timestamp": now.isoformat()
             }
             
+            if should_recommend and self._fenced(fencing_token):
+                should_recommend, trigger = False, "lease_lost"
+                result.update({"should_recommend": False, "trigger": trigger})
+            
             if should_recommend:
                 # AI Agent로 추천 생성
-                from app.agents.recommendation_agent import RecommendationAgent
-                
-                agent = RecommendationAgent()
-                context = f"자동 스케줄러 추천 (시간: {now.hour}시, 계절: {self._get_season(now.month)})"
+                agent = self._create_agent(user_id)
+                context = self._build_context(now, trigger, outlook=self._outlook(self.location_of(user_id), now))
                 
                 # AI 추천 생성
                 recommendation = await agent.generate_recommendation(context)
+                self.trigger_engine.commit(user_id, signals)
                 
-                result.update({
-                    "title": recommendation.get("title", "스마트 홈 추천"),
-                    "contents": recommendation.get("contents", "현재 상황에 맞는 기기 제어를 추천드립니다."),
-                    "device_control": recommendation.get("device_control"),
-                    "reason": f"자동 스케줄러 (시간: {now.hour}시, 계절: {self._get_season(now.month)})"
-                })
-                
+                result.update(self._describe(recommendation, now))
                 logger.info(f"✅ 스케줄러 AI 추천 생성: {result['title']}")
                 
-                # MongoDB에 추천 저장
-                try:
-                    from app.core.database import get_database
-                    from app.services.recommendation_service import RecommendationService
-                    from app.models.recommendations import DeviceControl
-                    
-                    db = await get_database()
-                    recommendation_service = RecommendationService(db)
-                    
-                    # device_control 정보 추출 및 변환 (actions 배열 지원)
-                    device_control_data = recommendation.get('device_control', {})
-                    
-                    if "actions" in device_control_data:
-                        # 새로운 actions 배열 방식
-                        from app.models.recommendations import DeviceAction
-                        actions = []
-                        for action_data in device_control_data.get("actions", []):
-                            action = DeviceAction(
-                                action=action_data.get("action"),
-                                order=action_data.get("order", 1),
-                                description=action_data.get("description"),
-                                delay_seconds=action_data.get("delay_seconds", 3)
-                            )
-                            actions.append(action)
-                        
-                        device_control = DeviceControl(
-                            device_type=device_control_data.get("device_type"),
-                            device_id=device_control_data.get("device_id"),
-                            actions=actions
-                        )
-                    else:
-                        # 기존 단일 action 방식 (하위 호환성)
-                        device_control = DeviceControl(**device_control_data) if device_control_data else None
-                    
-                    recommendation_id = await recommendation_service.create_recommendation(
-                        title=recommendation['title'],
-                        contents=recommendation['contents'],
-                        device_control=device_control,
-                        user_id=user_id,
-                        mode="production"
-                    )
-                    
-                    logger.info(f"✅ 스케줄러 추천 MongoDB 저장 완료: {recommendation_id}")
-                    result["recommendation_id"] = recommendation_id
-                    
-                    # 하드웨어에 추천 전송
-                    try:
-                        from app.api.endpoints.recommendations import hardware_client
-                        
-                        hardware_response = await hardware_client.send_recommendation(
-                            recommendation_id,
-                            recommendation['title'],
-                            recommendation['contents']
-                        )
-                        
-                        logger.info(f"✅ 스케줄러 추천 하드웨어 전송 완료: {hardware_response}")
-                        result["hardware_response"] = hardware_response
-                        
-                    except Exception as e:
-                        logger.error(f"❌ 스케줄러 추천 하드웨어 전송 실패: {e}")
-                        
-                except Exception as e:
-                    logger.error(f"❌ 스케줄러 추천 MongoDB 저장 실패: {e}")
-                    
-                    # 제어 정보가 있으면 로그 출력
-                    if result.get("device_control"):
-                        device_info = result["device_control"]
-                        logger.info(f"🎯 제어 정보: {device_info.get('device_alias')} -> {device_info.get('action')}")
+                # LLM 호출 중 리더가 바뀌었으면 저장/전송하지 않음
+                if self._fenced(fencing_token):
+                    result["reason"] = "리더 리스 상실로 저장/전송 생략"
+                    return result
+                
+                await self._deliver(
+                    user_id, recommendation, result, self.trigger_engine.plan_inputs(signals), self._fence(fencing_token)
+                )
                 
             else:
                 result.update({
-                    "reason": "추천 조건을 만족하지 않음"
+                    "reason": f"추천 트리거 없음 ({trigger})"
                 })
-                logger.info("추천 조건 미충족")
+                logger.info(f"추천 트리거 없음: 사용자={user_id}, 사유={trigger}")
             
             return result
             
@@ -174,25 +511,382 @@ class SchedulerService:
             logger.error(f"추천 실행 실패: {e}")
             return {
                 "should_recommend": False,
-                "timestamp": datetime.now(KST).isoformat(),
+                "timestamp": self.clock.now().isoformat(),
                 "reason": f"오류 발생: {str(e)}"
             }
     
-    def _should_recommend(self, now: datetime) -> bool:
-        """추천 여부 판단"""
-        # 간단한 추천 로직
-        hour = now.hour
+    @traced("scheduler", outcome=lambda summary: "recommended" if summary.get("delivered") else "skipped")
+    async def fan_out(self, location: str, fencing_token: Optional[int] = None) -> Dict[str, Any]:
+        """
+        위치의 모든 사용자를 한 번에 재평가 (날씨 구간이 바뀌었을 때)
+        
+        날씨는 위치당 한 번만 조회하고, 트리거가 발생한 가구를 기기 구성(종류별 상태)으로 묶어
+        묶음마다 대표 가구로 추천을 한 번 생성한 뒤 가구별 device_id로 바꿔 저장/전송한다.
+        실행기의 중복 실행 방지를 거쳐 이미 큐에 있거나 실행 중인 사용자는 제외하고,
+        기기 조회와 LLM 호출은 실행기 워커와 같은 동시 실행 한도 안에서 한다.
+        """
+        users = sorted(self._users_by_location.get(location, ()))
+        summary = Counter(households=len(users))
+        if not users:
+            return dict(summary)
+        
+        now = self.clock.now()
+        self.last_check = now.isoformat()
+        weather, forecast = await self._location_weather(location, now)
+        users = self.executor.claim(users)
+        summary["overlapped"] = summary["households"] - len(users)
+        
+        async def evaluate(user_id: str):
+            try:
+                async with self.executor.slots():
+                    profile = await self._collect_device_profile(user_id)
+                signals = self._signals(now, weather, profile, forecast)
+                should_recommend, trigger = self.trigger_engine.evaluate(user_id, signals)
+                if should_recommend and await self._pending_suppressed(user_id, trigger, signals):
+                    should_recommend = False
+            except Exception:
+                self.executor.release([user_id])
+                raise
+            if not should_recommend:
+                self.executor.release([user_id])
+                return None
+            return (user_id, profile or {}, signals, trigger)
+        
+        # 기기 구성이 같은 가구끼리 묶음 (기기 상태를 못 읽은 가구는 단독 실행)
+        cohorts: Dict[Any, List] = defaultdict(list)
+        evaluated = await asyncio.gather(*(evaluate(user_id) for user_id in users), return_exceptions=True)
+        for member in evaluated:
+            if isinstance(member, BaseException):
+                logger.error(f"❌ 도시 단위 재평가 실패 ({location}): {member}")
+                continue
+            if member is None:
+                continue
+            key = profile_key(member[1]) if member[1] else ("unknown", member[0])
+            cohorts[key].append(member)
+        summary["fired"] = sum(len(members) for members in cohorts.values())
+        summary["cohorts"] = len(cohorts)
+        
+        async def generate(members: List):
+            user_id, profile, _, trigger = members[0]
+            if self._fenced(fencing_token):
+                return
+            async with self.executor.slots():
+                try:
+                    recommendation = await self._create_agent(user_id).generate_recommendation(
+                        self._build_context(now, trigger, location=location, weather=weather, profile=profile,
+                                            outlook=self._outlook(location, now))
+                    )
+                except Exception as e:
+                    logger.error(f"❌ 도시 단위 추천 생성 실패 ({location}): {e}")
+                    return
+            summary["generations"] += 1
+            if self._fenced(fencing_token):
+                return
+            
+            for member_id, member_profile, signals, _ in members:
+                self.trigger_engine.commit(member_id, signals)
+                device_control = retarget_device_control(recommendation.get("device_control"), profile, member_profile)
+                if recommendation.get("device_control") and device_control is None:
+                    summary["unmapped"] += 1
+                    continue
+                personalized = {**recommendation, "device_control": device_control}
+                if recommendation.get("agent_steps"):
+                    # 한 번의 생성을 나눠 쓴 추천 수 (추천당 비용 = 기록 / cohort_size)
+                    personalized["agent_steps"] = {**recommendation["agent_steps"], "cohort_size": len(members)}
+                result = self._describe(personalized, now)
+                await self._deliver(
+                    member_id, personalized, result, self.trigger_engine.plan_inputs(signals), self._fence(fencing_token)
+                )
+                schedule = self.queue.get(member_id)
+                if schedule is not None:
+                    schedule.last_run = self.clock.time()
+                    schedule.last_result = result.get("recommendation_id") or result.get("reason")
+                    self._mark_dirty(member_id)
+                summary["delivered"] += 1
+        
+        async def run_cohort(members: List):
+            try:
+                await generate(members)
+            finally:
+                self.executor.release([member[0] for member in members])
+        
+        await asyncio.gather(*(run_cohort(members) for members in cohorts.values()))
+        self.fanout["runs"] += 1
+        self.fanout.update(summary)
+        logger.info(
+            f"✅ 도시 단위 추천 재계산: {location} 가구 {summary['households']}, 트리거 {summary['fired']}, "
+            f"묶음 {summary['cohorts']}, 생성 {summary['generations']}, 전송 {summary['delivered']}"
+        )
+        return dict(summary)
+    
+    async def _run_weather_watch(self):
+        """위치별 날씨/예상 날씨 구간 변화 감시 루프 (바뀐 위치만 fan_out)"""
+        while self.is_running:
+            try:
+                await self.clock.sleep(WEATHER_FANOUT_POLL_SECONDS)
+                if self.lease is not None and not self.lease.is_leader:
+                    continue
+                fencing_token = self.lease.token if self.lease is not None else None
+                for location in list(self._users_by_location):
+                    _, forecast = await self._location_weather(location, self.clock.now())
+                    if await self.weather.poll(location, forecast):
+                        async with start_trace(f"scheduler.fan_out {location}"):
+                            await self.fan_out(location, fencing_token)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"날씨 변화 감시 중 오류: {e}")
+    
+    async def _pending_suppressed(self, user_id: str, trigger: str, signals: TriggerSignals) -> bool:
+        """
+        대기 중인 추천이 있으면 LLM 호출 전에 건너뜀 (모든 트리거 공통)
+        
+        - 시간 경과 트리거 (MATERIAL_TRIGGERS 외): 대기 중인 추천이 있으면 건너뜀
+        - 변화 트리거: 대기 중인 추천마다 생성 당시 입력(plan_inputs)과 지금 입력을 비교해
+          모두 같으면 건너뜀 (입력을 비교할 수 없으면 다시 생성)
+        건너뛰기 전에 저장소에서 대기 상태를 다시 확인한다 (다른 인스턴스에서 확인된 추천 제외).
+        """
+        from app.services.recommendation_service import get_recommendation_service
+        
+        recommendation_service = await get_recommendation_service()
+        inputs = self.trigger_engine.plan_inputs(signals)
         
-        # 모든 시간대에 추천 (테스트용)
-        # 실제 운영에서는 특정 시간대로 제한 가능
+        def unchanged(outstanding) -> bool:
+            if not outstanding:
+                return False
+            if trigger not in MATERIAL_TRIGGERS:
+                return True
+            return inputs is not None and all(entry.inputs == inputs for entry in outstanding.values())
+        
+        if not unchanged(await recommendation_service.get_outstanding(user_id)):
+            return False
+        if not unchanged(await recommendation_service.get_outstanding(user_id, confirm=True)):
+            return False
+        recommendation_service.dedup["skipped_before_generation"] += 1
+        self.trigger_engine.record_skip("pending_outstanding", signals.now)
         return True
+    
+    def _build_context(
+        self,
+        now: datetime,
+        trigger: str,
+        location: Optional[str] = None,
+        weather: Optional[Dict[str, Any]] = None,
+        profile: Optional[DeviceProfile] = None,
+        outlook: Optional[Dict[str, float]] = None
+    ) -> str:
+        """Agent에 넘길 상황 설명 (미리 조회한 날씨/기기 상태/예보가 있으면 포함)"""
+        context = f"자동 스케줄러 추천 (시간: {now.hour}시, 계절: {self._get_season(now.month)}, 트리거: {trigger})"
+        if weather:
+            context += (
+                f"\n위치: {location}, 현재 날씨: {weather.get('temperature')}도, 습도 {weather.get('humidity')}%"
+                f", {weather.get('description', '')}"
+            )
+        if profile:
+            devices = ", ".join(f"{device_id}({device_type}, {state})" for device_id, (device_type, state) in profile.items())
+            context += f"\n기기 상태: {devices}"
+        if outlook:
+            context += (
+                f"\n향후 {self.forecast_horizon_seconds / 3600:g}시간 예상: 기온 {outlook['temperature_min']}~"
+                f"{outlook['temperature_max']}도, 습도 {outlook['humidity_min']}~{outlook['humidity_max']}%"
+            )
+        return context
+    
+    def _describe(self, recommendation: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """응답에 포함할 추천 요약"""
+        return {
+            "title": recommendation.get("title", "스마트 홈 추천"),
+            "contents": recommendation.get("contents", "현재 상황에 맞는 기기 제어를 추천드립니다."),
+            "device_control": recommendation.get("device_control"),
+            "reason": f"자동 스케줄러 (시간: {now.hour}시, 계절: {self._get_season(now.month)})"
+        }
+    
+    async def _deliver(
+        self,
+        user_id: str,
+        recommendation: Dict[str, Any],
+        result: Dict[str, Any],
+        plan_inputs: Optional[str] = None,
+        fence: Optional[Fence] = None
+    ):
+        """
+        생성된 추천 저장 및 하드웨어 전송 (result에 recommendation_id, dedup, hardware_response 기록)
+        
+        fence가 있으면 저장과 전송 완료 표시를 저장소가 리스 임기를 확인한 뒤 쓰고,
+        임기가 끝났으면 저장/전송 없이 중단한다.
+        """
+        # MongoDB에 추천 저장
+        try:
+            from app.services.recommendation_service import get_recommendation_service
+            from app.models.recommendations import DeviceControl
+            
+            recommendation_service = await get_recommendation_service()
+            
+            # device_control 정보 추출 및 변환 (actions 배열 지원)
+            device_control_data = recommendation.get('device_control') or {}
+            
+            if "actions" in device_control_data:
+                # 새로운 actions 배열 방식
+                from app.models.recommendations import DeviceAction
+                actions = []
+                for action_data in device_control_data.get("actions", []):
+                    action = DeviceAction(
+                        action=action_data.get("action"),
+                        order=action_data.get("order", 1),
+                        description=action_data.get("description"),
+                        delay_seconds=action_data.get("delay_seconds", 3)
+                    )
+                    actions.append(action)
+                
+                device_control = DeviceControl(
+                    device_type=device_control_data.get("device_type"),
+                    device_id=device_control_data.get("device_id"),
+                    actions=actions
+                )
+            else:
+                # 기존 단일 action 방식 (하위 호환성)
+                device_control = DeviceControl(**device_control_data) if device_control_data else None
+            
+            # 같은 기기에 대기 중인 추천이 있으면 대체하거나 (같은 계획이면) 생략
+            recommendation_id, dedup = await recommendation_service.create_or_supersede(
+                title=recommendation['title'],
+                contents=recommendation['contents'],
+                device_control=device_control,
+                user_id=user_id,
+                mode="production",
+                agent_steps=recommendation.get("agent_steps"),
+                # 하드웨어로 보낼 추천은 저장이 확정된 뒤에 전송
+                durable=True,
+                plan_inputs=plan_inputs,
+                fence=fence
+            )
+            
+            logger.info(f"✅ 스케줄러 추천 저장 완료: {recommendation_id} ({dedup})")
+            result["recommendation_id"] = recommendation_id
+            result["dedup"] = dedup
+            
+            # 하드웨어에 추천 전송 (이미 대기 중인 것과 같은 추천이면 생략)
+            if dedup != "duplicate":
+                try:
+                    hardware_response = await self._get_hardware_client().send_recommendation(
+                        recommendation_id,
+                        recommendation['title'],
+                        recommendation['contents'],
+                        device_type=device_control.device_type if device_control else None
+                    )
+                    
+                    logger.info(f"✅ 스케줄러 추천 하드웨어 전송 완료: {hardware_response}")
+                    result["hardware_response"] = hardware_response
+                    await recommendation_service.mark_hardware_sent(recommendation_id, fence=fence)
+                
+                except StaleFencingTokenError:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ 스케줄러 추천 하드웨어 전송 실패: {e}")
+                
+        except StaleFencingTokenError as e:
+            self._record_fenced_write(e, result)
+        except Exception as e:
+            logger.error(f"❌ 스케줄러 추천 MongoDB 저장 실패: {e}")
+            
+            # 제어 정보가 있으면 로그 출력
+            if result.get("device_control"):
+                device_info = result["device_control"]
+                logger.info(f"🎯 제어 정보: {device_info.get('device_alias')} -> {device_info.get('action')}")
+    
+    def _create_agent(self, user_id: str):
+        """추천 생성 Agent (시뮬레이션에서 가짜 LLM으로 교체)"""
+        from app.agents.recommendation_agent import RecommendationAgent
+        return RecommendationAgent()
+    
+    def _get_hardware_client(self):
+        """하드웨어 전송 클라이언트 (시뮬레이션에서 교체)"""
+        from app.api.endpoints.recommendations import hardware_client
+        return hardware_client
+    
+    async def _fetch_weather(self, location: str) -> Optional[Dict[str, Any]]:
+        """위치의 현재 날씨 조회 (LocationWeather가 캐시/공유, 시뮬레이션에서 교체)"""
+        from app.agents.recommendation_agent import WeatherTool
+        
+        try:
+            return json.loads(await WeatherTool(WEATHER_API_KEY).get_current_weather(location))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"트리거 날씨 신호 조회 실패 ({location}): {e}")
+            return None
+    
+    async def _collect_device_profile(self, user_id: str) -> Optional[DeviceProfile]:
+        """
+        사용자 기기별 (종류, 상태) 조회 - 실패하면 None (시뮬레이션에서 교체)
         
-        # 원래 로직 (주석 처리)
-        # if hour in [7, 8, 12, 18, 19, 20, 21]:
-        #     return True
-        # if now.weekday() >= 5:  # 토요일, 일요일
-        #     return hour in [9, 10, 14, 15, 16, 17, 22]
-        # return False
+        기기 목록은 사용자별로 등록된 기기에서 가져온다. Gateway 기기 목록은 사용자 구분 없이
+        계정 전체를 돌려주므로 쓰지 않고, 등록된 기기가 없는 사용자는 None (묶지 않고 단독 실행).
+        """
+        from app.agents.recommendation_agent import GatewayTool
+        from app.models.device_management import DeviceType
+        from app.services.device_service import device_service
+        
+        if device_service.repository is None:
+            return None
+        try:
+            devices = await device_service.get_user_devices(user_id)
+            if not devices:
+                return None
+            gateway = GatewayTool()
+            profile = {}
+            for device in devices:
+                state = json.loads(await gateway.get_device_state(device.device_id))
+                profile[device.device_id] = (
+                    DeviceType(device.device_type).value, f"{state['current_state']}:{state['is_running']}"
+                )
+            return profile
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"트리거 기기 신호 조회 실패 ({user_id}): {e}")
+            return None
+    
+    async def _fetch_forecast(self, location: str) -> Optional[List[WeatherPoint]]:
+        """위치의 예보 조회 (ForecastStore가 주기적으로 일괄 호출, 시뮬레이션에서 교체)"""
+        from app.agents.recommendation_agent import WeatherTool
+        
+        data = await WeatherTool(WEATHER_API_KEY).get_forecast_data(location, WEATHER_FORECAST_DAYS)
+        return [(item["dt"], item["main"]["temp"], item["main"]["humidity"]) for item in data["list"]]
+    
+    async def _location_weather(self, location: str, now: datetime):
+        """위치의 현재 날씨와 예보 구간 끝의 예상 (온도, 습도) - 예보는 갱신 주기가 지났을 때만 조회"""
+        weather = await self.weather.get(location)
+        if self.forecast_horizon_seconds <= 0:
+            return weather, None
+        if self.forecasts.needs_refresh(location):
+            await self.forecasts.refresh(location)
+        timestamp = now.timestamp()
+        if weather is None:
+            # 현재 날씨 조회 실패 시 시계열 보간값으로 대체
+            current = self.forecasts.at(location, timestamp)
+            weather = {"temperature": current[0], "humidity": current[1]} if current else None
+        return weather, self.forecasts.at(location, timestamp + self.forecast_horizon_seconds)
+    
+    def _outlook(self, location: str, now: datetime) -> Optional[Dict[str, float]]:
+        """Agent 상황 설명용 예보 구간 요약"""
+        if self.forecast_horizon_seconds <= 0:
+            return None
+        return self.forecasts.outlook(location, now.timestamp(), self.forecast_horizon_seconds)
+    
+    @staticmethod
+    def _signals(
+        now: datetime,
+        weather: Optional[Dict[str, Any]],
+        profile: Optional[DeviceProfile],
+        forecast: Optional[Tuple[float, float]] = None
+    ) -> TriggerSignals:
+        """조회한 날씨/기기 상태/예상 날씨를 트리거 신호로 변환 (실패한 신호는 None)"""
+        temperature = weather.get("temperature") if weather else None
+        humidity = weather.get("humidity") if weather else None
+        device_states = {device_id: state for device_id, (_, state) in profile.items()} if profile is not None else None
+        return TriggerSignals(now, temperature, humidity, device_states, forecast)
+    
+    async def _collect_signals(self, user_id: str, now: datetime) -> TriggerSignals:
+        """트리거 판단용 신호 수집 (위치별 공유 날씨/예보, 기기 상태 - LLM 호출 없음)"""
+        weather, forecast = await self._location_weather(self.location_of(user_id), now)
+        return self._signals(now, weather, await self._collect_device_profile(user_id), forecast)
     
     def _get_season(self, month: int) -> str:
         """월에 따른 계절 반환"""
@@ -205,13 +899,88 @@ class SchedulerService:
         else:
             return "가을"
     
+    @staticmethod
+    def _format_time(timestamp: Optional[float]) -> Optional[str]:
+        """epoch 초를 KST ISO 문자열로 변환"""
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, pytz.timezone('Asia/Seoul')).isoformat()
+    
     def get_status(self) -> Dict[str, Any]:
-        """스케줄러 상태 반환"""
+        """스케줄러 상태 반환 (등록 수, 다음 실행 시각, 지연)"""
+        head = self.queue.peek()
+        now = self.clock.time()
+        forecast = self.forecasts.get_stats()
         return {
             "is_running": self.is_running,
-            "user_id": self.user_id or "없음",
+            "scheduled_users": len(self.queue),
             "interval_minutes": self.interval_minutes,
-            "last_check": self.last_check or "없음"
+            "next_due": self._format_time(head.next_run) if head else None,
+            "lag_seconds": round(max(0.0, now - head.next_run), 3) if head and self.is_running else 0.0,
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "late_skips": self.late_skips,
+            "missed_slots": self.missed_slots,
+            "last_check": self.last_check or "없음",
+            "executor": self.executor.get_stats(),
+            "triggers": self.trigger_engine.get_stats(),
+            "standby_skips": self.standby_skips,
+            "fenced_runs": self.fenced_runs,
+            "leadership": self.lease.get_status() if self.lease is not None else None,
+            "persistence": {
+                "enabled": self.state_repository is not None,
+                "dirty_users": len(self._dirty),
+                "restored_users": self.restored_users,
+                "restored_overdue": self.restored_overdue,
+                "last_persist": self._format_time(self.last_persist)
+            },
+            "weather": {
+                **self.weather.get_stats(),
+                "watched_locations": len(self._users_by_location),
+                "fanout": dict(self.fanout),
+                "forecast": {
+                    **forecast,
+                    "covered_until": self._format_time(forecast["covered_until"]),
+                    "horizon_minutes": self.forecast_horizon_seconds // 60
+                }
+            }
+        }
+    
+    def get_due_histogram(self, bucket_seconds: int = 60, horizon_seconds: Optional[int] = None) -> Dict[str, Any]:
+        """앞으로 horizon_seconds 동안의 실행 예정 시각 분포 (bucket_seconds 단위 개수)"""
+        now = self.clock.time()
+        schedules = list(self.queue)
+        if horizon_seconds is None:
+            horizon_seconds = max((s.interval_seconds for s in schedules), default=self.interval_minutes * 60)
+        bucket_count = max(1, math.ceil(horizon_seconds / bucket_seconds))
+        buckets = [0] * bucket_count
+        
+        for schedule in schedules:
+            # 슬롯을 순회하며 범위 내 실행 횟수를 모두 집계 (과거 슬롯은 첫 버킷)
+            due = max(schedule.next_run, now)
+            while due < now + horizon_seconds:
+                buckets[int((due - now) // bucket_seconds)] += 1
+                due = next_slot(schedule.user_id, schedule.interval_seconds, due)
+        
+        return {
+            "bucket_seconds": bucket_seconds,
+            "horizon_seconds": horizon_seconds,
+            "buckets": buckets,
+            "max_bucket": max(buckets),
+            "mean_bucket": round(sum(buckets) / bucket_count, 3)
+        }
+    
+    def get_user_status(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """사용자별 스케줄 상태 반환"""
+        schedule = self.queue.get(user_id)
+        if schedule is None:
+            return None
+        return {
+            "user_id": schedule.user_id,
+            "interval_minutes": schedule.interval_minutes,
+            "location": self.location_of(user_id),
+            "next_run": self._format_time(schedule.next_run),
+            "last_run": self._format_time(schedule.last_run),
+            "last_result": schedule.last_result
         }
 
 # 전역 스케줄러 서비스 인스턴스
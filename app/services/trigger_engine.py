@@ -0,0 +1,229 @@
+"""
+GazeHome AI Services - Recommendation Trigger Engine
+LLM 호출 전에 추천을 만들 만한 변화가 있었는지 판단하는 트리거 엔진
+"""
+
+import math
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.core.metrics import SCHEDULER_DECISIONS
+
+# 시간대 경계 키 형식 (KST)
+HOUR_KEY_FORMAT = "%Y%m%d%H"
+
+
+class TriggerSignals:
+    """트리거 판단에 쓰는 값싼 신호 (날씨, 기기 상태, 현재 시각, 예보 구간 끝의 예상 날씨)"""
+
+    __slots__ = ("now", "temperature", "humidity", "device_states", "forecast")
+
+    def __init__(
+        self,
+        now: datetime,
+        temperature: Optional[float] = None,
+        humidity: Optional[float] = None,
+        device_states: Optional[Dict[str, str]] = None,
+        forecast: Optional[Tuple[float, float]] = None
+    ):
+        self.now = now
+        self.temperature = temperature
+        self.humidity = humidity
+        self.device_states = device_states
+        self.forecast = forecast
+
+
+class TriggerBaseline:
+    """마지막으로 추천을 실행했을 때의 신호 요약"""
+
+    __slots__ = ("temperature_band", "humidity_band", "device_fingerprint", "day_segment", "fired_at", "forecast_band")
+
+    def __init__(self, temperature_band, humidity_band, device_fingerprint, day_segment, fired_at: datetime, forecast_band=None):
+        self.temperature_band = temperature_band
+        self.humidity_band = humidity_band
+        self.device_fingerprint = device_fingerprint
+        self.day_segment = day_segment
+        self.fired_at = fired_at
+        self.forecast_band = forecast_band
+
+
+class TriggerEngine:
+    """
+    추천 트리거 엔진
+
+    사용자별 마지막 실행 기준값과 현재 신호를 비교해 다음 중 하나가 있을 때만 실행한다.
+    - initial: 기준값 없음 (첫 실행)
+    - temperature / humidity: 온도·습도가 다른 구간(band)으로 넘어감
+      (지난 실행 때 예보로 예상한 구간 사이에서 움직이면 이미 반영된 변화로 봄)
+    - forecast: 예보상 곧 예상 범위 밖 구간으로 넘어감
+    - device_state: 기기 상태 지문이 바뀜
+    - time_of_day: 시간대 경계(예: 6, 9, 12, 18, 22시)를 지남
+    - quiet_period: 마지막 실행 후 조용한 기간이 끝남
+    그 외에는 건너뛴다 (no_change: 신호 변화 없음, no_signals: 날씨·기기 신호 조회 실패).
+    건너뛴 횟수는 시간대별 LLM 호출 절감량으로 집계한다.
+    """
+
+    def __init__(
+        self,
+        temperature_band: float = 2.0,
+        humidity_band: float = 10.0,
+        time_boundaries: Sequence[int] = (6, 9, 12, 18, 22),
+        quiet_period_minutes: int = 180,
+        history_hours: int = 24
+    ):
+        self.temperature_band = temperature_band
+        self.humidity_band = humidity_band
+        self.time_boundaries = sorted(time_boundaries)
+        self.quiet_period_minutes = quiet_period_minutes
+        self.history_hours = history_hours
+        self._baselines: Dict[str, TriggerBaseline] = {}
+        self.fired = Counter()
+        self.skipped = Counter()
+        self._avoided_by_hour: "OrderedDict[str, int]" = OrderedDict()
+
+    @staticmethod
+    def _band(value: Optional[float], width: float) -> Optional[int]:
+        return math.floor(value / width) if value is not None else None
+
+    def _day_segment(self, now: datetime) -> Tuple[str, int]:
+        """(날짜, 지난 시간대 경계 수) - 경계를 지나거나 날짜가 바뀌면 달라짐"""
+        passed = sum(1 for hour in self.time_boundaries if now.hour >= hour)
+        return now.strftime("%Y%m%d"), passed
+
+    @staticmethod
+    def _outside(band: Optional[int], *expected: Optional[int]) -> bool:
+        """band가 기준 구간~예상 구간 범위를 벗어났는지 (band를 모르면 False)"""
+        known = [value for value in expected if value is not None]
+        return band is not None and (not known or not min(known) <= band <= max(known))
+
+    def _forecast_band(self, forecast: Optional[Tuple[float, float]]) -> Optional[Tuple[int, int]]:
+        if forecast is None:
+            return None
+        return self._band(forecast[0], self.temperature_band), self._band(forecast[1], self.humidity_band)
+
+    @staticmethod
+    def _fingerprint(device_states: Optional[Dict[str, str]]) -> Optional[Tuple]:
+        return tuple(sorted(device_states.items())) if device_states is not None else None
+
+    def plan_inputs(self, signals: TriggerSignals) -> Optional[str]:
+        """
+        추천 계획에 쓰는 입력 요약 (온도·습도 구간, 기기 상태 지문)
+
+        대기 중인 추천을 만들 때의 입력과 같으면 다시 생성해도 같은 계획이 나온다고 본다.
+        조회 실패한 신호가 있으면 비교할 수 없으므로 None.
+        """
+        temperature_band = self._band(signals.temperature, self.temperature_band)
+        humidity_band = self._band(signals.humidity, self.humidity_band)
+        fingerprint = self._fingerprint(signals.device_states)
+        if temperature_band is None or humidity_band is None or fingerprint is None:
+            return None
+        devices = ",".join(f"{device_id}={state}" for device_id, state in fingerprint)
+        return f"t{temperature_band}|h{humidity_band}|{devices}"
+
+    def evaluate(self, user_id: str, signals: TriggerSignals) -> Tuple[bool, str]:
+        """실행 여부와 사유 반환 (건너뛰면 통계에 반영)"""
+        baseline = self._baselines.get(user_id)
+        reason = self._reason(baseline, signals)
+        if reason is None:
+            no_signals = signals.temperature is None and signals.humidity is None and signals.device_states is None
+            reason = "no_signals" if no_signals else "no_change"
+            self.record_skip(reason, signals.now)
+            return False, reason
+        self.fired[reason] += 1
+        SCHEDULER_DECISIONS.inc("trigger", reason)
+        return True, reason
+
+    def _reason(self, baseline: Optional[TriggerBaseline], signals: TriggerSignals) -> Optional[str]:
+        if baseline is None:
+            return "initial"
+        # 조회 실패한 신호(None)는 비교하지 않음
+        expected_temperature, expected_humidity = baseline.forecast_band or (None, None)
+        temperature_band = self._band(signals.temperature, self.temperature_band)
+        if self._outside(temperature_band, baseline.temperature_band, expected_temperature):
+            return "temperature"
+        humidity_band = self._band(signals.humidity, self.humidity_band)
+        if self._outside(humidity_band, baseline.humidity_band, expected_humidity):
+            return "humidity"
+        # 지난 실행 때 예보가 없었으면 비교하지 않음 (배포 직후 일제히 실행되지 않도록)
+        forecast_band = self._forecast_band(signals.forecast)
+        if forecast_band is not None and baseline.forecast_band is not None and (
+                self._outside(forecast_band[0], baseline.temperature_band, expected_temperature)
+                or self._outside(forecast_band[1], baseline.humidity_band, expected_humidity)):
+            return "forecast"
+        fingerprint = self._fingerprint(signals.device_states)
+        if fingerprint is not None and fingerprint != baseline.device_fingerprint:
+            return "device_state"
+        if self._day_segment(signals.now) != baseline.day_segment:
+            return "time_of_day"
+        if (signals.now - baseline.fired_at).total_seconds() >= self.quiet_period_minutes * 60:
+            return "quiet_period"
+        return None
+
+    def commit(self, user_id: str, signals: TriggerSignals):
+        """추천 실행 후 현재 신호를 새 기준값으로 저장"""
+        previous = self._baselines.get(user_id)
+
+        def keep(current, field: str):
+            # 조회 실패한 신호는 이전 기준값 유지
+            return current if current is not None or previous is None else getattr(previous, field)
+
+        self._baselines[user_id] = TriggerBaseline(
+            temperature_band=keep(self._band(signals.temperature, self.temperature_band), "temperature_band"),
+            humidity_band=keep(self._band(signals.humidity, self.humidity_band), "humidity_band"),
+            device_fingerprint=keep(self._fingerprint(signals.device_states), "device_fingerprint"),
+            day_segment=self._day_segment(signals.now),
+            fired_at=signals.now,
+            forecast_band=keep(self._forecast_band(signals.forecast), "forecast_band")
+        )
+
+    def export_baseline(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """저장용 기준값 (JSON/BSON으로 저장 가능한 형태)"""
+        baseline = self._baselines.get(user_id)
+        if baseline is None:
+            return None
+        return {
+            "temperature_band": baseline.temperature_band,
+            "humidity_band": baseline.humidity_band,
+            "device_fingerprint": [list(item) for item in baseline.device_fingerprint]
+            if baseline.device_fingerprint is not None else None,
+            "day_segment": list(baseline.day_segment),
+            "fired_at": baseline.fired_at.isoformat(),
+            "forecast_band": list(baseline.forecast_band) if baseline.forecast_band is not None else None
+        }
+
+    def restore_baseline(self, user_id: str, data: Dict[str, Any]):
+        """export_baseline으로 저장한 기준값 복원"""
+        device_fingerprint = data.get("device_fingerprint")
+        forecast_band = data.get("forecast_band")
+        self._baselines[user_id] = TriggerBaseline(
+            temperature_band=data.get("temperature_band"),
+            humidity_band=data.get("humidity_band"),
+            device_fingerprint=tuple(tuple(item) for item in device_fingerprint) if device_fingerprint is not None else None,
+            day_segment=tuple(data["day_segment"]),
+            fired_at=datetime.fromisoformat(data["fired_at"]),
+            forecast_band=tuple(forecast_band) if forecast_band is not None else None
+        )
+
+    def forget(self, user_id: str):
+        """사용자 기준값 제거"""
+        self._baselines.pop(user_id, None)
+
+    def record_skip(self, reason: str, now: datetime):
+        """건너뛴 실행 기록 (트리거 이후 단계에서 건너뛴 경우도 포함)"""
+        self.skipped[reason] += 1
+        SCHEDULER_DECISIONS.inc("skip", reason)
+        hour_key = now.strftime(HOUR_KEY_FORMAT)
+        self._avoided_by_hour[hour_key] = self._avoided_by_hour.get(hour_key, 0) + 1
+        while len(self._avoided_by_hour) > self.history_hours:
+            self._avoided_by_hour.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """트리거 통계 반환"""
+        return {
+            "tracked_users": len(self._baselines),
+            "fired": dict(self.fired),
+            "skipped": dict(self.skipped),
+            "llm_calls_avoided": sum(self.skipped.values()),
+            "llm_calls_avoided_by_hour": dict(self._avoided_by_hour)
+        }
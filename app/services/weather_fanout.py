@@ -0,0 +1,148 @@
+"""
+GazeHome AI Services - Weather Fan-out
+같은 도시 가구들이 날씨 조회와 추천 생성을 공유하도록 하는 위치별 날씨 캐시와 가구 묶음 도구
+"""
+
+import asyncio
+import math
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.clock import Clock, get_clock
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# device_id -> (device_type, 상태 문자열)
+DeviceProfile = Dict[str, Tuple[str, str]]
+
+
+class LocationWeather:
+    """
+    위치별 날씨 캐시
+
+    같은 위치는 ttl_seconds 동안 한 번만 조회하고, 조회 중에 들어온 같은 위치 요청은
+    진행 중인 조회 결과를 함께 기다린다. poll()은 온도/습도 구간이 바뀌었는지를
+    위치당 한 번만 판단해 같은 도시 가구들을 한꺼번에 다시 평가할 수 있게 한다.
+    on_update가 있으면 새로 조회한 날씨를 (위치, 날씨)로 넘긴다 (예보 저장소의 관측값 기록).
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Optional[Dict[str, Any]]]],
+        ttl_seconds: float = 300.0,
+        temperature_band: float = 2.0,
+        humidity_band: float = 10.0,
+        clock: Optional[Clock] = None,
+        on_update: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ):
+        self.fetch = fetch
+        self.on_update = on_update
+        self.ttl_seconds = ttl_seconds
+        self.temperature_band = temperature_band
+        self.humidity_band = humidity_band
+        self.clock = clock or get_clock()
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._bands: Dict[str, Tuple[Optional[int], ...]] = {}
+        self.stats = Counter()
+
+    async def get(self, location: str) -> Optional[Dict[str, Any]]:
+        """위치의 현재 날씨 (캐시 또는 진행 중인 조회 공유, 실패 시 None)"""
+        cached = self._cache.get(location)
+        if cached is not None and self.clock.monotonic() - cached[0] < self.ttl_seconds:
+            self.stats["cache_hits"] += 1
+            return cached[1]
+
+        inflight = self._inflight.get(location)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[location] = future
+        weather = None
+        try:
+            self.stats["fetches"] += 1
+            weather = await self.fetch(location)
+            if weather is not None:
+                self._cache[location] = (self.clock.monotonic(), weather)
+                if self.on_update is not None:
+                    self.on_update(location, weather)
+            else:
+                self.stats["failures"] += 1
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.warning(f"⚠️ 날씨 조회 실패 ({location}): {e}")
+        finally:
+            del self._inflight[location]
+            future.set_result(weather)
+        return weather
+
+    def band(self, weather: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+        """(온도 구간, 습도 구간) - 트리거 엔진과 같은 구간 폭"""
+        temperature, humidity = weather.get("temperature"), weather.get("humidity")
+        return (
+            math.floor(temperature / self.temperature_band) if temperature is not None else None,
+            math.floor(humidity / self.humidity_band) if humidity is not None else None
+        )
+
+    async def poll(self, location: str, forecast: Optional[Tuple[float, float]] = None) -> bool:
+        """위치의 날씨 구간(forecast가 있으면 예상 날씨 구간 포함)이 지난 poll 이후 바뀌었는지 (첫 poll은 기준값만 저장)"""
+        weather = await self.get(location)
+        if weather is None:
+            return False
+        band = self.band(weather)
+        if forecast is not None:
+            band += self.band({"temperature": forecast[0], "humidity": forecast[1]})
+        previous = self._bands.get(location)
+        self._bands[location] = band
+        if previous is None or band == previous:
+            return False
+        self.stats["changes"] += 1
+        logger.info(f"날씨 구간 변화 감지: {location} {previous} -> {band}")
+        return True
+
+    def forget(self, location: str):
+        """더 이상 사용자가 없는 위치 정리"""
+        self._cache.pop(location, None)
+        self._bands.pop(location, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        return {
+            "locations": len(self._cache),
+            "ttl_seconds": self.ttl_seconds,
+            "fetches": self.stats["fetches"],
+            "cache_hits": self.stats["cache_hits"],
+            "coalesced": self.stats["coalesced"],
+            "failures": self.stats["failures"],
+            "band_changes": self.stats["changes"]
+        }
+
+
+def profile_key(profile: DeviceProfile) -> Tuple[Tuple[str, str], ...]:
+    """기기 구성 요약 (device_id를 뺀 기기 종류별 상태) - 같은 키의 가구는 추천 하나를 공유"""
+    return tuple(sorted(profile.values()))
+
+
+def retarget_device_control(
+    device_control: Optional[Dict[str, Any]],
+    source: DeviceProfile,
+    target: DeviceProfile
+) -> Optional[Dict[str, Any]]:
+    """대표 가구 추천의 device_id를 같은 종류·상태인 대상 가구 기기로 교체 (대응 기기가 없으면 None)"""
+    if not device_control:
+        return device_control
+    described = source.get(device_control.get("device_id"))
+    if described is None:
+        # 대표 가구 기기 목록에 없는 ID면 종류만 맞춰 교체
+        described = next(
+            (value for value in source.values() if value[0] == device_control.get("device_type")), None
+        )
+    if described is None:
+        return None
+    device_id = next((device_id for device_id, value in target.items() if value == described), None)
+    if device_id is None:
+        return None
+    return {**device_control, "device_id": device_id}
@@ -0,0 +1,170 @@
+"""
+GazeHome AI Services - Write-Behind Buffer
+MongoDB 쓰기를 모아 bulk_write 배치로 전송하는 버퍼
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# 쓰기 버퍼 처리 결과 (written / failed / requeued) - 지연 쓰기 실패는 호출자에게 전달되지 않으므로 여기서 확인
+WRITE_BUFFER_OPS = registry.counter(
+    "gazehome_write_buffer_ops",
+    "쓰기 버퍼 처리 결과",
+    ("collection", "result")
+)
+
+
+def _consume_exception(future: asyncio.Future):
+    """대기하지 않는 Future의 예외 경고 방지"""
+    if not future.cancelled():
+        future.exception()
+
+
+class WriteBehindBuffer:
+    """
+    쓰기 지연 버퍼
+
+    삽입/갱신 요청을 큐에 쌓아 두었다가 최대 배치 크기에 도달하거나
+    최대 대기 시간이 지나면 하나의 ordered bulk_write로 전송한다.
+    같은 문서에 대한 삽입과 갱신의 순서는 보존된다.
+    """
+
+    def __init__(self, collection, max_batch_size: int = 100, max_linger_ms: int = 50, key_field: str = "recommendation_id"):
+        self.collection = collection
+        self.max_batch_size = max_batch_size
+        self.max_linger_ms = max_linger_ms
+        self.key_field = key_field
+        self.name = getattr(collection, "name", "unknown")
+        self._ops: List[Tuple[Any, asyncio.Future, Optional[str]]] = []
+        self._pending_keys: Dict[str, int] = {}
+        self._flush_lock = asyncio.Lock()
+        self._linger_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def insert(self, doc: Dict[str, Any], durable: bool = False) -> asyncio.Future:
+        """문서 삽입 예약 (durable=True면 DB 반영까지 대기) - 반영/실패 시 완료되는 Future 반환"""
+        future = self._enqueue(InsertOne(doc), doc.get(self.key_field))
+        if durable:
+            await self.flush()
+            await future
+        return future
+
+    async def update(self, filter: Dict[str, Any], update: Dict[str, Any], durable: bool = False) -> None:
+        """문서 갱신 예약 (durable=True면 DB 반영까지 대기)"""
+        future = self._enqueue(UpdateOne(filter, update), filter.get(self.key_field))
+        if durable:
+            await self.flush()
+            await future
+
+    def is_pending(self, key: str) -> bool:
+        """아직 DB에 반영되지 않은 쓰기가 있는지 확인"""
+        return key in self._pending_keys
+
+    @property
+    def pending_count(self) -> int:
+        """대기 중인 쓰기 수"""
+        return len(self._ops)
+
+    def _enqueue(self, op, key: Optional[str]) -> asyncio.Future:
+        """쓰기 요청을 큐에 추가하고 플러시 예약"""
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._ops.append((op, future, key))
+        if key:
+            self._pending_keys[key] = self._pending_keys.get(key, 0) + 1
+
+        if len(self._ops) >= self.max_batch_size:
+            self._start_flush()
+        elif self._linger_handle is None:
+            self._linger_handle = asyncio.get_running_loop().call_later(self.max_linger_ms / 1000, self._linger)
+        return future
+
+    def _linger(self):
+        """최대 대기 시간 후 플러시"""
+        self._linger_handle = None
+        self._start_flush()
+
+    def _start_flush(self):
+        """백그라운드 플러시 시작 (이미 진행 중이면 그 플러시가 새로 쌓인 쓰기까지 전송)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """대기 중인 쓰기를 모두 전송"""
+        async with self._flush_lock:
+            while self._ops:
+                batch = self._ops[:self.max_batch_size]
+                del self._ops[:self.max_batch_size]
+                await self._write(batch)
+
+    def _fail(self, batch: List[Tuple[Any, asyncio.Future, Optional[str]]], error: BaseException):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+        WRITE_BUFFER_OPS.inc(self.name, "failed", amount=len(batch))
+
+    async def _write(self, batch: List[Tuple[Any, asyncio.Future, Optional[str]]]):
+        """배치 하나를 bulk_write로 전송"""
+        done = batch
+        try:
+            await self.collection.bulk_write([op for op, _, _ in batch], ordered=True)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_result(None)
+            WRITE_BUFFER_OPS.inc(self.name, "written", amount=len(batch))
+            logger.debug(f"✅ 쓰기 배치 전송 완료: {len(batch)}건")
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors") or []
+            if not write_errors:
+                # writeConcernError만 있는 경우: 반영 여부를 확정할 수 없으므로 배치 전체 실패
+                self._fail(batch, e)
+                logger.error(f"❌ 쓰기 배치 write concern 실패 ({len(batch)}건): {e.details.get('writeConcernErrors')}")
+                return
+            # ordered 배치: 첫 오류 이전은 반영, 오류 건은 실패, 이후는 다시 큐에 넣음
+            failed_index = write_errors[0]["index"]
+            for _, future, _ in batch[:failed_index]:
+                if not future.done():
+                    future.set_result(None)
+            WRITE_BUFFER_OPS.inc(self.name, "written", amount=failed_index)
+            self._fail(batch[failed_index:failed_index + 1], e)
+            done = batch[:failed_index + 1]
+            self._ops[:0] = batch[failed_index + 1:]
+            WRITE_BUFFER_OPS.inc(self.name, "requeued", amount=len(batch) - failed_index - 1)
+            logger.error(f"❌ 쓰기 배치 일부 실패: {write_errors[0].get('errmsg')}")
+        except asyncio.CancelledError:
+            # 전송 중 취소 (루프 종료 등): 배치를 잃지 않도록 큐 앞에 되돌리고 취소 전파
+            done = []
+            self._ops[:0] = batch
+            WRITE_BUFFER_OPS.inc(self.name, "requeued", amount=len(batch))
+            raise
+        except Exception as e:
+            self._fail(batch, e)
+            logger.error(f"❌ 쓰기 배치 전송 실패 ({len(batch)}건): {e}")
+        finally:
+            for _, _, key in done:
+                if key and key in self._pending_keys:
+                    self._pending_keys[key] -= 1
+                    if self._pending_keys[key] <= 0:
+                        del self._pending_keys[key]
+
+    async def close(self):
+        """
+        남은 쓰기를 모두 전송하고 종료
+
+        대기 타이머만 취소하고, 진행 중인 플러시는 취소하지 않고 끝날 때까지 기다린다
+        (취소하면 이미 큐에서 꺼낸 배치를 잃고 durable 호출자가 응답을 받지 못함).
+        """
+        if self._linger_handle is not None:
+            self._linger_handle.cancel()
+            self._linger_handle = None
+        if self._flush_task is not None and not self._flush_task.done():
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+        logger.info("✅ 쓰기 버퍼 플러시 완료")
@@ -1,21 +1,39 @@
 """
 GazeHome AI Services - Logger Utility
-로깅 유틸리티
+로깅 유틸리티 (QueueHandler → 리스너 스레드 → stdout, JSON 구조화 출력)
 """
 
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
 import pytz
 from app.core.config import *
+from app.core.metrics import registry
+from app.core.tracing import current_trace_id
 
 # 한국 시간대 설정
 KST = pytz.timezone('Asia/Seoul')
 
+# 로그 파이프라인 처리 결과 (queued / sampled_out / rate_limited / dropped / overflow)
+LOG_RECORDS = registry.counter(
+    "gazehome_log_records",
+    "로그 파이프라인 처리 결과",
+    ("result",)
+)
+
+# LogRecord 기본 속성 (나머지는 extra로 넘긴 구조화 필드)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
 
 class KSTFormatter(logging.Formatter):
     """한국 시간대 포맷터"""
-    
+
     def formatTime(self, record, datefmt=None):
         """시간을 한국 시간대로 포맷"""
         ct = datetime.fromtimestamp(record.created, tz=KST)
@@ -26,28 +44,222 @@ class KSTFormatter(logging.Formatter):
         return s
 
 
+class JSONFormatter(KSTFormatter):
+    """한 줄 JSON 포맷터 (extra로 넘긴 필드와 예외 스택 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=KST).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    로거별 INFO 이하 표본 추출 (rates: 로거 이름 접두사 -> 남길 비율)
+
+    가장 긴 접두사의 비율을 쓰며, WARNING 이상은 항상 남긴다.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+            rate = self.rates[max(matches, key=len)] if matches else 1.0
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        LOG_RECORDS.inc("sampled_out")
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    호출 위치(로거, 줄 번호)별 INFO 이하 초당 건수 제한 (토큰 버킷)
+
+    제한으로 버린 건수는 같은 위치에서 다음에 남기는 로그의 suppressed 필드로 붙인다.
+    시각은 record.created를 그대로 써서 시계를 따로 읽지 않는다. WARNING 이상은 항상 남긴다.
+    Agent 도구 스레드와 동시에 호출되면 건수가 조금 어긋날 수 있다 (잠금 없음).
+    """
+
+    def __init__(self, per_second: float, burst: int):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        # (로거, 줄 번호) -> [남은 토큰, 마지막 시각, 버린 건수]
+        self._buckets: Dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.lineno)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.burst - 1.0, record.created, 0]
+            return True
+        tokens = min(self.burst, bucket[0] + (record.created - bucket[1]) * self.per_second)
+        bucket[1] = record.created
+        if tokens < 1.0:
+            bucket[0] = tokens
+            bucket[2] += 1
+            LOG_RECORDS.inc("rate_limited")
+            return False
+        bucket[0] = tokens - 1.0
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+class _PipelineHandler(QueueHandler):
+    """
+    이벤트 루프 쪽 핸들러 - 메시지 문자열만 확정해 큐에 넣음
+
+    큐가 가득 차면 INFO 이하는 버리고, WARNING 이상은 overflow 핸들러(stderr)로 바로 쓴다.
+    """
+
+    def __init__(self, queue_: queue.Queue, overflow: logging.Handler):
+        super().__init__(queue_)
+        self.overflow = overflow
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 포맷/직렬화는 리스너 스레드에서 (같은 프로세스 큐라 exc_info는 그대로 넘김)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        # 추적 중이면 같은 요청/실행의 로그를 묶을 수 있도록 추적 ID 기록
+        trace_id = current_trace_id()
+        if trace_id is not None:
+            record.trace_id = trace_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            LOG_RECORDS.inc("queued")
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                # 경고/오류는 잃지 않도록 이벤트 루프를 막더라도 동기로 기록
+                self.overflow.handle(record)
+                LOG_RECORDS.inc("overflow")
+            else:
+                LOG_RECORDS.inc("dropped")
+
+
+class LoggingPipeline:
+    """
+    비동기 로깅 파이프라인
+
+    루트 로거에 QueueHandler를 붙여 이벤트 루프에서는 필터(표본 추출/건수 제한)와 큐 삽입만 하고,
+    포맷과 stdout 쓰기는 QueueListener 스레드가 맡는다. 큐가 가득 차면 INFO 이하는 기다리지 않고 버리고
+    WARNING 이상은 stderr에 바로 쓴다.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        json_format: bool = True,
+        queue_size: int = 10000,
+        sampling: Optional[Dict[str, float]] = None,
+        rate_limit_per_second: float = 0.0,
+        rate_limit_burst: int = 50,
+        overflow_stream: Optional[TextIO] = None
+    ):
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        output = logging.StreamHandler(stream or sys.stdout)
+        overflow = logging.StreamHandler(overflow_stream or sys.stderr)
+        if json_format:
+            formatter = JSONFormatter()
+        else:
+            formatter = KSTFormatter(
+                fmt='%(asctime)s [KST] %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+        output.setFormatter(formatter)
+        overflow.setFormatter(formatter)
+        self.handler = _PipelineHandler(self.queue, overflow)
+        if sampling:
+            self.handler.addFilter(SamplingFilter(sampling))
+        if rate_limit_per_second > 0:
+            self.handler.addFilter(RateLimitFilter(rate_limit_per_second, rate_limit_burst))
+        self.listener = QueueListener(self.queue, output)
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self.listener.start()
+            self._running = True
+
+    def stop(self):
+        """남은 로그를 모두 쓰고 리스너 종료"""
+        if self._running:
+            self.listener.stop()
+            self._running = False
+
+
+_pipeline: Optional[LoggingPipeline] = None
+
+
+def configure_logging(**kwargs) -> LoggingPipeline:
+    """로깅 파이프라인 (재)구성 - 인자를 생략하면 LOG_* 환경 설정 사용"""
+    global _pipeline
+    root = logging.getLogger()
+    if _pipeline is not None:
+        root.removeHandler(_pipeline.handler)
+        _pipeline.stop()
+
+    kwargs.setdefault("json_format", LOG_FORMAT == "json")
+    kwargs.setdefault("queue_size", LOG_QUEUE_SIZE)
+    kwargs.setdefault("sampling", LOG_SAMPLING)
+    kwargs.setdefault("rate_limit_per_second", LOG_RATE_LIMIT_PER_SECOND)
+    kwargs.setdefault("rate_limit_burst", LOG_RATE_LIMIT_BURST)
+    _pipeline = LoggingPipeline(**kwargs)
+    root.addHandler(_pipeline.handler)
+    _pipeline.start()
+    return _pipeline
+
+
+def shutdown_logging():
+    """종료 시 큐에 남은 로그 기록"""
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+atexit.register(shutdown_logging)
+
+
 def setup_logger(name: str = "gazehome") -> logging.Logger:
-    """로거 설정"""
+    """로거 설정 (출력은 루트 로거의 파이프라인이 담당)"""
+    if _pipeline is None:
+        configure_logging()
+
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, LOG_LEVEL.upper()))
-    
-    # 기존 핸들러 제거
+
+    # 기존 핸들러 제거 (루트로 전달해 파이프라인 한 곳에서 출력)
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
-    
-    # 콘솔 핸들러 설정
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, LOG_LEVEL.upper()))
-    
-    # 포맷터 설정
-    formatter = KSTFormatter(
-        fmt='%(asctime)s [KST] %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
-    
+    logger.propagate = True
+
     return logger
 
 
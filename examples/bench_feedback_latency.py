@@ -0,0 +1,105 @@
+"""
+GazeHome AI Services - 피드백 경로 지연 벤치마크
+대량의 추천 문서를 시드한 뒤 인덱스 유무에 따른 피드백 처리 지연을 비교
+
+실행 방법:
+    PYTHONPATH=. python examples/bench_feedback_latency.py --docs 1000000 --samples 200
+
+주의: MONGODB_URL의 별도 벤치마크 데이터베이스(기본: gazehome_bench)를 사용하며
+      실행 시 recommendations 컬렉션을 비웁니다.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import MONGODB_URL
+from app.core.indexes import ensure_indexes, verify_query_plans
+
+KST = timezone(timedelta(hours=9))
+STATUSES = ["pending", "confirmed", "rejected", "expired"]
+
+
+async def seed(collection, total: int, batch_size: int = 10000):
+    """추천 문서 시드"""
+    print(f"🌱 {total:,}개 문서 시드 중...")
+    base = datetime.now(KST)
+    started = time.perf_counter()
+    for offset in range(0, total, batch_size):
+        docs = []
+        for i in range(offset, min(offset + batch_size, total)):
+            docs.append({
+                "recommendation_id": f"rec_bench_{i:08d}",
+                "user_id": f"user_{i % 5000}",
+                "title": "에어컨 켤까요?",
+                "contents": "실내 온도가 높습니다.",
+                "device_control": {"device_type": "air_conditioner", "device_id": f"dev_{i % 5000}", "action": "aircon_on"},
+                "status": random.choice(STATUSES),
+                "mode": "production",
+                "created_at": base - timedelta(seconds=i),
+            })
+        await collection.insert_many(docs, ordered=False)
+    print(f"✅ 시드 완료: {time.perf_counter() - started:.1f}초")
+
+
+async def measure_feedback(collection, total: int, samples: int) -> list:
+    """피드백 경로(추천 조회 + 상태 갱신) 지연 측정 (ms)"""
+    latencies = []
+    for _ in range(samples):
+        rec_id = f"rec_bench_{random.randrange(total):08d}"
+        started = time.perf_counter()
+        await collection.find_one({"recommendation_id": rec_id})
+        await collection.update_one(
+            {"recommendation_id": rec_id},
+            {"$set": {"status": "confirmed", "user_response": "YES", "confirmed_at": datetime.now(KST)}}
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list):
+    """지연 통계 출력"""
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"📊 {label}: p50={statistics.median(latencies):.2f}ms p95={p95:.2f}ms max={latencies[-1]:.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="피드백 경로 지연 벤치마크")
+    parser.add_argument("--docs", type=int, default=1_000_000, help="시드할 문서 수")
+    parser.add_argument("--samples", type=int, default=200, help="측정 횟수")
+    parser.add_argument("--database", default="gazehome_bench", help="벤치마크 데이터베이스")
+    args = parser.parse_args()
+
+    if not MONGODB_URL:
+        print("❌ MONGODB_URL이 설정되지 않았습니다")
+        return
+
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[args.database]
+    collection = db.recommendations
+
+    try:
+        await collection.drop()
+        await seed(collection, args.docs)
+
+        # 인덱스 없이 측정 (컬렉션 스캔)
+        report("인덱스 없음", await measure_feedback(collection, args.docs, max(args.samples // 10, 10)))
+
+        # 인덱스 생성 후 측정
+        started = time.perf_counter()
+        await ensure_indexes(db)
+        print(f"🔧 인덱스 생성: {time.perf_counter() - started:.1f}초")
+        plans = await verify_query_plans(db)
+        print(f"🔍 쿼리 플랜: {plans}")
+        report("인덱스 적용", await measure_feedback(collection, args.docs, args.samples))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+GazeHome AI Services - 읽기 경로 모델 변환 마이크로벤치마크
+DB 문서 -> 모델 변환 방식별 문서당 시간과 메모리 할당 비교 (MongoDB 불필요)
+
+실행 방법:
+    PYTHONPATH=. python examples/bench_lean_reads.py --docs 20000
+"""
+import os
+
+# 앱 모듈 임포트 전에 설정 (저장소를 쓰지 않는 모델 변환 벤치마크)
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.models.device_management import UserDevice, UserDeviceRecord
+from app.models.recommendations import Recommendation, RecommendationRecord
+from app.services.recommendation_service import EXECUTION_PROJECTION
+
+
+def make_recommendation_doc(i: int) -> dict:
+    """MongoDB에서 읽은 것과 같은 형태의 추천 문서"""
+    return {
+        "_id": str(ObjectId()),
+        "recommendation_id": f"rec_20250101_120000_{i:06x}",
+        "user_id": f"user_{i % 100}",
+        "title": "에어컨을 켜고 온도를 낮출까요?",
+        "contents": "실내 온도가 높아 냉방을 추천드립니다.",
+        "context": None,
+        "device_control": {
+            "device_type": "air_conditioner",
+            "device_id": "ac_001",
+            "action": None,
+            "actions": [
+                {"action": "aircon_on", "order": 1, "description": "에어컨 켜기", "delay_seconds": 3},
+                {"action": "temp_22", "order": 2, "description": "온도 22도", "delay_seconds": 3},
+            ],
+        },
+        "control_plan": {
+            "device_type": "air_conditioner",
+            "device_id": "ac_001",
+            "steps": [
+                {"action": "aircon_on", "description": "에어컨 켜기", "delay_after_seconds": 3},
+                {"action": "temp_22", "description": "온도 22도", "delay_after_seconds": 0},
+            ],
+        },
+        "status": "pending",
+        "mode": "production",
+        "user_response": None,
+        "created_at": datetime.utcnow(),
+        "confirmed_at": None,
+        "hardware_sent_at": None,
+    }
+
+
+def make_device_doc(i: int) -> dict:
+    """MongoDB에서 읽은 것과 같은 형태의 기기 문서"""
+    return {
+        "_id": str(ObjectId()),
+        "user_id": f"user_{i % 100}",
+        "device_id": f"dev_{i}",
+        "device_type": "air_conditioner",
+        "alias": "거실 에어컨",
+        "supported_actions": ["aircon_on", "aircon_off", "temp_22"],
+        "is_active": True,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def run(label: str, docs: list, convert):
+    """변환 함수의 문서당 시간(µs)과 할당(bytes) 측정"""
+    for doc in docs[:100]:  # 워밍업
+        convert(doc)
+
+    started = time.perf_counter()
+    for doc in docs:
+        convert(doc)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    kept = [convert(doc) for doc in docs[:1000]]
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, "filename"))
+    del kept
+
+    print(f"📊 {label:<36} {elapsed / len(docs) * 1e6:>8.2f} µs/doc {allocated / 1000:>8.0f} B/doc")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="읽기 경로 모델 변환 마이크로벤치마크")
+    parser.add_argument("--docs", type=int, default=20000, help="변환할 문서 수")
+    args = parser.parse_args()
+
+    recommendation_docs = [make_recommendation_doc(i) for i in range(args.docs)]
+    projected_docs = [
+        {k: v for k, v in doc.items() if k in EXECUTION_PROJECTION or k == "_id"}
+        for doc in recommendation_docs
+    ]
+    device_docs = [make_device_doc(i) for i in range(args.docs)]
+
+    run("Recommendation(**doc) 검증", recommendation_docs, lambda d: Recommendation(**d))
+    run("Recommendation.model_construct", recommendation_docs, lambda d: Recommendation.model_construct(**d))
+    run("RecommendationRecord", recommendation_docs, RecommendationRecord)
+    run("RecommendationRecord + 프로젝션", projected_docs, RecommendationRecord)
+    run("UserDevice(**doc) 검증", device_docs, lambda d: UserDevice(**d))
+    run("UserDevice.model_construct", device_docs, lambda d: UserDevice.model_construct(**d))
+    run("UserDeviceRecord", device_docs, UserDeviceRecord)
+
+
+if __name__ == "__main__":
+    main()
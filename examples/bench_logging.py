@@ -0,0 +1,178 @@
+"""
+GazeHome AI Services - 로깅 파이프라인 벤치마크
+이벤트 루프에서 로깅에 쓰는 시간 비교 (stdout 직접 쓰기 + print vs QueueHandler 파이프라인)
+
+실행 방법:
+    PYTHONPATH=. python examples/bench_logging.py
+    PYTHONPATH=. python examples/bench_logging.py --tasks 200 --iterations 50 --write-latency-us 200
+
+부하: tasks개 코루틴이 iterations번씩 "Agent 한 번 실행"에 해당하는 로그를 남긴다.
+(Gateway 조회 로그 4줄(응답 전체 dump 포함) + Agent 결과 dump + 추천 생성/스케줄러 판단 INFO 2줄)
+- before: 이 변경 전처럼 로거마다 StreamHandler(stdout)를 붙이고, Agent 모듈 로그는 print로 출력
+- after: 루트 QueueHandler 파이프라인 (JSON, 호출 위치별 건수 제한, 호출 상세/dump는 DEBUG로 내림)
+- after_unlimited: 파이프라인은 같고 건수 제한만 끔
+
+stdout은 write() 한 번에 --write-latency-us 만큼 막히는 느린 스트림으로 흉내 낸다
+(터미널/파이프 소비자가 느릴 때). "루프 내 로깅 시간"은 로깅 호출 구간을 perf_counter로 잰 합이고,
+"최대 루프 지연"은 1ms 주기 타이머가 늦게 깨어난 최댓값이다.
+"""
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "INFO")
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from time import perf_counter
+
+from app.utils.logger import KSTFormatter, configure_logging, shutdown_logging
+
+# Gateway /api/lg/devices 응답과 비슷한 크기의 데이터 (기기 12대)
+GATEWAY_RESPONSE = {
+    "response": [
+        {
+            "deviceId": f"device_{i:04d}" + "x" * 40,
+            "deviceInfo": {"deviceType": "DEVICE_AIR_CONDITIONER", "modelName": "LG-AC-2025", "alias": f"거실 에어컨 {i}", "reportable": True}
+        }
+        for i in range(12)
+    ]
+}
+
+
+class SlowStream:
+    """write() 한 번마다 latency 초 동안 막히는 stdout 흉내"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        # 막힌 write 시스템 호출처럼 GIL을 놓고 대기 (짧은 지연은 OS 타이머 정밀도만큼 늘어날 수 있음)
+        time.sleep(self.latency)
+        self.writes += 1
+        self.bytes += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def legacy_logger(name: str, stream: SlowStream) -> logging.Logger:
+    """이 변경 전 setup_logger와 같은 구성 (로거별 동기 StreamHandler)"""
+    logger = logging.getLogger(f"bench.legacy.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(KSTFormatter(
+        fmt='%(asctime)s [KST] %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    logger.addHandler(handler)
+    return logger
+
+
+async def workload(mode: str, stream: SlowStream, tasks: int, iterations: int):
+    if mode == "before":
+        agent = legacy_logger("agent", stream)
+        scheduler = legacy_logger("scheduler", stream)
+
+        def emit(user_id: str, i: int):
+            print(f"🔍 Gateway API 호출 시도: http://localhost:9000/api/lg/devices", file=stream)
+            print(f"📡 Gateway API 응답 상태: 200", file=stream)
+            print(f"📋 Gateway API 응답 데이터: {GATEWAY_RESPONSE}", file=stream)
+            print(f"✅ Gateway API 성공: 12개 기기 조회", file=stream)
+            print(f"🔍 Agent 실행 결과: {{'output': '{json.dumps(GATEWAY_RESPONSE)[:400]}'}}", file=stream)
+            agent.info(f"✅ 스마트 추천 Agent 추천 생성: {user_id} #{i}")
+            scheduler.info(f"추천 트리거 없음: 사용자={user_id}, 사유=no_change")
+    else:
+        agent = logging.getLogger("bench.pipeline.agent")
+        scheduler = logging.getLogger("bench.pipeline.scheduler")
+        for logger in (agent, scheduler):
+            logger.setLevel(logging.INFO)
+
+        def emit(user_id: str, i: int):
+            agent.debug(f"🔍 Gateway API 호출 시도: http://localhost:9000/api/lg/devices")
+            agent.debug(f"📡 Gateway API 응답 상태: 200")
+            agent.debug("📋 Gateway API 응답 데이터: %s", GATEWAY_RESPONSE)
+            agent.info(f"✅ Gateway API 성공: 12개 기기 조회")
+            agent.debug("🔍 Agent 실행 결과: %s", GATEWAY_RESPONSE)
+            agent.info(f"✅ 스마트 추천 Agent 추천 생성: {user_id} #{i}")
+            scheduler.info(f"추천 트리거 없음: 사용자={user_id}, 사유=no_change")
+
+    spent = 0.0
+    max_lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal max_lag
+        while not done:
+            started = perf_counter()
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, perf_counter() - started - 0.001)
+
+    async def user(user_id: str):
+        nonlocal spent
+        for i in range(iterations):
+            started = perf_counter()
+            emit(user_id, i)
+            spent += perf_counter() - started
+            await asyncio.sleep(0)
+
+    tick = asyncio.create_task(ticker())
+    started = perf_counter()
+    await asyncio.gather(*(user(f"user_{n:04d}") for n in range(tasks)))
+    wall = perf_counter() - started
+    done = True
+    await tick
+    return spent, max_lag, wall
+
+
+def run(mode: str, args) -> dict:
+    stream = SlowStream(args.write_latency_us / 1e6)
+    if mode != "before":
+        configure_logging(
+            stream=stream,
+            rate_limit_per_second=0 if mode == "after_unlimited" else args.rate_limit,
+            rate_limit_burst=args.burst,
+            queue_size=args.queue_size
+        )
+    spent, max_lag, wall = asyncio.run(workload(mode, stream, args.tasks, args.iterations))
+    flush_started = perf_counter()
+    if mode != "before":
+        # 리스너 스레드가 남은 로그를 모두 쓸 때까지 대기 (루프 밖)
+        shutdown_logging()
+    flush = perf_counter() - flush_started
+    return {"spent": spent, "max_lag": max_lag, "wall": wall, "flush": flush, "writes": stream.writes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로깅 파이프라인 벤치마크")
+    parser.add_argument("--tasks", type=int, default=100, help="동시 코루틴 수")
+    parser.add_argument("--iterations", type=int, default=20, help="코루틴당 반복 수")
+    parser.add_argument("--write-latency-us", type=float, default=100.0, help="stdout write() 한 번의 지연 (us)")
+    parser.add_argument("--rate-limit", type=float, default=10.0, help="호출 위치별 초당 로그 수")
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    events = args.tasks * args.iterations
+    print(f"Agent 실행 {events}회 분량 로그, stdout write 지연 {args.write_latency_us:.0f}us", file=sys.stderr)
+    header = f"{'방식':<18s} {'루프 내 로깅(ms)':>16s} {'실행당(us)':>10s} {'최대 루프 지연(ms)':>18s} {'stdout 쓰기':>10s} {'종료 시 flush(ms)':>17s}"
+    print(header)
+    print("-" * len(header))
+    for mode in ("before", "after", "after_unlimited"):
+        result = run(mode, args)
+        print(f"{mode:<18s} {result['spent'] * 1000:16.1f} {result['spent'] / events * 1e6:10.1f} "
+              f"{result['max_lag'] * 1000:18.1f} {result['writes']:10d} {result['flush'] * 1000:17.1f}")
+        time.sleep(0.1)
+
+
+if __name__ == "__main__":
+    main()
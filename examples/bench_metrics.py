@@ -0,0 +1,160 @@
+"""
+GazeHome AI Services - 지표 수집 오버헤드 벤치마크
+app.core.metrics의 관측 한 번에 드는 시간 측정 (히스토그램 관측, 카운터 증가, StageTimer 블록)
+과 추적 span을 함께 남기는 TracedStageTimer의 추가 비용 (추적 밖/안)
+
+실행 방법:
+    PYTHONPATH=. python examples/bench_metrics.py
+    PYTHONPATH=. python examples/bench_metrics.py --number 500000 --repeat 7
+
+각 항목은 repeat번 측정한 값 중 최솟값을 호출 한 번당 ns로 출력한다.
+"빈 함수 호출"과 "빈 with 블록"은 측정 자체의 기준선이며, StageTimer 블록에는
+perf_counter() 두 번과 타이머 객체 생성이 포함된다. "추적 안" 항목은 span 상한에
+걸리지 않도록 호출마다 span 목록을 비운다 (list.clear 비용 포함).
+prometheus_client가 설치되어 있으면 같은 라벨 구성의 관측 비용도 함께 출력한다.
+"""
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import timeit
+from time import perf_counter
+
+from app.core.metrics import MetricsRegistry, SCHEDULER_DECISIONS, STAGE_SECONDS, StageTimer, timed
+from app.core.tracing import TracedStageTimer, start_trace, traced
+
+LABELS = ("gateway", "control_device", "air_conditioner", "ok")
+
+
+class _Empty:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def cases():
+    """(이름, 측정 함수) 목록"""
+    child = STAGE_SECONDS.labels(*LABELS)
+    STAGE_SECONDS.observe(0.01, *LABELS)
+
+    def nothing():
+        pass
+
+    def empty_with():
+        with _Empty():
+            pass
+
+    def two_clocks():
+        perf_counter()
+        perf_counter()
+
+    def child_observe():
+        child.observe(0.0123)
+
+    def histogram_observe():
+        STAGE_SECONDS.observe(0.0123, *LABELS)
+
+    def counter_inc():
+        SCHEDULER_DECISIONS.inc("skip", "no_change")
+
+    def stage_timer():
+        with StageTimer("gateway", "control_device", "air_conditioner"):
+            pass
+
+    def traced_outside():
+        with TracedStageTimer("gateway", "control_device", "air_conditioner"):
+            pass
+
+    trace = start_trace("bench").__enter__()
+
+    def traced_inside():
+        with TracedStageTimer("gateway", "control_device", "air_conditioner"):
+            pass
+        trace.spans.clear()
+
+    result = [
+        ("빈 함수 호출 (기준선)", nothing),
+        ("빈 with 블록 (기준선)", empty_with),
+        ("perf_counter() x2 (기준선)", two_clocks),
+        ("히스토그램 관측 (라벨 조회 후)", child_observe),
+        ("히스토그램 관측 (라벨 포함)", histogram_observe),
+        ("카운터 증가 (라벨 포함)", counter_inc),
+        ("StageTimer with 블록 전체", stage_timer),
+        ("TracedStageTimer (추적 밖)", traced_outside),
+        ("TracedStageTimer (추적 안)", traced_inside),
+    ]
+
+    try:
+        import prometheus_client
+    except ImportError:
+        return result
+
+    prometheus = prometheus_client.Histogram(
+        "bench_stage_duration_seconds", "bench", ("stage", "operation", "device_type", "outcome"),
+        registry=prometheus_client.CollectorRegistry()
+    )
+
+    def prometheus_observe():
+        prometheus.labels(*LABELS).observe(0.0123)
+
+    result.append(("prometheus_client 관측 (라벨 포함)", prometheus_observe))
+    return result
+
+
+async def bench_decorator(number: int, decorator) -> float:
+    """데코레이터를 붙인 코루틴과 붙이지 않은 코루틴의 호출당 차이 (ns)"""
+    async def plain():
+        return None
+
+    decorated = decorator("bench", "noop")(plain)
+
+    async def loop(func):
+        started = perf_counter()
+        for _ in range(number):
+            await func()
+        return perf_counter() - started
+
+    plain_seconds = min([await loop(plain) for _ in range(3)])
+    decorated_seconds = min([await loop(decorated) for _ in range(3)])
+    return (decorated_seconds - plain_seconds) / number * 1e9
+
+
+def bench_render() -> float:
+    """라벨 조합 200개(단계 x 연산 x 기기 x 결과)일 때 /metrics 출력 시간 (ms)"""
+    local = MetricsRegistry()
+    histogram = local.histogram("bench_seconds", "bench", ("stage", "operation", "device_type", "outcome"))
+    for stage in ("agent", "tool", "gateway", "hardware", "recommendation"):
+        for operation in range(5):
+            for device_type in ("air_conditioner", "air_purifier"):
+                for outcome in ("ok", "error", "miss", "skipped"):
+                    histogram.observe(0.05, stage, f"op{operation}", device_type, outcome)
+    return min(timeit.repeat(local.render, number=10, repeat=5)) / 10 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지표 수집 오버헤드 벤치마크")
+    parser.add_argument("--number", type=int, default=200000, help="측정당 호출 수")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 측정 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    print(f"{'항목':<36s} {'호출당(ns)':>10s}")
+    print("-" * 48)
+    for name, func in cases():
+        seconds = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        print(f"{name:<36s} {seconds / args.number * 1e9:10.0f}")
+
+    for name, decorator in (("@timed", timed), ("@traced (추적 밖)", traced)):
+        overhead = asyncio.run(bench_decorator(args.number, decorator))
+        print(f"{name + ' 코루틴 추가 비용':<36s} {overhead:10.0f}")
+    print(f"\n/metrics 출력 (라벨 조합 200개): {bench_render():.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+GazeHome AI Services - 추천 목록 페이지네이션 벤치마크
+skip/limit 방식과 (created_at, _id) 커서 방식의 페이지 깊이별 지연 비교
+
+실행 방법:
+    PYTHONPATH=. python examples/bench_pagination.py --docs 500000
+
+주의: MONGODB_URL의 별도 벤치마크 데이터베이스(기본: gazehome_bench_page)를 사용하며
+      실행 시 recommendations 컬렉션을 비웁니다.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import MONGODB_URL
+from app.core.indexes import ensure_indexes
+from app.repositories.mongo import MongoRecommendationRepository, MongoStatsRepository, KEYSET_SORT
+from app.services.recommendation_service import RecommendationService, LIST_PROJECTION, encode_cursor
+
+KST = timezone(timedelta(hours=9))
+PAGE_SIZE = 20
+DEPTHS = [0, 1_000, 10_000, 100_000, 400_000]
+
+
+async def seed(collection, total: int, batch_size: int = 10000):
+    """추천 문서 시드"""
+    print(f"🌱 {total:,}개 문서 시드 중...")
+    base = datetime.now(KST)
+    for offset in range(0, total, batch_size):
+        await collection.insert_many([
+            {
+                "_id": str(ObjectId()),
+                "recommendation_id": f"rec_bench_{i:08d}",
+                "user_id": f"user_{i % 100}",
+                "title": "에어컨 켤까요?",
+                "contents": "실내 온도가 높습니다.",
+                "status": random.choice(["pending", "confirmed", "rejected"]),
+                "mode": "production",
+                # 같은 created_at이 여러 개 생기도록 초 단위로 묶음
+                "created_at": base - timedelta(seconds=i // 3),
+            }
+            for i in range(offset, min(offset + batch_size, total))
+        ], ordered=False)
+
+
+async def timed(coro, repeat: int = 5) -> float:
+    """coroutine 팩토리를 반복 실행하여 중앙값(ms) 반환"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="추천 목록 페이지네이션 벤치마크")
+    parser.add_argument("--docs", type=int, default=500_000, help="시드할 문서 수")
+    parser.add_argument("--database", default="gazehome_bench_page", help="벤치마크 데이터베이스")
+    args = parser.parse_args()
+
+    if not MONGODB_URL:
+        print("❌ MONGODB_URL이 설정되지 않았습니다")
+        return
+
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[args.database]
+    collection = db.recommendations
+    service = RecommendationService(MongoRecommendationRepository(db), MongoStatsRepository(db))
+
+    try:
+        await collection.drop()
+        await seed(collection, args.docs)
+        await ensure_indexes(db)
+
+        print(f"{'depth':>10} {'skip(ms)':>10} {'cursor(ms)':>11}")
+        for depth in [d for d in DEPTHS if d < args.docs]:
+            async def skip_page():
+                await collection.find({}, LIST_PROJECTION).sort(KEYSET_SORT).skip(depth).limit(PAGE_SIZE).to_list(PAGE_SIZE)
+
+            # 해당 깊이의 커서 준비 (측정 제외)
+            cursor = None
+            if depth:
+                anchor = await collection.find({}, {"created_at": 1}).sort(KEYSET_SORT).skip(depth - 1).limit(1).to_list(1)
+                cursor = encode_cursor(anchor[0]["created_at"], anchor[0]["_id"])
+
+            async def cursor_page():
+                await service.list_recommendations(limit=PAGE_SIZE, cursor=cursor)
+
+            print(f"{depth:>10,} {await timed(skip_page):>10.2f} {await timed(cursor_page):>11.2f}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
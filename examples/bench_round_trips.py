@@ -0,0 +1,132 @@
+"""
+GazeHome AI Services - MongoDB 라운드트립 벤치마크
+상태 전환 경로별 MongoDB 명령 수와 지연을 기존 방식과 비교
+
+실행 방법:
+    PYTHONPATH=. python examples/bench_round_trips.py --iterations 100
+
+주의: MONGODB_URL의 별도 벤치마크 데이터베이스(기본: gazehome_bench_rtt)를 사용하며
+      실행 시 해당 데이터베이스를 삭제합니다.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.core.config import MONGODB_URL
+from app.core.indexes import ensure_indexes
+from app.models.device_management import DeviceRegistrationRequest, DeviceType
+from app.models.recommendations import DeviceControl
+from app.repositories.mongo import MongoDeviceRepository, MongoRecommendationRepository, MongoStatsRepository
+from app.services.device_service import DeviceService
+from app.services.recommendation_service import RecommendationService
+
+# 연결 관리용 명령은 집계에서 제외
+IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "createIndexes", "dropDatabase"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """MongoDB 명령 수 집계"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def measure(counter: CommandCounter, label: str, iterations: int, op):
+    """연산별 평균 라운드트립 수와 지연 측정"""
+    trips, latencies = [], []
+    for i in range(iterations):
+        counter.count = 0
+        started = time.perf_counter()
+        await op(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+        trips.append(counter.count)
+    print(f"📊 {label:<28} 라운드트립={statistics.mean(trips):.1f} p50={statistics.median(latencies):.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MongoDB 라운드트립 벤치마크")
+    parser.add_argument("--iterations", type=int, default=100, help="연산별 반복 횟수")
+    parser.add_argument("--database", default="gazehome_bench_rtt", help="벤치마크 데이터베이스")
+    args = parser.parse_args()
+
+    if not MONGODB_URL:
+        print("❌ MONGODB_URL이 설정되지 않았습니다")
+        return
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(MONGODB_URL, event_listeners=[counter])
+    await client.drop_database(args.database)
+    db = client[args.database]
+    await ensure_indexes(db)
+
+    recommendation_service = RecommendationService(MongoRecommendationRepository(db), MongoStatsRepository(db))
+    device_service = DeviceService()
+    device_service.repository = MongoDeviceRepository(db)
+    recs = db.recommendations
+    control = DeviceControl(device_type="air_conditioner", device_id="bench_ac", action="aircon_on")
+
+    rec_ids = [
+        await recommendation_service.create_recommendation("벤치마크", "벤치마크", control, user_id="bench")
+        for _ in range(args.iterations * 2)
+    ]
+
+    # 기존 방식: find_one -> update_one -> find_one
+    async def legacy_confirm(i):
+        rec_id = rec_ids[i]
+        await recs.find_one({"recommendation_id": rec_id})
+        await recs.update_one({"recommendation_id": rec_id}, {"$set": {"status": "confirmed"}})
+        await recs.find_one({"recommendation_id": rec_id})
+
+    async def confirm(i):
+        await recommendation_service.confirm_recommendation(rec_ids[args.iterations + i], "YES")
+
+    # 기존 방식: find_one -> insert_one
+    async def legacy_register(i):
+        query = {"user_id": "legacy", "device_id": f"dev_{i}"}
+        if not await db.user_devices.find_one(query):
+            await db.user_devices.insert_one({**query, "is_active": True})
+
+    async def register(i):
+        await device_service.register_device("bench", DeviceRegistrationRequest(
+            device_id=f"dev_{i}", device_type=DeviceType.AIR_CONDITIONER,
+            alias="벤치마크 에어컨", supported_actions=["aircon_on"]
+        ))
+
+    # 기존 방식: update_one -> find_one
+    async def legacy_update(i):
+        query = {"user_id": "bench", "device_id": f"dev_{i}"}
+        await db.user_devices.update_one(query, {"$set": {"alias": "변경", "updated_at": datetime.utcnow()}})
+        await db.user_devices.find_one({**query, "is_active": True})
+
+    async def update(i):
+        await device_service.update_device("bench", f"dev_{i}", {"alias": "변경"})
+
+    try:
+        await measure(counter, "confirm (기존)", args.iterations, legacy_confirm)
+        await measure(counter, "confirm (find_one_and_update)", args.iterations, confirm)
+        await measure(counter, "register (기존)", args.iterations, legacy_register)
+        await measure(counter, "register (upsert)", args.iterations, register)
+        await measure(counter, "update (기존)", args.iterations, legacy_update)
+        await measure(counter, "update (find_one_and_update)", args.iterations, update)
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""
+GazeHome AI Services - 도시 단위 추천 재계산(fan-out) 벤치마크
+도시 날씨가 다른 구간으로 넘어갔을 때 가구마다 따로 재계산하는 방식과
+도시 단위로 한 번에 재계산하는 방식(SchedulerService.fan_out)의 작업량 비교
+
+실행 방법:
+    PYTHONPATH=. python examples/bench_weather_fanout.py
+    PYTHONPATH=. python examples/bench_weather_fanout.py --cities 5 --sizes 1,10,100,1000 --llm-latency 3
+
+가구별 방식은 이 변경 전 동작과 같이 가구마다 날씨를 조회하고 Agent를 실행한다 (날씨 캐시 없음).
+LLM/날씨/기기 조회는 호출 수만 세는 가짜 구현이며, LLM 시간은 호출 수 x 지연 / 워커 수로 추정한다.
+"""
+import os
+
+# 앱 모듈 임포트 전에 설정 (메모리 저장소, 리스 없음, 로그 최소화)
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("SCHEDULER_LEASE_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import app.services.recommendation_service as recommendation_module
+from app.repositories.memory import MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.recommendation_service import RecommendationService
+from app.services.scheduler_service import SchedulerService
+from app.services.trigger_engine import TriggerSignals
+from app.services.weather_fanout import DeviceProfile
+
+DEVICE_TYPES = ("air_conditioner", "air_purifier")
+
+
+class FakeAgent:
+    """가짜 LLM Agent - 에어컨 냉방 추천 (꺼져 있으면 켜기부터)"""
+
+    def __init__(self, bench: "BenchScheduler", user_id: str):
+        self.bench = bench
+        self.user_id = user_id
+
+    async def generate_recommendation(self, context: str) -> Dict:
+        self.bench.work["llm_calls"] += 1
+        await asyncio.sleep(0)
+        profile = self.bench.profiles[self.user_id]
+        device_id = next(device_id for device_id, (kind, _) in profile.items() if kind == "air_conditioner")
+        running = profile[device_id][1].endswith("True")
+        actions = ["temp_24"] if running else ["aircon_on", "temp_24"]
+        return {
+            "title": "에어컨 켤까요?",
+            "contents": "기온이 올랐습니다.",
+            "device_control": {
+                "device_type": "air_conditioner",
+                "device_id": device_id,
+                "actions": [{"action": action, "order": i + 1} for i, action in enumerate(actions)]
+            }
+        }
+
+
+class FakeHardware:
+    def __init__(self, bench: "BenchScheduler"):
+        self.bench = bench
+
+    async def send_recommendation(
+        self, recommendation_id: str, title: str, contents: str, device_type: Optional[str] = None
+    ) -> Dict:
+        self.bench.work["hardware_pushes"] += 1
+        return {"message": "추천 수신", "confirm": "PENDING"}
+
+
+class BenchScheduler(SchedulerService):
+    """호출 수를 세는 가짜 날씨/기기/LLM/하드웨어를 쓰는 스케줄러"""
+
+    def __init__(self, temperatures: Dict[str, float], profiles: Dict[str, DeviceProfile], weather_ttl: float):
+        super().__init__()
+        self.temperatures = temperatures
+        self.profiles = profiles
+        self.work = Counter()
+        self.hardware = FakeHardware(self)
+        self.weather.ttl_seconds = weather_ttl
+        # 현재 날씨 구간 변화만 비교 (예보 트리거 끔)
+        self.forecast_horizon_seconds = 0
+
+    async def _fetch_weather(self, location: str) -> Optional[Dict]:
+        self.work["weather_fetches"] += 1
+        return {"temperature": self.temperatures[location], "humidity": 55}
+
+    async def _collect_device_profile(self, user_id: str) -> Optional[DeviceProfile]:
+        self.work["device_reads"] += 1
+        return self.profiles[user_id]
+
+    def _create_agent(self, user_id: str):
+        return FakeAgent(self, user_id)
+
+    def _get_hardware_client(self):
+        return self.hardware
+
+
+def make_households(cities: int, per_city: int, seed: int):
+    """가구별 기기 구성 (에어컨/공기청정기 켜짐 여부 무작위 - 도시당 최대 4가지 구성)"""
+    rng = random.Random(seed)
+    locations, profiles = {}, {}
+    for c in range(cities):
+        for h in range(per_city):
+            user_id = f"city{c:02d}_home{h:05d}"
+            locations[user_id] = f"city_{c:02d}"
+            profiles[user_id] = {}
+            for device_type in DEVICE_TYPES:
+                is_on = rng.random() < 0.5
+                profiles[user_id][f"{user_id}_{device_type}"] = (device_type, f"{'on' if is_on else 'off'}:{is_on}")
+    return locations, profiles
+
+
+async def run(mode: str, cities: int, per_city: int, seed: int) -> Counter:
+    recommendation_module._recommendation_service = RecommendationService(
+        MemoryRecommendationRepository(), MemoryStatsRepository()
+    )
+    locations, profiles = make_households(cities, per_city, seed)
+    temperatures = {location: 24.5 for location in set(locations.values())}
+    # 가구별 방식은 이전 동작처럼 실행마다 날씨 조회
+    scheduler = BenchScheduler(temperatures, profiles, weather_ttl=0 if mode == "per_household" else 300)
+
+    # 모든 가구가 24.5도일 때 추천을 받은 상태에서 시작
+    now = scheduler.clock.now()
+    for user_id, location in locations.items():
+        scheduler.add_user(user_id, 30, location=location)
+        states = {device_id: state for device_id, (_, state) in profiles[user_id].items()}
+        scheduler.trigger_engine.commit(user_id, TriggerSignals(now, 24.5, 55, states))
+
+    # 모든 도시가 다음 온도 구간(26도 이상)으로 이동
+    for location in temperatures:
+        temperatures[location] = 27.0
+
+    started = time.perf_counter()
+    if mode == "per_household":
+        for user_id in locations:
+            await scheduler.run_once(user_id)
+    else:
+        for location in temperatures:
+            await scheduler.fan_out(location)
+    scheduler.work["wall_ms"] = int((time.perf_counter() - started) * 1000)
+
+    service = await recommendation_module.get_recommendation_service()
+    scheduler.work["stored"] = service.get_dedup_stats()["created"]
+    await service.close()
+    return scheduler.work
+
+
+async def main_async(args):
+    sizes = [int(size) for size in args.sizes.split(",")]
+    header = (f"{'가구/도시':>9s} {'방식':>14s} {'날씨조회':>8s} {'기기조회':>8s} {'LLM':>8s} {'저장':>8s} "
+              f"{'전송':>8s} {'가구당 작업':>10s} {'LLM 추정(초)':>12s} {'실제(ms)':>9s}")
+    print(header)
+    print("-" * len(header))
+    for per_city in sizes:
+        households = args.cities * per_city
+        for mode in ("per_household", "fanout"):
+            work = await run(mode, args.cities, per_city, args.seed)
+            # 외부 호출(날씨 + LLM)을 작업 단위로 봄 (기기 상태 조회는 두 방식 모두 가구당 1회)
+            per_household = (work["weather_fetches"] + work["llm_calls"]) / households
+            llm_seconds = work["llm_calls"] * args.llm_latency / args.workers
+            print(f"{per_city:9d} {mode:>14s} {work['weather_fetches']:8d} {work['device_reads']:8d} "
+                  f"{work['llm_calls']:8d} {work['stored']:8d} {work['hardware_pushes']:8d} "
+                  f"{per_household:10.3f} {llm_seconds:12.1f} {work['wall_ms']:9d}")
+    print(f"\n도시 {args.cities}곳, LLM 지연 {args.llm_latency}초, 워커 {args.workers}개 기준 추정")
+    print("fan-out은 도시당 날씨 1회, 기기 구성(종류별 켜짐 여부)당 LLM 1회라 가구 수가 늘어도 외부 호출이 거의 늘지 않음")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도시 단위 추천 재계산 벤치마크")
+    parser.add_argument("--cities", type=int, default=5)
+    parser.add_argument("--sizes", default="1,10,100,1000", help="도시당 가구 수 (쉼표 구분)")
+    parser.add_argument("--llm-latency", type=float, default=3.0, help="LLM 응답 지연 (초, 추정용)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 LLM 호출 수 (추정용)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
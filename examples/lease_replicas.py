@@ -0,0 +1,177 @@
+"""
+GazeHome AI Services - 스케줄러 리더 리스 검증
+여러 인스턴스가 같은 리스를 두고 경쟁할 때 리더가 동시에 둘 이상 생기지 않는지,
+리더가 죽으면 얼마 만에 다른 인스턴스가 이어받는지 확인
+
+실행 방법:
+    # 한 프로세스 안에서 메모리 리스 저장소로 시뮬레이션
+    PYTHONPATH=. python examples/lease_replicas.py --backend memory --replicas 3
+
+    # 여러 프로세스가 로컬 MongoDB를 공유 (예: docker run -p 27017:27017 mongo:7)
+    MONGODB_URL=mongodb://localhost:27017 PYTHONPATH=. python examples/lease_replicas.py --backend mongodb --replicas 3
+
+주의: mongodb 모드는 MONGODB_URL의 별도 데이터베이스(기본: gazehome_bench_lease)를 사용하며
+      실행 시 해당 데이터베이스를 삭제합니다.
+"""
+import os
+
+# 앱 모듈 임포트 전에 설정 (리스 저장소는 --backend로 직접 선택)
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import time
+from typing import Dict, List, Tuple
+
+from app.core.config import MONGODB_URL
+from app.repositories.memory import MemoryLeaseRepository
+from app.services.scheduler_lease import SchedulerLease
+
+SAMPLE_SECONDS = 0.05
+
+
+def check_samples(samples: List[Tuple[float, Dict[str, int]]]) -> Dict[str, object]:
+    """(시각, {보유자: 토큰}) 샘플에서 동시 리더, 토큰 역행, 리더 공백 구간 확인"""
+    overlaps = sum(1 for _, leaders in samples if len(leaders) > 1)
+    tokens = [token for _, leaders in samples for token in leaders.values()]
+    regressions = sum(1 for a, b in zip(tokens, tokens[1:]) if b < a)
+
+    gaps, gap_start = [], None
+    for at, leaders in samples:
+        if not leaders and gap_start is None:
+            gap_start = at
+        elif leaders and gap_start is not None:
+            gaps.append(at - gap_start)
+            gap_start = None
+
+    return {
+        "samples": len(samples),
+        "overlapping_samples": overlaps,
+        "token_regressions": regressions,
+        "tokens": sorted(set(tokens)),
+        "longest_gap_seconds": round(max(gaps, default=0.0), 3)
+    }
+
+
+async def run_memory(args):
+    repository = MemoryLeaseRepository()
+    leases = [
+        SchedulerLease(repository, holder_id=f"replica-{i}", ttl_seconds=args.ttl,
+                       renew_seconds=args.renew, safety_margin_seconds=args.margin)
+        for i in range(args.replicas)
+    ]
+    for lease in leases:
+        await lease.start()
+
+    samples, crashed = [], []
+    started = time.monotonic()
+    while time.monotonic() - started < args.duration:
+        now = time.monotonic() - started
+        leaders = {lease.holder_id: lease.token for lease in leases if lease.is_leader}
+        samples.append((now, leaders))
+
+        # 중간에 리더를 "강제 종료" - 반납 없이 연장 루프만 멈춤
+        if len(crashed) < args.crashes and now > args.duration * (len(crashed) + 1) / (args.crashes + 1):
+            leader = next((lease for lease in leases if lease.is_leader and lease not in crashed), None)
+            if leader:
+                leader.task.cancel()
+                crashed.append(leader)
+                print(f"[{now:6.2f}s] 리더 강제 종료: {leader.holder_id} (토큰 {leader.token})")
+        await asyncio.sleep(SAMPLE_SECONDS)
+
+    for lease in leases:
+        if lease not in crashed:
+            await lease.stop()
+    return check_samples(samples)
+
+
+def replica_process(index: int, args, events):
+    """mongodb 모드의 레플리카 한 개 - 리더 여부가 바뀔 때마다 (벽시계, 이름, 토큰) 보고"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.repositories.mongo import MongoLeaseRepository
+
+    async def main():
+        client = AsyncIOMotorClient(MONGODB_URL)
+        lease = SchedulerLease(
+            MongoLeaseRepository(client[args.database]), holder_id=f"replica-{index}",
+            ttl_seconds=args.ttl, renew_seconds=args.renew, safety_margin_seconds=args.margin
+        )
+        await lease.start()
+        was_leader = False
+        while True:
+            if lease.is_leader != was_leader:
+                was_leader = lease.is_leader
+                events.put((time.time(), lease.holder_id, lease.token if was_leader else None, os.getpid()))
+            await asyncio.sleep(SAMPLE_SECONDS / 5)
+
+    asyncio.run(main())
+
+
+def run_mongodb(args):
+    from pymongo import MongoClient
+    MongoClient(MONGODB_URL).drop_database(args.database)
+
+    events = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=replica_process, args=(i, args, events), daemon=True)
+                 for i in range(args.replicas)]
+    for process in processes:
+        process.start()
+
+    leaders: Dict[str, Tuple[int, int]] = {}
+    samples, crashes = [], 0
+    started = time.time()
+    while time.time() - started < args.duration:
+        while not events.empty():
+            _, holder, token, pid = events.get()
+            if token is None:
+                leaders.pop(holder, None)
+            else:
+                leaders[holder] = (token, pid)
+        now = time.time() - started
+        samples.append((now, {holder: token for holder, (token, _) in leaders.items()}))
+
+        # 리더 프로세스를 SIGKILL로 종료 (반납 없이 사라짐)
+        if crashes < args.crashes and leaders and now > args.duration * (crashes + 1) / (args.crashes + 1):
+            holder, (token, pid) = next(iter(leaders.items()))
+            os.kill(pid, signal.SIGKILL)
+            leaders.pop(holder)
+            crashes += 1
+            print(f"[{now:6.2f}s] 리더 프로세스 종료: {holder} (토큰 {token}, pid {pid})")
+        time.sleep(SAMPLE_SECONDS)
+
+    for process in processes:
+        process.kill()
+    MongoClient(MONGODB_URL).drop_database(args.database)
+    return check_samples(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스케줄러 리더 리스 검증")
+    parser.add_argument("--backend", choices=["memory", "mongodb"], default="memory")
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=12.0, help="실행 시간 (초)")
+    parser.add_argument("--crashes", type=int, default=2, help="강제 종료할 리더 수")
+    parser.add_argument("--ttl", type=float, default=3.0)
+    parser.add_argument("--renew", type=float, default=1.0)
+    parser.add_argument("--margin", type=float, default=0.5)
+    parser.add_argument("--database", default="gazehome_bench_lease")
+    args = parser.parse_args()
+
+    if args.backend == "memory":
+        result = asyncio.run(run_memory(args))
+    else:
+        if not MONGODB_URL:
+            raise SystemExit("MONGODB_URL이 필요합니다")
+        result = run_mongodb(args)
+
+    print(f"\n백엔드={args.backend} 레플리카={args.replicas} TTL={args.ttl}s 연장={args.renew}s")
+    for key, value in result.items():
+        print(f"  {key:22s} {value}")
+    print(f"  {'리더 공백 상한 (TTL)':22s} {args.ttl}s")
+    print("\n✅ 동시 리더 없음" if result["overlapping_samples"] == 0 else "\n❌ 동시 리더 발생")
+
+
+if __name__ == "__main__":
+    main()
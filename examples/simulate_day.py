@@ -0,0 +1,340 @@
+"""
+GazeHome AI Services - 스케줄러 하루 시뮬레이션 (가상 시계)
+가상 시계로 N가구 x 24시간 스케줄러/추천 파이프라인을 몇 분 안에 재생하고
+시간대별 LLM 호출, 날씨 조회, MongoDB 연산, 하드웨어 전송 수를 출력 (용량 산정용)
+
+실행 방법:
+    PYTHONPATH=. python examples/simulate_day.py --households 10000 --hours 24 --cities 20
+
+구성:
+    - 저장소: 메모리 저장소 (저장소 메서드 호출 1회 = MongoDB 명령 1회로 집계,
+      쓰기 버퍼의 배치 효과는 반영하지 않으므로 상한값)
+    - LLM: 가상 지연 후 고정 규칙으로 추천을 만드는 가짜 Agent
+    - 날씨/기기 상태: 도시별 일교차 곡선 (같은 도시 가구는 날씨/예보 공유)과 가구별 하루 몇 차례 수동 조작
+    - 하드웨어: mock_servers.py의 하드웨어 서버는 사용자 입력을 기다리므로
+      같은 역할(수신 후 일부 사용자가 YES/NO 응답)을 하는 프로세스 내 대역 사용
+"""
+import os
+
+# 앱 모듈 임포트 전에 설정 (메모리 저장소, 리스 없음, 로그 최소화)
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("SCHEDULER_LEASE_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import app.services.recommendation_service as recommendation_module
+from app.core.config import SCHEDULER_WORKERS
+from app.core.clock import KST, VirtualClock, set_clock
+from app.models.device_management import POWER_OFF_ACTIONS
+from app.repositories.memory import MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.lifecycle_service import RecommendationLifecycleService
+from app.services.recommendation_service import RecommendationService
+from app.services.scheduler_service import SchedulerService
+from app.services.weather_fanout import DeviceProfile
+
+METRICS = ("llm_calls", "weather_fetches", "mongo_ops", "hardware_pushes", "user_responses", "device_controls")
+
+# 가짜 LLM이 고르는 추천 (기기, 액션 목록)
+PLANS = {
+    "hot": ("air_conditioner", ["aircon_on", "aircon_cool", "temp_24"], "에어컨 켤까요?"),
+    "cool": ("air_conditioner", ["aircon_off"], "에어컨 끌까요?"),
+    "humid": ("air_conditioner", ["aircon_on", "aircon_dry"], "제습 모드로 켤까요?"),
+    "air": ("air_purifier", ["turn_on", "wind_auto"], "공기청정기 켤까요?"),
+    "air_off": ("air_purifier", ["turn_off"], "공기청정기 끌까요?"),
+}
+
+
+class HourlyCounter:
+    """가상 시각 기준 시간대별 지표 집계"""
+
+    def __init__(self, clock: VirtualClock, start: float):
+        self.clock = clock
+        self.start = start
+        self.rows: Dict[int, Counter] = defaultdict(Counter)
+
+    def add(self, metric: str, amount: int = 1):
+        self.rows[int((self.clock.time() - self.start) // 3600)][metric] += amount
+
+
+class CountingRepository:
+    """저장소 프록시 - 비동기 메서드 호출마다 mongo_ops 집계"""
+
+    UNCOUNTED = {"flush", "close"}
+
+    def __init__(self, target, counter: HourlyCounter):
+        self._target = target
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in self.UNCOUNTED or not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def counted(*args, **kwargs):
+            self._counter.add("mongo_ops")
+            return await attr(*args, **kwargs)
+        return counted
+
+
+class City:
+    """도시 한 곳의 날씨 모델 (일교차 곡선 + 도시별 편차)"""
+
+    def __init__(self, index: int, seed: int):
+        self.name = f"city_{index:03d}"
+        rng = random.Random(seed * 7919 + index)
+        self.temperature_offset = rng.uniform(-3.0, 3.0)
+        self.humidity_offset = rng.uniform(-10.0, 10.0)
+
+    def weather(self, now: datetime) -> tuple:
+        hour = now.hour + now.minute / 60
+        temperature = 24 + 6 * math.sin(2 * math.pi * (hour - 9) / 24) + self.temperature_offset
+        humidity = 60 + 15 * math.sin(2 * math.pi * (hour - 3) / 24) + self.humidity_offset
+        return round(temperature, 1), round(humidity)
+
+    def forecast(self, timestamp: float, days: int = 2) -> List[tuple]:
+        """timestamp 이후 3시간 간격 예보 (epoch 초, 온도, 습도)"""
+        first = timestamp - timestamp % 10800 + 10800
+        return [(t, *self.weather(datetime.fromtimestamp(t, KST))) for t in (first + i * 10800 for i in range(days * 8))]
+
+
+class Household:
+    """가구 한 곳의 기기 상태 모델"""
+
+    DEVICES = {"air_conditioner": "ac", "air_purifier": "purifier"}
+
+    def __init__(self, index: int, city: City, start: float, seed: int):
+        self.user_id = f"household_{index:05d}"
+        self.city = city
+        self.rng = random.Random(seed * 100003 + index)
+        # 기기별 수동 조작 시각 (하루 2~4회, 조작할 때마다 켜짐/꺼짐 전환)
+        self.manual_toggles: Dict[str, List[float]] = {
+            device_id: sorted(start + self.rng.uniform(0, 86400) for _ in range(self.rng.randint(2, 4)))
+            for device_id in self.device_ids()
+        }
+        # device_id -> (시각, 켜짐 여부) - 추천 승인으로 제어된 마지막 상태
+        self.controlled: Dict[str, tuple] = {}
+
+    def device_ids(self) -> List[str]:
+        return [f"{self.user_id}_{suffix}" for suffix in self.DEVICES.values()]
+
+    def device_id(self, device_type: str) -> str:
+        return f"{self.user_id}_{self.DEVICES[device_type]}"
+
+    def device_profile(self, timestamp: float) -> DeviceProfile:
+        profile = {}
+        types = {self.device_id(device_type): device_type for device_type in self.DEVICES}
+        for device_id, toggles in self.manual_toggles.items():
+            flips = bisect_right(toggles, timestamp)
+            is_on = flips % 2 == 1
+            control = self.controlled.get(device_id)
+            if control and (flips == 0 or control[0] > toggles[flips - 1]):
+                is_on = control[1]
+            profile[device_id] = (types[device_id], f"{'on' if is_on else 'off'}:{is_on}")
+        return profile
+
+
+class FakeAgent:
+    """가짜 LLM Agent - 가상 지연 후 현재 날씨 구간에 맞는 추천 반환"""
+
+    def __init__(self, simulation: "SimulatedScheduler", user_id: str):
+        self.simulation = simulation
+        self.user_id = user_id
+
+    async def generate_recommendation(self, context: str) -> Dict:
+        simulation = self.simulation
+        simulation.counter.add("llm_calls")
+        await simulation.clock.sleep(simulation.llm_latency_seconds)
+
+        household = simulation.households[self.user_id]
+        temperature, humidity = household.city.weather(simulation.clock.now())
+        if temperature >= 27:
+            key = "hot"
+        elif humidity >= 70:
+            key = "humid"
+        elif temperature <= 21:
+            key = "cool"
+        else:
+            key = "air" if household.rng.random() < 0.5 else "air_off"
+        device_type, actions, title = PLANS[key]
+        return {
+            "title": title,
+            "contents": f"현재 {temperature}도, 습도 {humidity}%입니다.",
+            "device_control": {
+                "device_type": device_type,
+                "device_id": household.device_id(device_type),
+                "actions": [{"action": action, "order": i + 1} for i, action in enumerate(actions)]
+            }
+        }
+
+
+class FakeHardware:
+    """가짜 하드웨어 - 수신 후 일부 사용자가 잠시 뒤 YES/NO 응답"""
+
+    def __init__(self, simulation: "SimulatedScheduler", response_rate: float, accept_rate: float):
+        self.simulation = simulation
+        self.response_rate = response_rate
+        self.accept_rate = accept_rate
+        self.rng = random.Random(7)
+        self._tasks = set()
+
+    async def send_recommendation(
+        self, recommendation_id: str, title: str, contents: str, device_type: Optional[str] = None
+    ) -> Dict:
+        self.simulation.counter.add("hardware_pushes")
+        if self.rng.random() < self.response_rate:
+            task = asyncio.create_task(self._respond(recommendation_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return {"message": "추천 수신", "confirm": "PENDING"}
+
+    async def _respond(self, recommendation_id: str):
+        """사용자 응답 후 승인이면 실행 계획을 단계 간격대로 실행 (액션 페이싱)"""
+        simulation = self.simulation
+        await simulation.clock.sleep(self.rng.uniform(60, 1800))
+        answer = "YES" if self.rng.random() < self.accept_rate else "NO"
+        service = await recommendation_module.get_recommendation_service()
+        recommendation = await service.confirm_recommendation(recommendation_id, answer)
+        if recommendation is None:
+            return
+        simulation.counter.add("user_responses")
+        plan = recommendation.control_plan
+        if answer != "YES" or plan is None:
+            return
+        household = simulation.households[recommendation.user_id]
+        for step in plan.steps:
+            simulation.counter.add("device_controls")
+            household.controlled[plan.device_id] = (simulation.clock.time(), step.action not in POWER_OFF_ACTIONS)
+            if step.delay_after_seconds:
+                await simulation.clock.sleep(step.delay_after_seconds)
+
+
+class SimulatedScheduler(SchedulerService):
+    """가짜 신호/LLM/하드웨어를 쓰는 스케줄러"""
+
+    def __init__(self, clock: VirtualClock, households: Dict[str, Household], counter: HourlyCounter, args):
+        super().__init__(clock=clock)
+        self.households = households
+        self.cities = {h.city.name: h.city for h in households.values()}
+        self.counter = counter
+        self.llm_latency_seconds = args.llm_latency
+        self.hardware = FakeHardware(self, args.response_rate, args.accept_rate)
+        self.executor.worker_count = args.workers
+
+    async def _fetch_weather(self, location: str) -> Optional[Dict]:
+        self.counter.add("weather_fetches")
+        temperature, humidity = self.cities[location].weather(self.clock.now())
+        return {"temperature": temperature, "humidity": humidity}
+
+    async def _fetch_forecast(self, location: str) -> Optional[List[tuple]]:
+        self.counter.add("weather_fetches")
+        return self.cities[location].forecast(self.clock.time())
+
+    async def _collect_device_profile(self, user_id: str) -> Optional[DeviceProfile]:
+        return self.households[user_id].device_profile(self.clock.time())
+
+    def _create_agent(self, user_id: str):
+        return FakeAgent(self, user_id)
+
+    def _get_hardware_client(self):
+        return self.hardware
+
+
+def print_table(counter: HourlyCounter, hours: int, start: float):
+    header = f"{'시간(KST)':>10s} " + " ".join(f"{m:>16s}" for m in METRICS)
+    print(header)
+    print("-" * len(header))
+    totals = Counter()
+    for hour in range(hours):
+        row = counter.rows.get(hour, Counter())
+        totals.update(row)
+        label = datetime.fromtimestamp(start + hour * 3600, KST).strftime("%m-%d %H시")
+        print(f"{label:>10s} " + " ".join(f"{row[m]:16d}" for m in METRICS))
+    print("-" * len(header))
+    print(f"{'합계':>10s} " + " ".join(f"{totals[m]:16d}" for m in METRICS))
+    print(f"{'시간당 최대':>9s} " + " ".join(
+        f"{max((counter.rows.get(h, Counter())[m] for h in range(hours)), default=0):16d}" for m in METRICS
+    ))
+
+
+async def simulate(args):
+    day = datetime.strptime(args.date, "%Y-%m-%d") if args.date else datetime.now(KST).replace(tzinfo=None)
+    start = datetime(day.year, day.month, day.day, tzinfo=KST).timestamp()
+    clock = VirtualClock(start)
+    set_clock(clock)
+    counter = HourlyCounter(clock, start)
+
+    recommendation_module._recommendation_service = RecommendationService(
+        CountingRepository(MemoryRecommendationRepository(), counter),
+        CountingRepository(MemoryStatsRepository(), counter),
+        clock=clock
+    )
+    cities = [City(i, args.seed) for i in range(args.cities)]
+    households = {
+        h.user_id: h for h in (Household(i, cities[i % args.cities], start, args.seed) for i in range(args.households))
+    }
+    scheduler = SimulatedScheduler(clock, households, counter, args)
+    lifecycle = RecommendationLifecycleService(clock=clock)
+
+    for user_id in households:
+        scheduler.add_user(user_id, args.interval, location=households[user_id].city.name)
+    await scheduler.start(interval_minutes=args.interval)
+    await lifecycle.start()
+
+    wall_started = time.perf_counter()
+    for hour in range(args.hours):
+        await clock.run_until(start + (hour + 1) * 3600)
+        row = counter.rows.get(hour, Counter())
+        print(f"  {hour + 1:2d}/{args.hours}시간 완료 (실제 {time.perf_counter() - wall_started:6.1f}초, "
+              f"LLM {row['llm_calls']}, 전송 {row['hardware_pushes']})", flush=True)
+    wall_seconds = time.perf_counter() - wall_started
+
+    await scheduler.stop()
+    await lifecycle.stop()
+    service = await recommendation_module.get_recommendation_service()
+    await service.close()
+
+    print(f"\n가구 {args.households}곳 (도시 {args.cities}곳), {args.hours}시간, 간격 {args.interval}분, 워커 {args.workers}개, "
+          f"LLM 지연 {args.llm_latency}초 (실제 소요 {wall_seconds:.1f}초)\n")
+    print_table(counter, args.hours, start)
+
+    status = scheduler.get_status()
+    print(f"\n트리거: 실행 {status['triggers']['fired']}")
+    print(f"        건너뜀 {status['triggers']['skipped']}")
+    print(f"중복 방지: {service.get_dedup_stats()}")
+    print(f"날씨: 조회 {status['weather']['fetches']}, 캐시 {status['weather']['cache_hits']}, "
+          f"도시 단위 재계산 {status['weather']['fanout']}")
+    print(f"예보: 조회 {status['weather']['forecast']['fetches']}, 보간 {status['weather']['forecast']['interpolations']}, "
+          f"관측 {status['weather']['forecast']['observations']}")
+    print(f"실행기: 완료 {status['executor']['completed']}, 실패 {status['executor']['failed']}, "
+          f"건너뜀(중첩) {status['executor']['skipped']}, 늦은 회차 {status['late_skips']}")
+    if status["late_skips"]:
+        print("⚠️ 늦은 회차가 있으면 워커 수 x 3600 / LLM 지연이 시간당 필요 LLM 호출보다 적은 것 (--workers 조정)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스케줄러 하루 시뮬레이션 (가상 시계)")
+    parser.add_argument("--households", type=int, default=10000)
+    parser.add_argument("--cities", type=int, default=20, help="도시 수 (같은 도시 가구는 날씨 공유)")
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--interval", type=int, default=30, help="스케줄 간격 (분)")
+    parser.add_argument("--workers", type=int, default=SCHEDULER_WORKERS, help="스케줄러 워커 수 (동시 LLM 호출 상한)")
+    parser.add_argument("--llm-latency", type=float, default=3.0, help="가짜 LLM 응답 지연 (가상 초)")
+    parser.add_argument("--response-rate", type=float, default=0.6, help="하드웨어 추천에 응답하는 비율")
+    parser.add_argument("--accept-rate", type=float, default=0.5, help="응답 중 YES 비율")
+    parser.add_argument("--date", help="시뮬레이션 날짜 (YYYY-MM-DD, 기본: 오늘)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(simulate(args))
+
+
+if __name__ == "__main__":
+    main()
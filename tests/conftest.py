@@ -0,0 +1,8 @@
+"""
+테스트 공통 설정 (앱 모듈 임포트 전에 적용)
+"""
+
+import os
+
+# 테스트는 저장소를 직접 만들어 쓰므로 전역 서비스는 메모리 저장소로 지정 (MONGODB_URL 없이 실행)
+os.environ.setdefault("STORAGE_BACKEND", "memory")
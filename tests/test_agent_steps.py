@@ -0,0 +1,55 @@
+"""
+Agent 반복 기록 테스트 (도구 실패 분류, 중복으로 생략된 생성 기록)
+"""
+
+from uuid import uuid4
+
+import pytest
+
+from app.agents.step_recorder import AgentStepRecorder, ToolFailure
+from app.models.recommendations import DeviceAction, DeviceControl
+from app.repositories.memory import MemoryAgentStepRepository, MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.recommendation_service import RecommendationService
+
+
+def run_tool(recorder: AgentStepRecorder, output):
+    run_id = uuid4()
+    recorder.on_tool_start({"name": "get_device_state"}, "aircon_0", run_id=run_id)
+    recorder.on_tool_end(output, run_id=run_id)
+
+
+def test_tool_outcome_follows_failure_marker():
+    recorder = AgentStepRecorder()
+    recorder.on_chat_model_start({}, [], run_id=uuid4())
+    run_tool(recorder, ToolFailure("기기 상태 조회 실패: 503"))
+    # 정상 결과에 "실패"라는 글자가 들어 있어도 성공
+    run_tool(recorder, '{"current_state": "필터 교체 실패 알림"}')
+    assert [tool["outcome"] for tool in recorder.steps[0]["tools"]] == ["error", "ok"]
+
+
+def agent_steps(generation_id: str):
+    return {"generation_id": generation_id, "outcome": "ok", "iterations": 1, "total_tokens": 120, "steps": []}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_generation_is_recorded_on_existing_recommendation():
+    service = RecommendationService(
+        MemoryRecommendationRepository(), MemoryStatsRepository(), agent_step_repository=MemoryAgentStepRepository()
+    )
+    control = DeviceControl(
+        device_type="air_conditioner",
+        device_id="aircon_0",
+        actions=[DeviceAction(action="aircon_on", order=1)]
+    )
+    recommendation_id, _ = await service.create_or_supersede(
+        "추천", "내용", control, user_id="user_0", agent_steps=agent_steps("gen_1")
+    )
+    duplicate_id, result = await service.create_or_supersede(
+        "추천", "내용", control, user_id="user_0", agent_steps=agent_steps("gen_2")
+    )
+    assert (duplicate_id, result) == (recommendation_id, "duplicate")
+
+    recorded = await service.get_agent_steps(recommendation_id)
+    assert recorded["generation_id"] == "gen_1"
+    assert [(doc["generation_id"], doc["dedup"]) for doc in recorded["duplicates"]] == [("gen_2", "duplicate")]
+    await service.close()
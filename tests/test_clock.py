@@ -0,0 +1,53 @@
+"""
+가상 시계 테스트 (settle이 깨어난 태스크를 끝까지 진행시키고, 계속 도는 태스크가 있어도 멈춤)
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.clock import VirtualClock
+
+
+@pytest.mark.asyncio
+async def test_advance_runs_woken_tasks_through_callback_chains():
+    clock = VirtualClock(start=0.0)
+    event = asyncio.Event()
+    done = []
+
+    async def child(n):
+        await event.wait()
+        await asyncio.sleep(0)
+        return n
+
+    async def parent():
+        done.extend(await asyncio.gather(*(child(n) for n in range(3))))
+
+    async def trigger():
+        await clock.sleep(10)
+        event.set()
+
+    tasks = [asyncio.create_task(parent()), asyncio.create_task(trigger())]
+    await clock.advance(9)
+    assert done == []
+    # 가상 시계가 깨운 태스크 -> 이벤트 -> gather 완료 콜백까지 한 번에 진행
+    await clock.advance(1)
+    assert done == [0, 1, 2]
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_settle_is_bounded_with_busy_task():
+    clock = VirtualClock(start=0.0, max_settle_rounds=50)
+    spins = 0
+
+    async def busy():
+        nonlocal spins
+        while True:
+            spins += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(busy())
+    await clock.settle()
+    assert 0 < spins <= 51
+    task.cancel()
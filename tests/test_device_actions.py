@@ -0,0 +1,60 @@
+"""
+추천 실행 계획을 사용자 기기 레코드의 지원 액션으로 검증하는지 테스트 (메모리 저장소)
+"""
+
+import pytest
+
+from app.models.device_management import DeviceRegistrationRequest, DeviceType
+from app.models.recommendations import DeviceAction, DeviceControl
+from app.repositories.memory import MemoryDeviceRepository, MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.device_service import DeviceService
+from app.services.plan_compiler import ControlPlanError
+from app.services.recommendation_service import RecommendationService
+
+
+async def make_service() -> RecommendationService:
+    devices = DeviceService()
+    devices.repository = MemoryDeviceRepository()
+    await devices.register_device("user_0", DeviceRegistrationRequest(
+        device_id="aircon_0", device_type=DeviceType.AIR_CONDITIONER,
+        alias="거실 에어컨", supported_actions=["aircon_on", "aircon_off"]
+    ))
+    return RecommendationService(MemoryRecommendationRepository(), MemoryStatsRepository(), devices=devices)
+
+
+def control(device_id: str, action: str) -> DeviceControl:
+    return DeviceControl(
+        device_type="air_conditioner",
+        device_id=device_id,
+        actions=[DeviceAction(action=action, order=1)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_rejects_action_the_registered_device_does_not_support():
+    service = await make_service()
+    with pytest.raises(ControlPlanError):
+        await service.create_or_supersede("추천", "내용", control("aircon_0", "aircon_dry"), user_id="user_0")
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_registered_device_actions_are_used():
+    service = await make_service()
+    recommendation_id, result = await service.create_or_supersede(
+        "추천", "내용", control("aircon_0", "aircon_on"), user_id="user_0"
+    )
+    assert result == "created"
+    doc = await service.repository.find_by_id(recommendation_id)
+    assert [step["action"] for step in doc["control_plan"]["steps"]] == ["aircon_on"]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_unregistered_device_falls_back_to_device_type_actions():
+    service = await make_service()
+    _, result = await service.create_or_supersede(
+        "추천", "내용", control("aircon_9", "aircon_dry"), user_id="user_0"
+    )
+    assert result == "created"
+    await service.close()
@@ -0,0 +1,125 @@
+"""
+도시 단위 재계산 테스트 (실행기 중복 실행 방지와 동시 실행 한도 공유)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import app.services.recommendation_service as recommendation_module
+from app.agents.recommendation_agent import GatewayTool
+from app.models.device_management import DeviceRegistrationRequest, DeviceType
+from app.repositories.memory import MemoryDeviceRepository, MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.device_service import device_service
+from app.services.recommendation_service import RecommendationService
+from app.services.scheduler_service import SchedulerService
+
+LOCATION = "Seoul"
+
+
+class FakeAgent:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    async def generate_recommendation(self, context: str):
+        self.scheduler.active += 1
+        self.scheduler.peak = max(self.scheduler.peak, self.scheduler.active)
+        await asyncio.sleep(0.01)
+        self.scheduler.active -= 1
+        self.scheduler.generations += 1
+        return {
+            "title": "에어컨 켜기",
+            "contents": "덥습니다.",
+            "device_control": {
+                "device_type": "air_conditioner",
+                "device_id": "aircon_0",
+                "actions": [{"action": "aircon_on", "order": 1}]
+            }
+        }
+
+
+class FakeHardware:
+    async def send_recommendation(self, recommendation_id, title, contents, device_type=None):
+        return {"message": "추천 수신"}
+
+
+class FanOutScheduler(SchedulerService):
+    """가구마다 기기 상태가 달라 모두 단독 묶음이 되는 스케줄러"""
+
+    def __init__(self, workers: int):
+        super().__init__()
+        self.executor.worker_count = workers
+        self.forecast_horizon_seconds = 0
+        self.active = 0
+        self.peak = 0
+        self.generations = 0
+
+    async def _fetch_weather(self, location):
+        return {"temperature": 30.0, "humidity": 50.0}
+
+    async def _collect_device_profile(self, user_id):
+        return {f"aircon_{user_id}": ("air_conditioner", f"off:{user_id}")}
+
+    def _create_agent(self, user_id):
+        return FakeAgent(self)
+
+    def _get_hardware_client(self):
+        return FakeHardware()
+
+
+@pytest.fixture(autouse=True)
+def service(monkeypatch):
+    service = RecommendationService(MemoryRecommendationRepository(), MemoryStatsRepository())
+    monkeypatch.setattr(recommendation_module, "_recommendation_service", service)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_fan_out_skips_users_already_running():
+    scheduler = FanOutScheduler(workers=2)
+    for n in range(3):
+        scheduler.add_user(f"user_{n}", location=LOCATION)
+    # 힙 스케줄로 실행 중인 사용자
+    assert scheduler.executor.claim(["user_0"]) == ["user_0"]
+
+    summary = await scheduler.fan_out(LOCATION)
+    assert summary["overlapped"] == 1
+    assert summary["delivered"] == 2
+    # 실행이 끝난 사용자는 다시 실행할 수 있고, 실행 중인 사용자는 그대로 유지
+    assert scheduler.executor.claim(["user_0", "user_1", "user_2"]) == ["user_1", "user_2"]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_shares_worker_concurrency_limit():
+    scheduler = FanOutScheduler(workers=2)
+    for n in range(6):
+        scheduler.add_user(f"user_{n}", location=LOCATION)
+
+    # 워커 하나가 실행 중이면 도시 단위 재계산은 남은 한도만 사용
+    async with scheduler.executor.slots():
+        summary = await scheduler.fan_out(LOCATION)
+    assert summary["cohorts"] == 6
+    assert scheduler.generations == 6
+    assert scheduler.peak == 1
+
+
+@pytest.mark.asyncio
+async def test_device_profile_is_per_user(monkeypatch):
+    async def get_device_state(self, device_id):
+        return json.dumps({"device_id": device_id, "current_state": "POWER_OFF", "is_running": False})
+
+    monkeypatch.setattr(GatewayTool, "get_device_state", get_device_state)
+    monkeypatch.setattr(device_service, "repository", MemoryDeviceRepository())
+    await device_service.register_device("user_0", DeviceRegistrationRequest(
+        device_id="aircon_0", device_type=DeviceType.AIR_CONDITIONER, alias="거실 에어컨", supported_actions=["aircon_on"]
+    ))
+    await device_service.register_device("user_1", DeviceRegistrationRequest(
+        device_id="purifier_1", device_type=DeviceType.AIR_PURIFIER, alias="안방 공기청정기", supported_actions=["purifier_on"]
+    ))
+
+    scheduler = SchedulerService()
+    assert await scheduler._collect_device_profile("user_0") == {"aircon_0": ("air_conditioner", "POWER_OFF:False")}
+    assert await scheduler._collect_device_profile("user_1") == {"purifier_1": ("air_purifier", "POWER_OFF:False")}
+    # 등록된 기기가 없으면 Gateway 계정 전체 목록을 쓰지 않음 (단독 실행)
+    assert await scheduler._collect_device_profile("user_2") is None
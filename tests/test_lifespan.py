@@ -0,0 +1,53 @@
+"""
+애플리케이션 생명주기 테스트 (시작 시 저장소 설정 확인, 종료 시 스케줄러 상태 저장 및 리스 반납)
+"""
+
+import pytest
+
+import app.core.config as config_module
+import app.main as main_module
+import app.services.recommendation_service as recommendation_module
+import app.services.scheduler_service as scheduler_module
+from app.repositories.memory import (
+    MemoryLeaseRepository, MemoryRecommendationRepository, MemoryScheduleStateRepository, MemoryStatsRepository
+)
+from app.services.recommendation_service import RecommendationService
+from app.services.scheduler_lease import SchedulerLease
+from app.services.scheduler_service import SchedulerService
+
+
+@pytest.mark.asyncio
+async def test_shutdown_persists_state_and_releases_lease(monkeypatch):
+    leases = MemoryLeaseRepository()
+    states = MemoryScheduleStateRepository()
+    scheduler = SchedulerService()
+    scheduler.lease = SchedulerLease(leases, holder_id="first")
+    scheduler.state_repository = states
+    monkeypatch.setattr(scheduler_module, "scheduler_service", scheduler)
+    monkeypatch.setattr(
+        recommendation_module, "_recommendation_service",
+        RecommendationService(MemoryRecommendationRepository(), MemoryStatsRepository())
+    )
+    monkeypatch.setattr(main_module, "SCHEDULER_AUTO_START", True)
+    monkeypatch.setattr(main_module, "SCHEDULER_USER_ID", "user_0,user_1")
+
+    async with main_module.lifespan(main_module.app):
+        assert scheduler.is_running
+        assert scheduler.lease.is_leader
+
+    assert not scheduler.is_running
+    # 종료 직전 상태가 저장되어 재시작 시 복원됨
+    assert sorted(state["_id"] for state in await states.load_all()) == ["user_0", "user_1"]
+    # 리스를 반납해 대기 중인 인스턴스가 TTL을 기다리지 않고 바로 획득
+    assert not scheduler.lease.is_leader
+    assert await SchedulerLease(leases, holder_id="second").renew_once()
+
+
+@pytest.mark.asyncio
+async def test_startup_fails_without_mongodb_url(monkeypatch):
+    monkeypatch.setattr(config_module, "STORAGE_BACKEND", "mongodb")
+    monkeypatch.setattr(config_module, "MONGODB_URL", None)
+    # 설정 모듈 임포트는 그대로 성공하고, 애플리케이션 시작에서 실패
+    with pytest.raises(RuntimeError):
+        async with main_module.lifespan(main_module.app):
+            pass
@@ -0,0 +1,41 @@
+"""
+로깅 파이프라인 테스트 (큐가 가득 찼을 때의 처리, 기본 건수 제한)
+"""
+
+import io
+import json
+import logging
+
+from app.utils.logger import LoggingPipeline, RateLimitFilter
+
+
+def attach(pipeline: LoggingPipeline, name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(pipeline.handler)
+    return logger
+
+
+def test_full_queue_writes_warnings_to_overflow_stream():
+    overflow = io.StringIO()
+    # 리스너를 시작하지 않아 큐가 비워지지 않음
+    pipeline = LoggingPipeline(stream=io.StringIO(), queue_size=1, overflow_stream=overflow)
+    logger = attach(pipeline, "tests.logging.full_queue")
+
+    logger.info("큐에 들어감")
+    logger.info("버려짐")
+    logger.error("큐가 가득 차도 남김")
+
+    assert pipeline.queue.qsize() == 1
+    lines = [json.loads(line) for line in overflow.getvalue().splitlines()]
+    assert [(line["level"], line["message"]) for line in lines] == [("ERROR", "큐가 가득 차도 남김")]
+
+
+def test_rate_limit_is_off_by_default():
+    pipeline = LoggingPipeline(stream=io.StringIO())
+    assert not any(isinstance(f, RateLimitFilter) for f in pipeline.handler.filters)
+    logger = attach(pipeline, "tests.logging.unlimited")
+    for i in range(100):
+        logger.info("같은 위치 반복 %d", i)
+    assert pipeline.queue.qsize() == 100
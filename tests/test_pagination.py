@@ -0,0 +1,29 @@
+"""
+상태별 추천 목록 페이지네이션 테스트 (커서, deprecated skip 호환)
+"""
+
+import pytest
+
+from app.core.clock import VirtualClock
+from app.models.recommendations import RecommendationStatus
+from app.repositories.memory import MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.recommendation_service import RecommendationService
+
+
+@pytest.mark.asyncio
+async def test_skip_still_pages_with_deprecation_warning():
+    clock = VirtualClock(start=1_800_000_000.0)
+    service = RecommendationService(MemoryRecommendationRepository(), MemoryStatsRepository(), clock=clock)
+    ids = []
+    for n in range(5):
+        ids.append(await service.create_recommendation("추천", f"내용 {n}", user_id=f"user_{n}"))
+        await clock.advance(1)
+    newest_first = ids[::-1]
+
+    first = await service.get_recommendations_by_status(RecommendationStatus.PENDING, 2)
+    assert [r.recommendation_id for r in first] == newest_first[:2]
+    with pytest.warns(DeprecationWarning, match="cursor") as record:
+        second = await service.get_recommendations_by_status(RecommendationStatus.PENDING, 2, 2)
+    assert [r.recommendation_id for r in second] == newest_first[2:4]
+    assert record[0].filename == __file__
+    await service.close()
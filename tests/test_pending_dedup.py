@@ -0,0 +1,78 @@
+"""
+대기 중인 추천 중복 방지 테스트 (생성 전 건너뛰기, 다른 인스턴스에서 처리된 추천 확인)
+"""
+
+from datetime import datetime
+
+import pytest
+
+import app.services.recommendation_service as recommendation_module
+from app.models.recommendations import DeviceAction, DeviceControl
+from app.repositories.memory import MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.recommendation_service import RecommendationService
+from app.services.scheduler_service import SchedulerService
+from app.services.trigger_engine import TriggerSignals
+
+NOW = datetime(2026, 7, 15, 14, 0)
+
+
+def control(action: str = "aircon_on") -> DeviceControl:
+    return DeviceControl(
+        device_type="air_conditioner",
+        device_id="aircon_0",
+        actions=[DeviceAction(action=action, order=1)]
+    )
+
+
+def signals(temperature: float = 30.0, state: str = "off") -> TriggerSignals:
+    return TriggerSignals(NOW, temperature, 50.0, {"aircon_0": state})
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    """같은 저장소를 쓰는 두 인스턴스 (첫 번째가 전역 서비스)"""
+    repository = MemoryRecommendationRepository()
+    first = RecommendationService(repository, MemoryStatsRepository())
+    second = RecommendationService(repository, MemoryStatsRepository())
+    monkeypatch.setattr(recommendation_module, "_recommendation_service", first)
+    return first, second
+
+
+@pytest.mark.asyncio
+async def test_duplicate_requires_pending_in_repository(replicas):
+    first, second = replicas
+    recommendation_id, _ = await first.create_or_supersede("추천", "내용", control(), user_id="user_0")
+    assert (await first.create_or_supersede("추천", "내용", control(), user_id="user_0"))[1] == "duplicate"
+
+    # 다른 인스턴스에서 확인 처리 - 첫 번째 인스턴스의 로컬 인덱스에는 남아 있음
+    assert await second.confirm_recommendation(recommendation_id, "YES") is not None
+    created_id, result = await first.create_or_supersede("추천", "내용", control(), user_id="user_0")
+    assert result == "created"
+    assert created_id != recommendation_id
+
+
+@pytest.mark.asyncio
+async def test_material_trigger_skipped_when_plan_inputs_unchanged(replicas):
+    first, _ = replicas
+    scheduler = SchedulerService()
+    inputs = scheduler.trigger_engine.plan_inputs(signals())
+    await first.create_or_supersede("추천", "내용", control(), user_id="user_0", plan_inputs=inputs)
+
+    assert await scheduler._pending_suppressed("user_0", "forecast", signals())
+    assert await scheduler._pending_suppressed("user_0", "device_state", signals(temperature=30.5))
+    assert not await scheduler._pending_suppressed("user_0", "temperature", signals(temperature=34.0))
+    assert not await scheduler._pending_suppressed("user_0", "device_state", signals(state="on"))
+    assert first.dedup["skipped_before_generation"] == 2
+
+
+@pytest.mark.asyncio
+async def test_not_skipped_when_pending_was_handled_elsewhere(replicas):
+    first, second = replicas
+    scheduler = SchedulerService()
+    inputs = scheduler.trigger_engine.plan_inputs(signals())
+    recommendation_id, _ = await first.create_or_supersede("추천", "내용", control(), user_id="user_0", plan_inputs=inputs)
+    assert await scheduler._pending_suppressed("user_0", "time_of_day", signals())
+
+    assert await second.confirm_recommendation(recommendation_id, "NO") is not None
+    assert not await scheduler._pending_suppressed("user_0", "time_of_day", signals())
+    assert not await scheduler._pending_suppressed("user_0", "forecast", signals())
@@ -0,0 +1,47 @@
+"""
+추천 캐시 테스트 (조회 결과 복사본 반환, 주입된 시계 기준 만료)
+"""
+
+import pytest
+
+from app.core.clock import VirtualClock
+from app.repositories.memory import MemoryRecommendationRepository, MemoryStatsRepository
+from app.services.recommendation_cache import RecommendationCache
+from app.services.recommendation_service import RecommendationService
+
+
+def test_get_returns_copy():
+    cache = RecommendationCache(clock=VirtualClock(start=0.0))
+    cache.put({"recommendation_id": "rec_1", "status": "pending"})
+
+    doc = cache.get("rec_1")
+    doc["status"] = "confirmed"
+    assert cache.get("rec_1")["status"] == "pending"
+    # write-through 갱신은 그대로 반영
+    cache.update("rec_1", {"status": "rejected"})
+    assert cache.get("rec_1")["status"] == "rejected"
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_on_injected_clock():
+    clock = VirtualClock(start=0.0)
+    cache = RecommendationCache(ttl_seconds=60, clock=clock)
+    cache.put({"recommendation_id": "rec_1", "status": "pending"})
+
+    await clock.advance(60)
+    assert cache.get("rec_1") is not None
+    await clock.advance(1)
+    assert cache.get("rec_1") is None
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_confirm_on_cache_hit_returns_updated_record():
+    service = RecommendationService(MemoryRecommendationRepository(), MemoryStatsRepository())
+    recommendation_id = await service.create_recommendation("추천", "내용", user_id="user_0")
+
+    confirmed = await service.confirm_recommendation(recommendation_id, "YES", lean=False)
+    assert confirmed.status == "confirmed"
+    assert confirmed.confirmed_at is not None
+    assert (await service.get_recommendation_by_id(recommendation_id, lean=False)).status == "confirmed"
+    await service.close()
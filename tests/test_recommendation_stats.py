@@ -0,0 +1,207 @@
+"""
+추천 통계 증분/재계산 테스트 (쓰기 버퍼를 쓰는 MongoDB 저장소, mongomock-motor)
+"""
+
+import asyncio
+import time
+from collections import Counter
+from datetime import timedelta, timezone
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.clock import VirtualClock
+from app.models.recommendations import DeviceAction, DeviceControl, RecommendationStatus
+from app.repositories.mongo import MongoRecommendationRepository, MongoStatsRepository
+from app.services.recommendation_service import RecommendationService
+from app.services.recommendation_stats import counter_keys
+
+
+class CountingRepository(MongoRecommendationRepository):
+    """
+    count_counters를 파이썬으로 계산하는 저장소 (mongomock은 $dateToString timezone 미지원)
+
+    during_count가 있으면 추천 컬렉션을 읽은 뒤, 아카이브를 읽기 전에 실행한다 (집계 중 동시 쓰기 재현).
+    """
+
+    during_count = None
+
+    async def count_counters(self):
+        counts = Counter()
+        async for doc in self.collection.find({}):
+            counts.update(counter_keys(doc))
+        if self.during_count is not None:
+            await self.during_count()
+        async for doc in self.archive_collection.find({}):
+            counts.update(counter_keys(doc))
+        return dict(counts)
+
+
+def make_service(linger_ms: int = 1000, clock=None) -> RecommendationService:
+    db = AsyncMongoMockClient()["gazehome"]
+    repository = CountingRepository(db, clock=clock)
+    repository.write_buffer.max_linger_ms = linger_ms
+    service = RecommendationService(repository, MongoStatsRepository(db), clock=clock)
+    service.stats.max_linger_ms = linger_ms
+    return service
+
+
+def control(device_id: str) -> DeviceControl:
+    return DeviceControl(
+        device_type="air_conditioner",
+        device_id=device_id,
+        actions=[DeviceAction(action="aircon_on", order=1)]
+    )
+
+
+async def create(service: RecommendationService, n: int, **kwargs) -> str:
+    return await service.create_recommendation("추천", "내용", control(f"device_{n}"), user_id=f"user_{n}", **kwargs)
+
+
+async def actual_counts(service: RecommendationService) -> dict:
+    await service.repository.flush()
+    await service.stats.flush()
+    return await service.repository.count_counters()
+
+
+async def stored_counts(service: RecommendationService) -> dict:
+    counts = {}
+    async for row in service.stats.repository.collection.find({}):
+        if row["count"]:
+            counts[row["_id"]] = row["count"]
+    return counts
+
+
+@pytest.mark.asyncio
+async def test_reconcile_corrects_drift():
+    service = make_service()
+    for n in range(3):
+        await create(service, n)
+    await service.stats.flush()
+    # 드리프트 (예: 반영 전 프로세스 종료로 사라진 증분)
+    await service.stats.repository.increment({"total:all": -2, "status:pending": 5})
+
+    await service.stats.reconcile(service.repository)
+    assert await stored_counts(service) == await actual_counts(service)
+    assert await service.stats.get_count("total", "all") == 3
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_counts_inserts_still_in_write_buffer():
+    service = make_service()
+    await create(service, 0)
+    await service.stats.flush()
+    await create(service, 1)
+    # 증분은 반영, 문서는 아직 쓰기 버퍼에 있음
+    assert service.repository.write_buffer.pending_count == 2
+
+    await service.stats.reconcile(service.repository)
+    await service.stats.flush()
+    assert (await stored_counts(service))["total:all"] == 2
+    assert await stored_counts(service) == await actual_counts(service)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_does_not_double_count_creates_during_aggregation():
+    service = make_service()
+    for n in range(2):
+        await create(service, n)
+
+    async def concurrent_create():
+        await create(service, 99)
+
+    service.repository.during_count = concurrent_create
+    await service.stats.reconcile(service.repository)
+    service.repository.during_count = None
+
+    await service.stats.flush()
+    assert (await stored_counts(service))["total:all"] == 3
+    assert await stored_counts(service) == await actual_counts(service)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_keeps_transition_made_during_aggregation():
+    service = make_service()
+    first = await create(service, 0)
+    await create(service, 1)
+    await service.repository.flush()
+    await service.stats.flush()
+    await service.stats.repository.increment({"total:all": 4})
+
+    async def concurrent_confirm():
+        assert await service.confirm_recommendation(first, "YES") is not None
+
+    service.repository.during_count = concurrent_confirm
+    await service.stats.reconcile(service.repository)
+    service.repository.during_count = None
+
+    await service.stats.flush()
+    counts = await stored_counts(service)
+    # 드리프트는 보정하고, 집계 후 반영된 상태 전환 증분은 그대로 더함
+    assert counts["total:all"] == 2
+    assert counts["status:pending"] == 1
+    assert counts["status:confirmed"] == 1
+    assert counts == await actual_counts(service)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_archive_keeps_totals():
+    clock = VirtualClock(start=time.time() - 48 * 3600)
+    service = make_service(clock=clock)
+    first = await create(service, 0)
+    await create(service, 1)
+    await service.confirm_recommendation(first, "YES")
+    await service.stats.flush()
+    await clock.advance(48 * 3600)
+
+    assert await service.archive_recommendations(older_than_hours=24) == 1
+    # 보관 기간(TTL)은 주입된 시계 기준
+    archived = await service.repository.archive_collection.find_one({"recommendation_id": first})
+    # (BSON 날짜는 밀리초 단위)
+    assert abs(archived["archived_at"].replace(tzinfo=timezone.utc) - clock.now()) < timedelta(milliseconds=1)
+    await service.stats.flush()
+    assert await service.stats.get_count("total", "all") == 2
+    assert (await service.stats.get_counts("status"))[RecommendationStatus.CONFIRMED.value] == 1
+
+    await service.stats.reconcile(service.repository)
+    assert await service.stats.get_count("total", "all") == 2
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_deferred_insert_is_removed_from_counts():
+    service = make_service(linger_ms=1)
+    await service.repository.collection.create_index("recommendation_id", unique=True)
+    doc_id = await create(service, 0)
+    await service.repository.collection.insert_one({"recommendation_id": doc_id, "status": "pending"})
+
+    await service.repository.flush()
+    await asyncio.sleep(0)
+    await service.stats.flush()
+    assert await service.stats.get_count("total", "all") == 0
+    assert await service.stats.get_count("user", "user_0") == 0
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_close_keeps_deltas_of_in_flight_flush():
+    service = make_service(linger_ms=1)
+    gate = asyncio.Event()
+    increment = service.stats.repository.increment
+
+    async def slow_increment(deltas):
+        await gate.wait()
+        await increment(deltas)
+
+    service.stats.repository.increment = slow_increment
+    await create(service, 0)
+    await asyncio.sleep(0.01)
+    closing = asyncio.create_task(service.close())
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.wait_for(closing, 1)
+    assert (await stored_counts(service))["total:all"] == 1
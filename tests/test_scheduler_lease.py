@@ -0,0 +1,272 @@
+"""
+스케줄러 리더 리스 테스트 (리더 교체, 임기 만료 전 자진 해제, 펜싱 토큰으로 부작용 차단, 저장소의 토큰 확인,
+만료/아카이브 작업의 리스)
+"""
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import app.services.recommendation_service as recommendation_module
+from app.core.clock import VirtualClock
+from app.repositories.memory import MemoryLeaseRepository, MemoryRecommendationRepository, MemoryStatsRepository
+from app.repositories.base import StaleFencingTokenError
+from app.repositories.mongo import MongoLeaseRepository, MongoRecommendationRepository
+from app.services.lifecycle_service import RecommendationLifecycleService
+from app.services.recommendation_service import RecommendationService
+from app.services.scheduler_lease import SchedulerLease
+from app.services.scheduler_service import SchedulerService
+
+TTL = 30.0
+RENEW = 10.0
+MARGIN = 2.0
+
+
+@pytest.fixture(params=["memory", "mongodb"])
+def repository(request):
+    if request.param == "memory":
+        return MemoryLeaseRepository()
+    return MongoLeaseRepository(AsyncMongoMockClient()["gazehome"])
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock(start=1_800_000_000.0)
+
+
+def make_lease(repository, clock, holder: str, name: str = "scheduler") -> SchedulerLease:
+    return SchedulerLease(
+        repository, name=name, holder_id=holder, ttl_seconds=TTL, renew_seconds=RENEW,
+        safety_margin_seconds=MARGIN, clock=clock
+    )
+
+
+@pytest.mark.asyncio
+async def test_standby_takes_over_after_leader_stops_renewing(repository, clock):
+    first = make_lease(repository, clock, "first")
+    second = make_lease(repository, clock, "second")
+    assert await first.renew_once()
+    assert not await second.renew_once()
+    assert first.holds(1)
+
+    # 첫 번째 인스턴스가 멈춤 (연장 없음) - TTL이 지나야 다른 인스턴스가 획득
+    await clock.advance(TTL - 1)
+    assert not await second.renew_once()
+    await clock.advance(1)
+    assert await second.renew_once()
+    assert second.holds(2)
+
+    # 되살아난 이전 리더는 연장에 실패하고 이전 토큰은 더 이상 유효하지 않음
+    assert not await first.renew_once()
+    assert not first.is_leader
+    assert not first.holds(1)
+    assert first.losses == 1
+
+
+@pytest.mark.asyncio
+async def test_release_hands_over_without_waiting_for_ttl(repository, clock):
+    first = make_lease(repository, clock, "first")
+    second = make_lease(repository, clock, "second")
+    assert await first.renew_once()
+    await first.stop()
+    assert not first.is_leader
+    assert await second.renew_once()
+    assert second.token == 2
+
+
+class FailingRenewRepository(MemoryLeaseRepository):
+    """연장 요청이 저장소 오류로 실패하는 리스 저장소"""
+
+    async def renew(self, name, holder, token, ttl_seconds, now):
+        raise ConnectionError("저장소 연결 실패")
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_before_lease_expires(clock):
+    repository = FailingRenewRepository()
+    first = make_lease(repository, clock, "first")
+    second = make_lease(repository, clock, "second")
+    assert await first.renew_once()
+
+    await clock.advance(RENEW)
+    assert await first.renew_once()  # 연장 실패해도 임기 안에서는 보유
+    await clock.advance(TTL - MARGIN - RENEW)
+    assert not first.is_leader
+    # 스스로 물러난 시점에는 아직 아무도 획득할 수 없음 (동시 리더 없음)
+    assert not await second.renew_once()
+    await clock.advance(MARGIN)
+    assert await second.renew_once()
+
+
+class FakeAgent:
+    def __init__(self, on_generate=None):
+        self.calls = 0
+        self.on_generate = on_generate
+
+    async def generate_recommendation(self, context: str):
+        self.calls += 1
+        if self.on_generate is not None:
+            await self.on_generate()
+        return {
+            "title": "에어컨 켜기",
+            "contents": "덥습니다.",
+            "device_control": {
+                "device_type": "air_conditioner",
+                "device_id": "aircon_0",
+                "actions": [{"action": "aircon_on", "order": 1}]
+            }
+        }
+
+
+class FakeHardware:
+    def __init__(self):
+        self.sent = []
+
+    async def send_recommendation(self, recommendation_id, title, contents, device_type=None):
+        self.sent.append(recommendation_id)
+        return {"message": "추천 수신"}
+
+
+class LeasedScheduler(SchedulerService):
+    """가짜 날씨/기기/Agent/하드웨어를 쓰는 스케줄러"""
+
+    def __init__(self, clock, lease, agent):
+        super().__init__(clock=clock)
+        self.lease = lease
+        self.agent = agent
+        self.hardware = FakeHardware()
+        self.forecast_horizon_seconds = 0
+
+    async def _fetch_weather(self, location):
+        return {"temperature": 30.0, "humidity": 50.0}
+
+    async def _collect_device_profile(self, user_id):
+        return {"aircon_0": ("air_conditioner", "off")}
+
+    def _create_agent(self, user_id):
+        return self.agent
+
+    def _get_hardware_client(self):
+        return self.hardware
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = RecommendationService(MemoryRecommendationRepository(), MemoryStatsRepository())
+    monkeypatch.setattr(recommendation_module, "_recommendation_service", service)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_current_fencing_token_delivers(clock, service):
+    lease = make_lease(MemoryLeaseRepository(), clock, "first")
+    assert await lease.renew_once()
+
+    scheduler = LeasedScheduler(clock, lease, FakeAgent())
+    result = await scheduler.run_once("user_0", force=True, fencing_token=lease.token)
+    assert scheduler.hardware.sent == [result["recommendation_id"]]
+    assert scheduler.fenced_runs == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_fencing_token_skips_generation(clock, service):
+    repository = MemoryLeaseRepository()
+    lease = make_lease(repository, clock, "first")
+    assert await lease.renew_once()
+    stale_token = lease.token
+    await clock.advance(TTL)
+    assert await make_lease(repository, clock, "second").renew_once()
+
+    scheduler = LeasedScheduler(clock, lease, FakeAgent())
+    result = await scheduler.run_once("user_0", force=True, fencing_token=stale_token)
+    assert result["trigger"] == "lease_lost"
+    assert scheduler.agent.calls == 0
+    assert scheduler.fenced_runs == 1
+
+
+@pytest.mark.asyncio
+async def test_lease_lost_during_generation_skips_save_and_send(clock, service):
+    repository = MemoryLeaseRepository()
+    lease = make_lease(repository, clock, "first")
+    second = make_lease(repository, clock, "second")
+    assert await lease.renew_once()
+
+    async def take_over():
+        # LLM 호출 중 임기가 끝나고 다른 인스턴스가 리더가 됨
+        await clock.advance(TTL)
+        assert await second.renew_once()
+
+    scheduler = LeasedScheduler(clock, lease, FakeAgent(on_generate=take_over))
+    result = await scheduler.run_once("user_0", force=True, fencing_token=lease.token)
+    assert scheduler.agent.calls == 1
+    assert "recommendation_id" not in result
+    assert scheduler.hardware.sent == []
+    assert await service.get_outstanding("user_0") == {}
+
+
+@pytest.mark.asyncio
+async def test_storage_rejects_write_when_token_goes_stale_after_check(repository, clock, service):
+    lease = make_lease(repository, clock, "first")
+    second = make_lease(repository, clock, "second")
+    assert await lease.renew_once()
+
+    async def take_over():
+        # 이전 리더는 멈춰 있어 아직 임기 중이라고 믿지만 저장소에서는 다른 인스턴스가 리더가 됨
+        await repository.release(lease.name, lease.holder_id, lease.token)
+        assert await second.renew_once()
+
+    scheduler = LeasedScheduler(clock, lease, FakeAgent(on_generate=take_over))
+    assert lease.is_leader
+    result = await scheduler.run_once("user_0", force=True, fencing_token=lease.token)
+    assert "recommendation_id" not in result
+    assert scheduler.hardware.sent == []
+    assert scheduler.fenced_runs == 1
+    assert await service.get_outstanding("user_0") == {}
+
+
+@pytest.mark.asyncio
+async def test_mongo_recommendation_write_checks_lease_document(clock):
+    db = AsyncMongoMockClient()["gazehome"]
+    leases = MongoLeaseRepository(db)
+    lease = make_lease(leases, clock, "first")
+    assert await lease.renew_once()
+    fence = lease.fence(lease.token)
+    recommendations = MongoRecommendationRepository(db)
+    await recommendations.insert({"recommendation_id": "rec_1", "status": "pending"}, fence=fence)
+
+    await clock.advance(TTL)
+    assert await make_lease(leases, clock, "second").renew_once()
+    with pytest.raises(StaleFencingTokenError):
+        await recommendations.insert({"recommendation_id": "rec_2", "status": "pending"}, fence=fence)
+    with pytest.raises(StaleFencingTokenError):
+        await recommendations.set_fields("rec_1", {"hardware_sent_at": clock.utcnow()}, fence=fence)
+    assert await recommendations.find_by_id("rec_2") is None
+    assert "hardware_sent_at" not in await recommendations.find_by_id("rec_1")
+    await recommendations.close()
+
+
+@pytest.mark.asyncio
+async def test_lifecycle_sweep_runs_only_on_lease_holder(repository, clock):
+    sweeps = []
+
+    def make_lifecycle(holder: str) -> RecommendationLifecycleService:
+        lifecycle = RecommendationLifecycleService(clock=clock)
+        lifecycle.lease = make_lease(repository, clock, holder, name="lifecycle")
+
+        async def sweep_once():
+            sweeps.append(holder)
+
+        lifecycle.sweep_once = sweep_once
+        return lifecycle
+
+    first, second = make_lifecycle("first"), make_lifecycle("second")
+    await first.start(interval_minutes=1)
+    await second.start(interval_minutes=1)
+    await clock.advance(150)
+    assert sweeps == ["first"] * 3
+    assert second.skipped_sweeps == 3
+
+    # 리스를 반납하면 다른 인스턴스가 이어받아 실행
+    await first.stop()
+    await clock.advance(RENEW + 60)
+    assert sweeps[3:] == ["second"]
+    await second.stop()
@@ -0,0 +1,164 @@
+"""
+WriteBehindBuffer 플러시/종료 경로 테스트 (버퍼를 거치지 않는 durable 갱신 결과 포함)
+"""
+
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import BulkWriteError
+
+from app.repositories.mongo import MongoRecommendationRepository, MongoStatsRepository
+from app.services.recommendation_service import RecommendationService
+from app.services.write_behind import WriteBehindBuffer
+
+
+class GatedCollection:
+    """bulk_write가 gate가 열릴 때까지 멈추는 가짜 컬렉션 (전송 중 상태 재현용)"""
+
+    name = "gated"
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = asyncio.Event()
+        self.batches = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.started.set()
+        await self.gate.wait()
+        self.batches.append([op._doc for op in ops])
+
+
+class FailingCollection:
+    """지정한 예외로 bulk_write가 실패하는 가짜 컬렉션"""
+
+    name = "failing"
+
+    def __init__(self, error):
+        self.error = error
+
+    async def bulk_write(self, ops, ordered=True):
+        raise self.error
+
+
+def written(collection):
+    return [doc["recommendation_id"] for batch in collection.batches for doc in batch]
+
+
+@pytest.mark.asyncio
+async def test_linger_flushes_buffered_inserts():
+    collection = GatedCollection()
+    collection.gate.set()
+    buffer = WriteBehindBuffer(collection, max_batch_size=10, max_linger_ms=10)
+
+    for i in range(3):
+        await buffer.insert({"recommendation_id": f"rec_{i}"})
+    assert buffer.pending_count == 3
+    assert buffer.is_pending("rec_0")
+
+    await asyncio.sleep(0.05)
+    assert written(collection) == ["rec_0", "rec_1", "rec_2"]
+    assert buffer.pending_count == 0
+    assert not buffer.is_pending("rec_0")
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_in_flight_linger_flush():
+    collection = GatedCollection()
+    buffer = WriteBehindBuffer(collection, max_batch_size=10, max_linger_ms=1)
+
+    await buffer.insert({"recommendation_id": "rec_0"})
+    durable = asyncio.create_task(buffer.insert({"recommendation_id": "rec_1"}, durable=True))
+    await collection.started.wait()
+    # linger 플러시가 배치를 큐에서 꺼내 전송 중인 상태에서 종료
+    assert buffer.pending_count == 0
+    closing = asyncio.create_task(buffer.close())
+    await asyncio.sleep(0.01)
+    assert not closing.done()
+
+    collection.gate.set()
+    await asyncio.wait_for(closing, 1)
+    await asyncio.wait_for(durable, 1)
+    assert sorted(written(collection)) == ["rec_0", "rec_1"]
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_size_triggered_flush():
+    collection = GatedCollection()
+    buffer = WriteBehindBuffer(collection, max_batch_size=2, max_linger_ms=1000)
+
+    for i in range(3):
+        await buffer.insert({"recommendation_id": f"rec_{i}"})
+    await collection.started.wait()
+    closing = asyncio.create_task(buffer.close())
+    collection.gate.set()
+    await asyncio.wait_for(closing, 1)
+    assert sorted(written(collection)) == ["rec_0", "rec_1", "rec_2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_write_requeues_batch():
+    collection = GatedCollection()
+    buffer = WriteBehindBuffer(collection, max_batch_size=10, max_linger_ms=1000)
+
+    await buffer.insert({"recommendation_id": "rec_0"})
+    flushing = asyncio.create_task(buffer.flush())
+    await collection.started.wait()
+    flushing.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flushing
+    assert buffer.pending_count == 1
+    assert buffer.is_pending("rec_0")
+
+    collection.gate.set()
+    await buffer.close()
+    assert written(collection) == ["rec_0"]
+
+
+@pytest.mark.asyncio
+async def test_write_concern_error_fails_whole_batch():
+    error = BulkWriteError({"writeErrors": [], "writeConcernErrors": [{"code": 64, "errmsg": "waiting for replication timed out"}]})
+    buffer = WriteBehindBuffer(FailingCollection(error), max_batch_size=10, max_linger_ms=1000)
+
+    await buffer.insert({"recommendation_id": "rec_0"})
+    with pytest.raises(BulkWriteError):
+        await buffer.insert({"recommendation_id": "rec_1"}, durable=True)
+    assert buffer.pending_count == 0
+    assert not buffer.is_pending("rec_0")
+
+
+@pytest.mark.asyncio
+async def test_ordered_batch_error_fails_one_and_requeues_rest():
+    collection = AsyncMongoMockClient()["gazehome"]["recommendations"]
+    await collection.create_index("recommendation_id", unique=True)
+    await collection.insert_one({"recommendation_id": "rec_dup"})
+    buffer = WriteBehindBuffer(collection, max_batch_size=10, max_linger_ms=1000)
+
+    await buffer.insert({"recommendation_id": "rec_0"})
+    duplicate = asyncio.create_task(buffer.insert({"recommendation_id": "rec_dup"}, durable=True))
+    await asyncio.sleep(0)
+    await buffer.insert({"recommendation_id": "rec_2"})
+    await buffer.update({"recommendation_id": "rec_0"}, {"$set": {"status": "sent"}}, durable=True)
+
+    with pytest.raises(BulkWriteError):
+        await duplicate
+    await buffer.close()
+    docs = {doc["recommendation_id"]: doc async for doc in collection.find({})}
+    assert set(docs) == {"rec_0", "rec_dup", "rec_2"}
+    assert docs["rec_0"]["status"] == "sent"
+    assert buffer.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_durable_mark_hardware_sent_reports_missing_recommendation():
+    db = AsyncMongoMockClient()["gazehome"]
+    service = RecommendationService(MongoRecommendationRepository(db), MongoStatsRepository(db))
+    recommendation_id = await service.create_recommendation("추천", "내용", user_id="user_0")
+
+    # 버퍼에 남은 삽입을 먼저 반영한 뒤 갱신 결과를 반환
+    assert await service.mark_hardware_sent(recommendation_id, durable=True)
+    assert (await db.recommendations.find_one({"recommendation_id": recommendation_id}))["hardware_sent_at"]
+    assert not await service.mark_hardware_sent("rec_missing", durable=True)
+    # 지연 쓰기는 반영 결과를 알 수 없어 예약되면 True
+    assert await service.mark_hardware_sent("rec_missing")
+    await service.close()